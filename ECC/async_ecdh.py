@@ -0,0 +1,205 @@
+"""
+asyncio 批量 ECDH 服务
+
+在事件循环中直接调用 curve.mult 会阻塞整个循环几百微秒到几毫秒。AsyncECDH 把请求放入队列，
+后台任务在 max_delay 秒内或凑够 max_batch 个请求时合并为一批，交给执行器计算：
+
+    async with AsyncECDH('P-256', max_batch=64, max_delay=0.002) as service:
+        shared = await service.agree(private, peer)
+
+每批在执行器中调用 ecdh_pool.ecdh_chunk，同一条曲线上的请求通过 mult_many 共用求逆。
+默认的执行器是进程池，计算不占用事件循环所在进程的 GIL；也可以传入自己的执行器（例如线程池）。
+
+背压：队列最多 max_queue 个请求，队列满时 agree 等待；同时在途的批次最多 max_inflight 个，
+超出时后台任务暂停取新请求，请求留在队列中。
+一批中某个请求出错（例如私钥或公钥的类型不对）时，这一批逐个重算，异常只交给出错的请求。
+stats() 返回请求数、批次数、平均批大小，以及最近 window 个请求从提交到完成的 p50 / p99 延迟。
+"""
+import asyncio
+import collections
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ecdh_pool import _init_worker, ecdh_chunk
+
+
+def _ecdh_each(chunk):
+    """
+    逐个计算 chunk 中的任务，一个任务出错不影响其他任务
+    :return: [(共享点, None) 或 (None, 异常), ...]
+    """
+    outcomes = []
+    for task in chunk:
+        try:
+            outcomes.append((ecdh_chunk([task])[0], None))
+        except Exception as exc:
+            outcomes.append((None, exc))
+    return outcomes
+
+
+def _percentile(ordered, fraction):
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class AsyncECDH:
+    """
+    合并请求、在执行器中批量计算的 asyncio ECDH 服务。
+    """
+
+    def __init__(self, curve_name='P-256', max_batch=64, max_delay=0.002, max_queue=1024,
+                 executor=None, workers=None, max_inflight=None, window=10000):
+        """
+        :param curve_name: 曲线名称，见 curves.available_curves()
+        :param max_batch: 每批最多的请求数
+        :param max_delay: 一批中第一个请求最多等待其他请求的时间（秒）
+        :param max_queue: 队列容量，队列满时 agree 等待
+        :param executor: concurrent.futures 执行器，默认创建 workers 个进程的进程池
+        :param workers: 默认进程池的进程数，默认为 CPU 核数
+        :param max_inflight: 同时在执行器中计算的批次数，默认为进程数的 2 倍
+        :param window: 计算延迟分位数时保留的最近请求数
+        """
+        self.curve_name = curve_name
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.workers = workers or os.cpu_count() or 1
+        self.max_inflight = max_inflight or 2 * self.workers
+        self.requests = 0
+        self.batches = 0
+        self.errors = 0
+        self._executor = executor
+        self._own_executor = executor is None
+        self._max_queue = max_queue
+        self._queue = None
+        self._slots = None
+        self._batcher = None
+        self._tasks = set()
+        self._latencies = collections.deque(maxlen=window)
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def start(self):
+        """启动后台的合并任务，必须在事件循环中调用"""
+        if self._batcher is not None:
+            return
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+        self._queue = asyncio.Queue(self._max_queue)
+        self._slots = asyncio.Semaphore(self.max_inflight)
+        self._batcher = asyncio.create_task(self._run())
+
+    async def close(self):
+        """
+        等待已提交的请求全部完成后停止，自己创建的进程池也一并关闭
+        """
+        if self._batcher is None:
+            return
+        await self._queue.join()
+        self._batcher.cancel()
+        try:
+            await self._batcher
+        except asyncio.CancelledError:
+            pass
+        self._batcher = None
+        if self._own_executor and self._executor is not None:
+            executor, self._executor = self._executor, None
+            await asyncio.get_running_loop().run_in_executor(None, executor.shutdown)
+
+    async def agree(self, private, peer):
+        """
+        计算共享点 private * peer。peer 应已校验（例如通过 key_cache.PublicKeyCache 或 decode_point）。
+        :param private: 私钥
+        :param peer: 对方公钥 (x, y)
+        :return: 共享点 (x, y)，private 为 n 的倍数时为 None
+        """
+        if self._batcher is None:
+            await self.start()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((private, peer, future, time.perf_counter()))
+        return await future
+
+    def stats(self):
+        """
+        :return: 请求数、批次数、平均批大小、错误数、队列长度、在途批次数、p50 / p99 延迟（秒）
+        """
+        ordered = sorted(self._latencies)
+        return {
+            'requests': self.requests,
+            'batches': self.batches,
+            'mean_batch': self.requests / self.batches if self.batches else 0.0,
+            'errors': self.errors,
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'inflight': len(self._tasks),
+            'p50': _percentile(ordered, 0.50),
+            'p99': _percentile(ordered, 0.99),
+        }
+
+    async def _collect(self):
+        """取出一批请求：先等第一个，再在 max_delay 内尽量凑满 max_batch 个"""
+        queue = self._queue
+        batch = [await queue.get()]
+        deadline = asyncio.get_running_loop().time() + self.max_delay
+        while len(batch) < self.max_batch:
+            if queue.empty():
+                timeout = deadline - asyncio.get_running_loop().time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            else:
+                batch.append(queue.get_nowait())
+        return batch
+
+    async def _run(self):
+        while True:
+            await self._slots.acquire()
+            try:
+                batch = await self._collect()
+            except BaseException:
+                self._slots.release()
+                raise
+            task = asyncio.create_task(self._compute(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _compute(self, batch):
+        loop = asyncio.get_running_loop()
+        chunk = [(private, peer, self.curve_name) for private, peer, _, _ in batch]
+        try:
+            try:
+                results = await loop.run_in_executor(self._executor, ecdh_chunk, chunk)
+                outcomes = [(shared, None) for shared in results]
+            except Exception as exc:
+                if len(batch) == 1:
+                    outcomes = [(None, exc)]
+                else:
+                    # 整批失败时逐个重算，异常只交给出错的请求，其他请求照常返回
+                    try:
+                        outcomes = await loop.run_in_executor(self._executor, _ecdh_each, chunk)
+                    except Exception as exc:
+                        outcomes = [(None, exc)] * len(batch)
+            now = time.perf_counter()
+            for (_, _, future, submitted), (shared, exc) in zip(batch, outcomes):
+                if exc is not None:
+                    self.errors += 1
+                    if not future.done():
+                        future.set_exception(exc)
+                else:
+                    self._latencies.append(now - submitted)
+                    if not future.done():
+                        future.set_result(shared)
+        finally:
+            self.requests += len(batch)
+            self.batches += 1
+            self._slots.release()
+            for _ in batch:
+                self._queue.task_done()
@@ -0,0 +1,52 @@
+"""
+async_ecdh.py 测试：python async_ecdh_test.py
+"""
+import asyncio
+import random
+from concurrent.futures import ThreadPoolExecutor
+
+from async_ecdh import AsyncECDH
+from curves import get_curve
+
+
+def agree_test():
+    """合并成批计算的结果与 curve.mult 相同"""
+    curve = get_curve('P-256')
+    rng = random.Random(2)
+    tasks = [(rng.randrange(1, curve.n), curve.mult(rng.randrange(1, curve.n), curve.g)) for _ in range(20)]
+
+    async def run():
+        with ThreadPoolExecutor(1) as executor:
+            async with AsyncECDH('P-256', max_batch=8, max_delay=0.01, executor=executor) as service:
+                results = await asyncio.gather(*(service.agree(k, peer) for k, peer in tasks))
+                return results, service.stats()
+
+    results, stats = asyncio.run(run())
+    assert results == [curve.mult(k, peer) for k, peer in tasks]
+    assert stats['requests'] == 20 and stats['errors'] == 0 and stats['batches'] < 20, stats
+
+
+def bad_request_test():
+    """一批中的一个错误请求只让它自己的调用方失败"""
+    curve = get_curve('P-192')
+    peer = curve.mult(7, curve.g)
+
+    async def run():
+        with ThreadPoolExecutor(1) as executor:
+            async with AsyncECDH('P-192', max_batch=8, max_delay=0.05, executor=executor) as service:
+                calls = [service.agree(k, peer) for k in (3, 5)]
+                calls.append(service.agree('not a scalar', peer))
+                calls += [service.agree(k, peer) for k in (11, 13)]
+                results = await asyncio.gather(*calls, return_exceptions=True)
+                return results, service.stats()
+
+    results, stats = asyncio.run(run())
+    assert isinstance(results[2], TypeError), results
+    assert [results[i] for i in (0, 1, 3, 4)] == [curve.mult(k, peer) for k in (3, 5, 11, 13)], results
+    assert stats['errors'] == 1 and stats['requests'] == 5, stats
+
+
+if __name__ == '__main__':
+    agree_test()
+    bad_request_test()
+    print('async_ecdh ok')
@@ -0,0 +1,125 @@
+"""
+大整数运算后端
+
+EllipticCurve 的模乘、平方、求逆、模幂和模平方根都通过后端完成：
+
+    PythonBackend  使用 Python 内置整数和 pow(x, -1, p)，总是可用
+    Gmpy2Backend   使用 gmpy2.mpz，安装了 gmpy2 时自动选用，256 位运算明显更快
+
+后端的数（mpz）支持 + - * % 等运算符，点的加法和倍点公式直接对它们使用运算符，
+不再为每一次乘法调用一次方法；只有在输出结果时才转换回 Python int。
+"""
+
+
+class PythonBackend:
+    """
+    纯 Python 后端。
+    """
+
+    name = 'python'
+    mpz = int   # 把 Python int 转换为后端的数
+
+    def mul(self, x, y, p):
+        return x * y % p
+
+    def sqr(self, x, p):
+        return x * x % p
+
+    def inv(self, x, p):
+        """x 模 p 的逆元，x 与 p 不互素时抛出 ValueError"""
+        return pow(x, -1, p)
+
+    def pow(self, x, e, p):
+        return pow(x, e, p)
+
+    def sqrt(self, x, p):
+        """
+        模 p 的平方根 r（r * r = x mod p），x 不是二次剩余时抛出 ValueError。
+        p = 3 (mod 4) 时（NIST P-192 / P-256 都满足）只需要一次模幂 r = x^((p+1)/4)，否则使用 Tonelli-Shanks。
+        :param x:
+        :param p: 奇素数
+        :return:
+        """
+        x %= p
+        if x == 0:
+            return x
+        if p % 4 == 3:
+            root = self.pow(x, (p + 1) // 4, p)
+        else:
+            root = self._tonelli_shanks(x, p)
+        if root * root % p != x:
+            raise ValueError('not a quadratic residue')
+        return root
+
+    def _tonelli_shanks(self, x, p):
+        # p - 1 = q * 2^s，q 为奇数
+        q, s = p - 1, 0
+        while q % 2 == 0:
+            q //= 2
+            s += 1
+        z = 2
+        while self.pow(z, (p - 1) // 2, p) != p - 1:
+            z += 1
+
+        m, c, t, root = s, self.pow(z, q, p), self.pow(x, q, p), self.pow(x, (q + 1) // 2, p)
+        while t != 1:
+            i, t2 = 0, t
+            while t2 != 1:
+                t2 = t2 * t2 % p
+                i += 1
+                if i == m:
+                    return root     # x 不是二次剩余，由调用方校验
+            b = self.pow(c, 1 << (m - i - 1), p)
+            m, c = i, b * b % p
+            t, root = t * c % p, root * b % p
+        return root
+
+
+class Gmpy2Backend(PythonBackend):
+    """
+    gmpy2 后端。
+    """
+
+    name = 'gmpy2'
+
+    def __init__(self):
+        import gmpy2
+        self.mpz = gmpy2.mpz
+        self._invert = gmpy2.invert
+        self._powmod = gmpy2.powmod
+
+    def inv(self, x, p):
+        try:
+            return self._invert(x, p)
+        except ZeroDivisionError:
+            raise ValueError('base is not invertible for the given modulus') from None
+
+    def pow(self, x, e, p):
+        return self._powmod(x, e, p)
+
+
+BACKENDS = {
+    'python': PythonBackend,
+    'gmpy2': Gmpy2Backend,
+}
+
+_instances = {}
+
+
+def get_backend(name=None):
+    """
+    返回指定名称的后端；name 为 None 时自动选择：安装了 gmpy2 时使用 gmpy2，否则使用纯 Python。
+    :param name: 'python'、'gmpy2' 或 None
+    :return:
+    """
+    backend = _instances.get(name)
+    if backend is None:
+        if name is None:
+            try:
+                backend = get_backend('gmpy2')
+            except ImportError:
+                backend = get_backend('python')
+        else:
+            backend = BACKENDS[name]()
+        _instances[name] = backend
+    return backend
@@ -0,0 +1,284 @@
+"""
+CAVP / 蓝牙已知答案向量的流式校验
+
+    python cavp.py KAS_ECC_CDH_PrimitiveTest.txt KeyPair.rsp PKV.rsp
+    python cavp.py p192.py p256.py --workers 4 --chunk-size 64 --verbose
+
+逐行读取文件，每凑满 chunk_size 个向量就交给进程池校验，同时在途的块数有上限，
+任何时候内存中只有少量向量，与文件大小无关。支持的格式（按每条记录的字段自动识别）：
+
+    ecdh       NIST KAS ECC CDH：QCAVSx, QCAVSy, dIUT, QIUTx, QIUTy, ZIUT
+               检查 dIUT * G == QIUT，dIUT * QCAVS 的 x 坐标（mult 与 ecdh_x）== ZIUT
+    keypair    ECDSA KeyPair：d, Qx, Qy，检查 d * G == Q
+    pkv        ECDSA PKV：Qx, Qy, Result，检查公钥校验的结果与 Result（P / F）一致
+    bluetooth  p192.py / p256.py 文档中的格式：Private A/B, Public A/B(x/y), DHKey
+
+记录之间以空行或无法解析的行分隔；曲线由 "[P-256]"、"[P-256,SHA-256]" 或 "P-192 data set 1" 这样的行指定，
+没有指定时按坐标的十六进制位数推断。不支持的曲线（例如 P-224、K-233）记为 skip。
+"""
+import argparse
+import collections
+import itertools
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from curves import available_curves, get_curve
+from ecdh_pool import _init_worker
+
+# 蓝牙向量表的一行，例如 "Public A(x): 15207009 984421a6 ..."
+BLUETOOTH_LINE = re.compile(r"^\s*(Private [AB]|Public [AB]\([xy]\)|DHKey):\s*([0-9a-fA-F ]+)$")
+_CAVP_LINE = re.compile(r"^\s*(\w+)\s*=\s*(.*?)\s*$")
+# "[P-256]"、"[P-256,SHA-256]"、"[K-233]" 或蓝牙向量表的标题 "P-192 data set 1"
+_SECTION_LINE = re.compile(r"^\s*\[([\w-]+)[\],]")
+_TITLE_LINE = re.compile(r"^\s*(P-\d+)\s")
+
+Vector = collections.namedtuple('Vector', 'line kind curve fields')
+Result = collections.namedtuple('Result', 'line kind curve status elapsed message')
+
+_KINDS = [
+    ('ecdh', {'QCAVSx', 'QCAVSy', 'dIUT', 'ZIUT'}),
+    ('pkv', {'Qx', 'Qy', 'Result'}),
+    ('keypair', {'d', 'Qx', 'Qy'}),
+    ('bluetooth', {'Private A', 'Private B', 'Public A(x)', 'Public A(y)', 'DHKey'}),
+]
+
+
+def _kind(fields):
+    for kind, required in _KINDS:
+        if required <= fields.keys():
+            return kind
+    return None
+
+
+def _guess_curve(fields):
+    digits = len(fields.get('Public A(x)', fields.get('Qx', '')))
+    for name in available_curves():
+        if (get_curve(name).p.bit_length() + 3) // 4 == digits:
+            return name
+    return None
+
+
+def read_vectors(lines):
+    """
+    从文本行中解析向量（生成器），只保留当前记录，不读入整个文件。
+    :param lines: 可迭代的文本行，例如打开的文件
+    :return: Vector(起始行号, 类型, 曲线名称, {字段: 字符串})
+    """
+    curve = None
+    fields = {}
+    start = 0
+
+    def flush():
+        kind = _kind(fields)
+        if kind is not None:
+            return Vector(start, kind, curve or _guess_curve(fields), dict(fields))
+
+    for number, line in enumerate(lines, 1):
+        match = BLUETOOTH_LINE.match(line)
+        if match:
+            key, value = match.group(1), match.group(2).replace(' ', '')
+        else:
+            match = _CAVP_LINE.match(line)
+            key, value = (match.group(1), match.group(2)) if match else (None, None)
+        if key is not None:
+            if not fields:
+                start = number
+            fields[key] = value
+            continue
+
+        if line.lstrip().startswith('#'):
+            continue
+        if fields:
+            vector = flush()
+            if vector is not None:
+                yield vector
+            fields = {}
+        header = _SECTION_LINE.match(line) or _TITLE_LINE.match(line)
+        if header:
+            curve = header.group(1)
+    if fields:
+        vector = flush()
+        if vector is not None:
+            yield vector
+
+
+def _check_ecdh(curve, f):
+    d = int(f['dIUT'], 16)
+    peer = int(f['QCAVSx'], 16), int(f['QCAVSy'], 16)
+    z = int(f['ZIUT'], 16)
+    if 'QIUTx' in f and curve.mult(d, curve.g) != (int(f['QIUTx'], 16), int(f['QIUTy'], 16)):
+        return 'QIUT != dIUT * G'
+    shared = curve.mult(d, peer)
+    if shared is None or shared[0] != z:
+        return 'mult: ZIUT mismatch'
+    if curve.ecdh_x(d, peer[0]) != z:
+        return 'ecdh_x: ZIUT mismatch'
+    return None
+
+
+def _check_keypair(curve, f):
+    if curve.mult(int(f['d'], 16), curve.g) != (int(f['Qx'], 16), int(f['Qy'], 16)):
+        return 'Q != d * G'
+    return None
+
+
+def _check_pkv(curve, f):
+    x, y = int(f['Qx'], 16), int(f['Qy'], 16)
+    valid = 0 <= x < curve.p and 0 <= y < curve.p and curve.is_on_curve((x, y)) and curve.is_order_n((x, y))
+    expected = f['Result'].lstrip().startswith('P')
+    if valid != expected:
+        return 'public key validation gave %s, expected %s' % ('P' if valid else 'F', f['Result'])
+    return None
+
+
+def _check_bluetooth(curve, f):
+    private_a, private_b = int(f['Private A'], 16), int(f['Private B'], 16)
+    public_a = int(f['Public A(x)'], 16), int(f['Public A(y)'], 16)
+    dhkey = int(f['DHKey'], 16)
+    if curve.mult(private_a, curve.g) != public_a:
+        return 'Public A != Private A * G'
+    shared = curve.mult(private_b, public_a)
+    if shared is None or shared[0] != dhkey or curve.ecdh_x(private_b, public_a[0]) != dhkey:
+        return 'DHKey mismatch'
+    if 'Public B(x)' in f:
+        public_b = int(f['Public B(x)'], 16), int(f['Public B(y)'], 16)
+        if curve.mult(private_b, curve.g) != public_b:
+            return 'Public B != Private B * G'
+        shared = curve.mult(private_a, public_b)
+        if shared is None or shared[0] != dhkey:
+            return 'DHKey mismatch (A * Public B)'
+    return None
+
+
+_CHECKS = {
+    'ecdh': _check_ecdh,
+    'keypair': _check_keypair,
+    'pkv': _check_pkv,
+    'bluetooth': _check_bluetooth,
+}
+
+
+def check_vector(vector):
+    """
+    校验一个向量
+    :param vector: Vector
+    :return: Result，status 为 'pass'、'fail' 或 'skip'
+    """
+    if vector.curve not in available_curves():
+        return Result(vector.line, vector.kind, vector.curve, 'skip', 0.0, 'unsupported curve')
+    curve = get_curve(vector.curve)
+    start = time.perf_counter()
+    try:
+        message = _CHECKS[vector.kind](curve, vector.fields)
+    except Exception as exc:
+        # 一条畸形的记录只记为 fail，不中断整个文件的校验
+        message = '%s: %s' % (type(exc).__name__, exc)
+    elapsed = time.perf_counter() - start
+    return Result(vector.line, vector.kind, vector.curve, 'fail' if message else 'pass', elapsed, message)
+
+
+def check_chunk(chunk):
+    return [check_vector(vector) for vector in chunk]
+
+
+def run_vectors(vectors, workers=None, chunk_size=64, max_pending=None):
+    """
+    校验向量，按输入顺序逐个返回 Result（生成器）。workers 为 1 时在当前进程中计算。
+    :param vectors: 可迭代的 Vector，例如 read_vectors(open(path))
+    :param workers: 工作进程数，默认为 CPU 核数
+    :param chunk_size: 每次分发给工作进程的向量数
+    :param max_pending: 同时在途的块数，默认为 workers 的 2 倍
+    :return:
+    """
+    workers = workers or os.cpu_count() or 1
+    vectors = iter(vectors)
+    chunks = iter(lambda: list(itertools.islice(vectors, chunk_size)), [])
+    if workers == 1:
+        for chunk in chunks:
+            yield from check_chunk(chunk)
+        return
+
+    max_pending = max_pending or 2 * workers
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        pending = collections.deque()
+        for chunk in chunks:
+            pending.append(executor.submit(check_chunk, chunk))
+            if len(pending) >= max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def run_files(paths, workers=None, chunk_size=64, max_pending=None):
+    """
+    依次校验多个文件，逐个返回 (文件名, Result)（生成器）
+    """
+    for path in paths:
+        with open(path) as f:
+            for result in run_vectors(read_vectors(f), workers, chunk_size, max_pending):
+                yield path, result
+
+
+class Summary:
+    """
+    按 (文件, 类型, 曲线) 汇总通过、失败、跳过的个数和单个向量的耗时
+    """
+
+    def __init__(self):
+        self.groups = collections.OrderedDict()
+        self.failures = []
+
+    def add(self, path, result):
+        key = path, result.kind, result.curve
+        group = self.groups.get(key)
+        if group is None:
+            group = self.groups[key] = {'pass': 0, 'fail': 0, 'skip': 0, 'total': 0.0, 'max': 0.0}
+        group[result.status] += 1
+        group['total'] += result.elapsed
+        group['max'] = max(group['max'], result.elapsed)
+        if result.status == 'fail':
+            self.failures.append((path, result))
+
+    def report(self, out=sys.stdout):
+        print("%-28s %-10s %-6s %7s %5s %5s %10s %10s" %
+              ("file", "kind", "curve", "pass", "fail", "skip", "mean ms", "max ms"), file=out)
+        for (path, kind, curve), g in self.groups.items():
+            checked = g['pass'] + g['fail']
+            mean = g['total'] / checked * 1e3 if checked else 0.0
+            print("%-28s %-10s %-6s %7d %5d %5d %10.2f %10.2f" %
+                  (os.path.basename(path)[-28:], kind, curve, g['pass'], g['fail'], g['skip'], mean, g['max'] * 1e3),
+                  file=out)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="stream CAVP / Bluetooth known-answer vectors through a process pool")
+    parser.add_argument("paths", nargs="+", metavar="FILE", help=".rsp / .txt vector files (or p192.py / p256.py)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count, 1 = inline)")
+    parser.add_argument("--chunk-size", type=int, default=64, help="vectors per task sent to a worker")
+    parser.add_argument("--verbose", action="store_true", help="print every failure as it happens")
+    args = parser.parse_args(argv)
+
+    summary = Summary()
+    start = time.perf_counter()
+    count = 0
+    for path, result in run_files(args.paths, args.workers, args.chunk_size):
+        summary.add(path, result)
+        count += 1
+        if args.verbose and result.status == 'fail':
+            print("FAIL %s:%d %s %s: %s" % (path, result.line, result.kind, result.curve, result.message))
+    elapsed = time.perf_counter() - start
+
+    summary.report()
+    print("%d vectors in %.1f s (%.1f vectors/s), %d failed" %
+          (count, elapsed, count / elapsed if elapsed else 0.0, len(summary.failures)))
+    if not args.verbose:
+        for path, result in summary.failures[:20]:
+            print("FAIL %s:%d %s %s: %s" % (path, result.line, result.kind, result.curve, result.message))
+    return 1 if summary.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+cavp.py 测试：python cavp_test.py
+"""
+import os
+
+from cavp import check_vector, read_vectors, run_files, run_vectors
+from curves import get_curve
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def _hex(value, digits):
+    return '%0*x' % (digits, value)
+
+
+def _bluetooth_record(curve, private_a, private_b, dhkey=None):
+    digits = (curve.p.bit_length() + 3) // 4
+    public_a = curve.mult(private_a, curve.g)
+    if dhkey is None:
+        dhkey = curve.mult(private_b, public_a)[0]
+    return [
+        'Private A: %s' % _hex(private_a, digits),
+        'Private B: %s' % _hex(private_b, digits),
+        'Public A(x): %s' % _hex(public_a[0], digits),
+        'Public A(y): %s' % _hex(public_a[1], digits),
+        'DHKey: %s' % _hex(dhkey, digits),
+        '',
+    ]
+
+
+def bluetooth_files_test():
+    """p192.py / p256.py 文档中的蓝牙向量全部通过"""
+    results = [result for _, result in run_files([os.path.join(HERE, 'p192.py'), os.path.join(HERE, 'p256.py')], 1)]
+    assert results, 'no vectors found'
+    assert all(result.status == 'pass' for result in results), [r for r in results if r.status != 'pass']
+    assert {result.curve for result in results} == {'P-192', 'P-256'}
+
+
+def degenerate_bluetooth_test():
+    """Private B 为 n 的倍数时共享点是无穷远点，记为 fail 而不是抛出异常，之后的向量继续校验"""
+    curve = get_curve('P-256')
+    lines = ['[P-256]']
+    lines += _bluetooth_record(curve, 3, curve.n, dhkey=1)
+    lines += _bluetooth_record(curve, 3, 5)
+    results = list(run_vectors(read_vectors(lines), workers=1))
+    assert [result.status for result in results] == ['fail', 'pass'], results
+    assert 'DHKey' in results[0].message
+
+
+def malformed_record_test():
+    """字段不是十六进制的记录记为 fail"""
+    lines = ['[P-192]', 'd = zz', 'Qx = 01', 'Qy = 02', '']
+    results = list(run_vectors(read_vectors(lines), workers=1))
+    assert len(results) == 1 and results[0].status == 'fail', results
+    assert results[0].message.startswith('ValueError')
+
+
+def cavp_formats_test():
+    """NIST CDH / KeyPair / PKV 格式的解析与校验，不支持的曲线记为 skip"""
+    curve = get_curve('P-192')
+    d, peer_k = 0x1234567, 0x7654321
+    q = curve.mult(d, curve.g)
+    peer = curve.mult(peer_k, curve.g)
+    z = curve.mult(d, peer)[0]
+    lines = [
+        '[P-192]',
+        'QCAVSx = %x' % peer[0], 'QCAVSy = %x' % peer[1],
+        'dIUT = %x' % d, 'QIUTx = %x' % q[0], 'QIUTy = %x' % q[1], 'ZIUT = %x' % z, '',
+        'd = %x' % d, 'Qx = %x' % q[0], 'Qy = %x' % q[1], '',
+        'Qx = %x' % q[0], 'Qy = %x' % q[1], 'Result = P', '',
+        'Qx = %x' % q[0], 'Qy = %x' % (q[1] + 1), 'Result = F (1 - Q not on curve)', '',
+        '[K-233]',
+        'd = 01', 'Qx = 02', 'Qy = 03', '',
+    ]
+    vectors = list(read_vectors(lines))
+    assert [v.kind for v in vectors] == ['ecdh', 'keypair', 'pkv', 'pkv', 'keypair'], vectors
+    statuses = [check_vector(v).status for v in vectors]
+    assert statuses == ['pass', 'pass', 'pass', 'pass', 'skip'], statuses
+
+
+if __name__ == '__main__':
+    bluetooth_files_test()
+    degenerate_bluetooth_test()
+    malformed_record_test()
+    cavp_formats_test()
+    print('cavp ok')
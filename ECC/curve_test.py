@@ -0,0 +1,257 @@
+"""
+EllipticCurve 各条快速路径与参考实现的对照测试：python curve_test.py
+"""
+import random
+
+import p192
+import p256
+from backend import get_backend
+
+CURVES = (('P-192', p192, p192.P192_PARAMS), ('P-256', p256, p256.P256_PARAMS))
+
+
+def _backends():
+    names = ['python']
+    try:
+        get_backend('gmpy2')
+        names.append('gmpy2')
+    except ImportError:
+        pass
+    return names
+
+
+def _curves():
+    """每条曲线、每个可用后端各构建一个新实例，不修改注册表中共享的曲线"""
+    for name, module, params in CURVES:
+        for backend in _backends():
+            yield module, module.EllipticCurve(name=name, validate=False, backend=backend, **params)
+
+
+def _reference_add(curve, dot1, dot2):
+    """仿射坐标加法，只用 Python int 与 pow(x, -1, p)"""
+    p = curve.p
+    if dot1 is None:
+        return dot2
+    if dot2 is None:
+        return dot1
+    (x1, y1), (x2, y2) = dot1, dot2
+    if x1 == x2 and (y1 + y2) % p == 0:
+        return None
+    if x1 == x2:
+        m = (3 * x1 * x1 + curve.a) * pow(2 * y1, -1, p) % p
+    else:
+        m = (y2 - y1) * pow(x2 - x1, -1, p) % p
+    x3 = (m * m - x1 - x2) % p
+    return x3, (m * (x1 - x3) - y1) % p
+
+
+def _reference_mult(curve, n, dot):
+    """从低位到高位的仿射坐标 double-and-add"""
+    if dot is None:
+        return None
+    n %= curve.n
+    result = None
+    while n:
+        if n & 1:
+            result = _reference_add(curve, result, dot)
+        dot = _reference_add(curve, dot, dot)
+        n >>= 1
+    return result
+
+
+def _scalars(curve, rng):
+    n = curve.n
+    return [1, 2, 3, 15, 16, n - 1, n - 2, n + 1, 2 * n + 5, -1, -7, -(n - 3), (1 << n.bit_length()) - 1,
+            rng.randrange(n), rng.randrange(n), -rng.randrange(n)]
+
+
+def _expect_value_error(func, *args):
+    try:
+        func(*args)
+    except ValueError:
+        return
+    raise AssertionError('ValueError not raised')
+
+
+def mult_test():
+    """mult（wNAF）、mult_base（基点预计算表）与参考实现相同，包括负数、0、n 的倍数、不小于 n 的标量和无穷远点"""
+    rng = random.Random(0)
+    for _, curve in _curves():
+        peer = _reference_mult(curve, rng.randrange(1, curve.n), curve.g)
+        for k in _scalars(curve, rng):
+            expected = _reference_mult(curve, k, peer)
+            assert curve.mult(k, peer) == expected, (curve.name, curve.backend.name, k)
+            expected = _reference_mult(curve, k, curve.g)
+            assert curve.mult(k, curve.g) == expected == curve.mult_base(k), (curve.name, k)
+        for k in (0, curve.n, -curve.n, 3 * curve.n):
+            assert curve.mult(k, peer) is None and curve.mult_base(k) is None
+        assert curve.mult(5, None) is None
+        dot = curve.mult(rng.randrange(1, curve.n), peer)
+        assert type(dot[0]) is int and type(dot[1]) is int
+
+
+def base_table_test():
+    """不同窗口宽度重建的基点预计算表结果相同"""
+    rng = random.Random(1)
+    for _, curve in _curves():
+        scalars = _scalars(curve, rng)
+        expected = [_reference_mult(curve, k, curve.g) for k in scalars]
+        for window in (2, 3, 5, 6):
+            curve.precompute_base(window)
+            assert curve.g_window == window
+            assert [curve.mult_base(k) for k in scalars] == expected, (curve.name, window)
+
+
+def wnaf_test():
+    """wNAF 编码能还原标量且满足非相邻性；各种窗口宽度的 _wnaf_jacobian 结果相同"""
+    rng = random.Random(2)
+    module, curve = next(_curves())
+    for w in (2, 3, 4, 5, 6):
+        for n in [1, 2, 7, 255, 256] + [rng.randrange(curve.n) for _ in range(20)]:
+            digits = module.wnaf(n, w)
+            assert sum(d << i for i, d in enumerate(digits)) == n
+            assert all(d % 2 and -(1 << (w - 1)) < d < 1 << (w - 1) for d in digits if d)
+            assert all(sum(1 for d in digits[i:i + w] if d) <= 1 for i in range(len(digits)))
+        peer = curve.mult(rng.randrange(1, curve.n), curve.g)
+        k = rng.randrange(1, curve.n)
+        jac = curve._wnaf_jacobian(k, curve._wnaf_table(peer, w), w)
+        assert curve._to_affine(jac) == _reference_mult(curve, k, peer), w
+    assert module.wnaf(0, 4) == []
+
+
+def add_test():
+    """add / double / neg，包括 P + (-P)、P + P 与无穷远点"""
+    for _, curve in _curves():
+        P = curve.mult(1234567, curve.g)
+        Q = curve.mult(7654321, curve.g)
+        assert curve.add(P, Q) == _reference_add(curve, P, Q)
+        assert curve.add(P, P) == curve.double(P) == _reference_add(curve, P, P)
+        assert curve.add(P, curve.neg(P)) is None
+        assert curve.add(None, P) == P and curve.add(P, None) == P and curve.neg(None) is None
+
+
+def mult2_test():
+    """mult2 与两次 mult 相加相同：G 在任一位置或两个都是 G、P == Q、P == -Q、0、负数、无穷远点"""
+    rng = random.Random(3)
+    for _, curve in _curves():
+        g = curve.g
+        P = curve.mult(rng.randrange(1, curve.n), g)
+        Q = curve.mult(rng.randrange(1, curve.n), g)
+        u1, u2 = rng.randrange(1, curve.n), rng.randrange(1, curve.n)
+        cases = [
+            (u1, P, u2, Q), (u1, g, u2, Q), (u1, P, u2, g), (u1, g, u2, g), (u1, P, u2, P),
+            (u1, P, u1, curve.neg(P)), (u1, P, curve.n - u1, P), (0, P, u2, Q), (u1, P, 0, Q),
+            (-u1, P, u2, Q), (u1, g, -u2, Q), (u1, None, u2, Q), (u1, P, u2, None), (curve.n + 5, P, u2, g),
+        ]
+        for a, A, b, B in cases:
+            expected = _reference_add(curve, _reference_mult(curve, a, A), _reference_mult(curve, b, B))
+            assert curve.mult2(a, A, b, B) == expected, (curve.name, a, A, b, B)
+
+
+def mult_many_test():
+    """mult_many 的同步路径（批量不小于 mult_many_min_batch）与逐个 mult 相同，
+    包括计算过程中出现 P == Q（标量 n + 2）与 P == -Q（标量 2n + 1）的路"""
+    rng = random.Random(4)
+    for _, curve in _curves():
+        n = curve.n
+        peer = curve.mult(rng.randrange(1, n), curve.g)
+        specials = [0, n, -n, 1, -1, n + 2, 2 * n + 1, n - 1, 2 * n + 5]
+        pairs = [(k, peer) for k in specials] + [(k, curve.g) for k in specials] + [(5, None)]
+        pairs += [(rng.randrange(-n, 2 * n), curve.mult(rng.randrange(1, n), curve.g))
+                  for _ in range(curve.mult_many_min_batch)]
+        assert len(pairs) >= curve.mult_many_min_batch
+        assert curve.mult_many(pairs) == [_reference_mult(curve, k, dot) for k, dot in pairs], curve.name
+        small = pairs[:3]
+        assert curve.mult_many(small) == [curve.mult(k, dot) for k, dot in small]
+        assert curve.mult_many([]) == []
+
+
+def inverse_batch_test():
+    """inverse_mod_batch / inverse_batch 与逐个 pow(x, -1, p) 相同；0 不可逆"""
+    rng = random.Random(5)
+    for module, curve in _curves():
+        for modulus in (curve.p, curve.n):
+            for size in (0, 1, 2, 17):
+                values = [rng.randrange(1, modulus) for _ in range(size)]
+                expected = [pow(v, -1, modulus) for v in values]
+                assert module.inverse_mod_batch(values, modulus) == expected
+                assert [int(v) for v in curve.inverse_batch(values, modulus)] == expected
+        assert module.inverse_mod(3, curve.p) * 3 % curve.p == 1
+        _expect_value_error(curve.inverse_batch, [1, 0, 2], curve.p)
+        try:
+            module.inverse_mod(0, curve.p)
+        except ZeroDivisionError:
+            pass
+        else:
+            raise AssertionError('inverse of 0')
+
+
+def sec1_test():
+    """SEC1 三种编码的往返与批量编解码；不合法的编码抛出 ValueError"""
+    rng = random.Random(6)
+    for _, curve in _curves():
+        size = (curve.p.bit_length() + 7) // 8
+        dots = [curve.mult(rng.randrange(1, curve.n), curve.g) for _ in range(8)] + [None]
+        for form in ('compressed', 'uncompressed', 'hybrid'):
+            encoded = curve.encode_points(dots, form)
+            assert encoded == [curve.encode_point(dot, form) for dot in dots]
+            assert [curve.decode_point(data) for data in encoded] == dots
+            assert curve.decode_points(encoded) == dots
+        x, y = dots[0]
+        x_bytes, y_bytes = x.to_bytes(size, 'big'), y.to_bytes(size, 'big')
+        non_residue = next(v for v in range(1, 100)
+                           if pow((v ** 3 + curve.a * v + curve.b) % curve.p, (curve.p - 1) // 2, curve.p) != 1)
+        invalid = [
+            b'', b'\x01', b'\x00\x00', b'\x02' + x_bytes[1:], b'\x04' + x_bytes + y_bytes[1:],
+            b'\x05' + x_bytes, b'\x02' + curve.p.to_bytes(size, 'big'),
+            b'\x02' + non_residue.to_bytes(size, 'big'),
+            b'\x04' + x_bytes + ((y + 1) % curve.p).to_bytes(size, 'big'),
+            b'\x04' + curve.p.to_bytes(size, 'big') + y_bytes,
+            bytes((6 | (y & 1) ^ 1,)) + x_bytes + y_bytes,
+        ]
+        for data in invalid:
+            _expect_value_error(curve.decode_point, data)
+            _expect_value_error(curve.decode_points, [curve.encode_point(dots[1]), data])
+        _expect_value_error(curve.encode_point, dots[0], 'raw')
+
+
+def ecdh_x_test():
+    """ecdh_x 与 mult(...)[0] 相同；私钥为 n 的倍数时返回 None；x 超出范围或属于扭曲线时抛出 ValueError"""
+    rng = random.Random(7)
+    for _, curve in _curves():
+        peer = curve.mult(rng.randrange(1, curve.n), curve.g)
+        for k in _scalars(curve, rng):
+            assert curve.ecdh_x(k, peer[0]) == curve.mult(k, peer)[0], (curve.name, k)
+        assert curve.ecdh_x(curve.n, peer[0]) is None and curve.ecdh_x(0, peer[0]) is None
+        twist_x = next(v for v in range(1, 100)
+                       if pow((v ** 3 + curve.a * v + curve.b) % curve.p, (curve.p - 1) // 2, curve.p) != 1)
+        for x in (curve.p, -1, twist_x):
+            _expect_value_error(curve.ecdh_x, 12345, x)
+
+
+def backend_test():
+    """自动选择的后端：安装了 gmpy2 时为 gmpy2；不同后端的结果相同"""
+    backends = _backends()
+    assert get_backend().name == backends[-1]
+    assert get_backend() is get_backend(backends[-1])
+    rng = random.Random(8)
+    for name, module, params in CURVES:
+        curves = [module.EllipticCurve(validate=False, backend=backend, **params) for backend in backends]
+        k = rng.randrange(params['n'])
+        peer = curves[0].mult(rng.randrange(1, params['n']), curves[0].g)
+        results = [(c.mult(k, peer), c.mult_base(k), c.ecdh_x(k, peer[0])) for c in curves]
+        assert all(result == results[0] for result in results), name
+
+
+if __name__ == '__main__':
+    mult_test()
+    base_table_test()
+    wnaf_test()
+    add_test()
+    mult2_test()
+    mult_many_test()
+    inverse_batch_test()
+    sec1_test()
+    ecdh_x_test()
+    backend_test()
+    print('curve ok')
@@ -0,0 +1,54 @@
+"""
+命名曲线注册表
+
+曲线在第一次 get_curve 时才构建，导入 p192.py / p256.py 或本模块都不会触发任何曲线计算。
+内置曲线的参数来自标准，构建时跳过校验；用户注册的曲线默认会调用 EllipticCurve.validate()。
+"""
+
+# 曲线名称 -> 构建函数
+_factories = {}
+# 已经构建的曲线
+_curves = {}
+
+
+def register_curve(name, factory):
+    """
+    注册一条命名曲线。
+    :param name: 曲线名称
+    :param factory: 无参数的构建函数，返回 EllipticCurve
+    :return:
+    """
+    _factories[name] = factory
+    _curves.pop(name, None)
+
+
+def get_curve(name):
+    """
+    返回命名曲线，第一次访问时构建。
+    :param name: 例如 "P-192"、"P-256"
+    :return:
+    """
+    curve = _curves.get(name)
+    if curve is None:
+        try:
+            factory = _factories[name]
+        except KeyError:
+            raise KeyError('unknown curve: %s' % name) from None
+        # 多个线程同时第一次访问时可能各自构建一次，但 setdefault 保证大家拿到同一个对象
+        curve = _curves.setdefault(name, factory())
+    return curve
+
+
+def available_curves():
+    return sorted(_factories)
+
+
+def _builtin(name, module, params):
+    def factory():
+        mod = __import__(module)
+        return mod.EllipticCurve(name=name, validate=False, **getattr(mod, params))
+    register_curve(name, factory)
+
+
+_builtin('P-192', 'p192', 'P192_PARAMS')
+_builtin('P-256', 'p256', 'P256_PARAMS')
@@ -0,0 +1,682 @@
+"""
+ECC 性能测试
+
+    python ecc_bench.py                                 # 校验已知答案并打印耗时
+    python ecc_bench.py --save baseline.json            # 保存为基线
+    python ecc_bench.py --compare baseline.json         # 与基线比较，任何一项变慢超过阈值则返回 1
+    python ecc_bench.py --compare baseline.json --threshold 0.1
+    python ecc_bench.py --micro                         # 额外运行域运算、大整数后端、mult_many、SEC1 编解码、公钥缓存、点类型、预计算点、ECDSA 和临时密钥对池的性能测试
+    python ecc_bench.py --pool 1,2,4,8                  # 额外测试 ECDHPool 在不同进程数下的吞吐量
+    python ecc_bench.py --agree 2048                    # 额外测试 AsyncECDH 的吞吐量、延迟分位数和事件循环的最大停顿
+    python ecc_bench.py --instrument                    # 额外打印每次 mult 的运算次数，并测量计数的开销
+    python ecc_bench.py --vector 64,1024,4096           # 额外比较 NumPy 向量化批量倍点与逐个 mult（需要 numpy）
+
+计时前先用 p192.py / p256.py 中 P192_data_set_* / P256_data_set_* 文档里的向量校验结果。
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import sys
+import time
+import timeit
+import tracemalloc
+
+import p192
+import p256
+from async_ecdh import AsyncECDH
+from backend import BACKENDS, get_backend
+from cavp import BLUETOOTH_LINE
+from ecdh_pool import ECDHPool
+from ecdsa import ECDSA, NoncePool
+from ephemeral import EphemeralKeyPool, generate_keypairs
+from field import PrimeField
+from instrument import Instrumentation
+from key_cache import PublicKeyCache
+from point import affine
+from precomputed import PrecomputedPoint
+from p192 import ECC_P192
+from p256 import ECC_P256
+
+# 曲线名称 -> (曲线, 已知答案函数)
+KNOWN_ANSWERS = {
+    "P-192": (ECC_P192, [getattr(p192, "P192_data_set_%d" % i) for i in range(1, 11)]),
+    "P-256": (ECC_P256, [p256.P256_data_set_1, p256.P256_data_set_2]),
+}
+
+# RFC 6979 A.2.3 / A.2.5 的 SHA-256 向量：曲线名称 -> (私钥, [(消息, r, s), ...])
+ECDSA_ANSWERS = {
+    "P-192": (0x6FAB034934E4C0FC9AE67F5B5659A9D7D1FEFD187EE09FD4, [
+        (b"sample", 0x4B0B8CE98A92866A2820E20AA6B75B56382E0F9BFD5ECB55,
+         0xCCDB006926EA9565CBADC840829D8C384E06DE1F1E381B85),
+    ]),
+    "P-256": (0xC9AFA9D845BA75166B5C215767B1D6934E50C3DB36E89B127B8A622B120F6721, [
+        (b"sample", 0xEFD48B2AACB6A8FD1140DD9CD45E81D69D2C877B56AAF991C34D0EA84EAF3716,
+         0xF7CB1C942D657C41D436C7A1B6E29F65F3E900DBB9AFF4064DC4AB2F843ACDA8),
+        (b"test", 0xF1ABB023518351CD71D881567B1EA663ED3EFCF6C5132B354F28D3B0B7D38367,
+         0x019F4113742A2B14BD25926B49C649155F267E60D3814B4C0CC84250E46F0083),
+    ]),
+}
+
+
+def parse_vector(func):
+    """
+    从已知答案函数的文档中读取测试向量，例如 "Public A(x): 15207009 984421a6 ..."。
+    :param func:
+    :return: {"Private A": int, "Public A(x)": int, ..., "DHKey": int}
+    """
+    vector = {}
+    for line in func.__doc__.splitlines():
+        match = BLUETOOTH_LINE.match(line)
+        if match:
+            vector[match.group(1)] = int(match.group(2).replace(" ", ""), 16)
+    return vector
+
+
+def check_known_answers():
+    """
+    校验所有文档中的向量：Private * G == Public，Private B * Public A 的 x 坐标 == DHKey（有 Public B 时反向也校验），
+    ecdh_x 只用 x 坐标计算的结果也要等于 DHKey；再校验 ECDSA_ANSWERS 中 RFC 6979 的签名。
+    不一致时抛出 AssertionError。
+    :return: 校验的向量个数
+    """
+    count = 0
+    for name, (curve, funcs) in KNOWN_ANSWERS.items():
+        for func in funcs:
+            vector = parse_vector(func)
+            label = "%s %s" % (name, func.__name__)
+            public_a = vector["Public A(x)"], vector["Public A(y)"]
+            assert curve.mult(vector["Private A"], curve.g) == public_a, label + ": Public A"
+            assert curve.mult(vector["Private B"], public_a)[0] == vector["DHKey"], label + ": DHKey"
+            assert curve.ecdh_x(vector["Private B"], public_a[0]) == vector["DHKey"], label + ": ecdh_x"
+            if "Public B(x)" in vector:
+                public_b = vector["Public B(x)"], vector["Public B(y)"]
+                assert curve.mult(vector["Private B"], curve.g) == public_b, label + ": Public B"
+                assert curve.mult(vector["Private A"], public_b)[0] == vector["DHKey"], label + ": DHKey"
+                assert curve.ecdh_x(vector["Private A"], public_b[0]) == vector["DHKey"], label + ": ecdh_x"
+            count += 1
+
+    for name, (private, vectors) in ECDSA_ANSWERS.items():
+        signer = ECDSA(KNOWN_ANSWERS[name][0], private)
+        for message, r, s in vectors:
+            label = "%s ECDSA %r" % (name, message)
+            assert signer.sign(message) == (r, s), label + ": signature"
+            assert signer.verify(message, (r, s)), label + ": verify"
+            assert not signer.verify(message + b"!", (r, s)), label + ": verify other message"
+            count += 1
+    return count
+
+
+def _time(func, number, repeat):
+    """返回 func 单次调用的耗时（秒），取 repeat 轮中最快的一轮。"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number
+
+
+def run_benchmarks(repeat=5, scale=1):
+    """
+    对每条曲线计时：密钥生成（k * G）、ECDH（k * Q）、只算 x 坐标的 ECDH（ecdh_x）、ECDSA 签名（RFC 6979）与验签、
+    add、double 和 inverse_mod。
+    :param repeat: 每项计时的轮数，取最快的一轮
+    :param scale: 每轮调用次数的倍数
+    :return: {"P-192.keygen": 秒, ...}
+    """
+    results = {}
+    for name, (curve, funcs) in KNOWN_ANSWERS.items():
+        module = sys.modules[curve.__module__]
+        vector = parse_vector(funcs[0])
+        private_a, private_b = vector["Private A"], vector["Private B"]
+        public_a = vector["Public A(x)"], vector["Public A(y)"]
+        dot1 = curve.mult(private_b, curve.g)
+        rng = random.Random(0)
+        value = rng.randrange(1, curve.p)
+        signer = ECDSA(curve, private_a)
+        signature = signer.sign(b"benchmark")
+
+        cases = [
+            ("keygen", lambda: curve.mult(private_a, curve.g), 10),
+            ("ecdh", lambda: curve.mult(private_b, public_a), 3),
+            ("ecdh_x", lambda: curve.ecdh_x(private_b, public_a[0]), 3),
+            ("sign", lambda: signer.sign(b"benchmark"), 10),
+            ("verify", lambda: signer.verify(b"benchmark", signature), 3),
+            ("add", lambda: curve.add(public_a, dot1), 200),
+            ("double", lambda: curve.double(public_a), 200),
+            ("inverse_mod", lambda: module.inverse_mod(value, curve.p), 500),
+        ]
+        for case, func, number in cases:
+            results["%s.%s" % (name, case)] = _time(func, number * scale, repeat)
+    return results
+
+
+def compare(results, baseline, threshold):
+    """
+    与基线比较，返回变慢超过 threshold（比例，0.2 即 20%）的项目列表 [(名称, 基线耗时, 当前耗时)]。
+    基线中没有的项目不比较。
+    :param results:
+    :param baseline:
+    :param threshold:
+    :return:
+    """
+    regressions = []
+    for key, elapsed in sorted(results.items()):
+        old = baseline.get(key)
+        if old is not None and elapsed > old * (1 + threshold):
+            regressions.append((key, old, elapsed))
+    return regressions
+
+
+def mult_many_benchmark(curve, name, sizes=(1, 4, 16, 64, 256), total=256):
+    """
+    比较 mult_many 与逐个调用 mult 的吞吐量（每秒倍点次数）随批量大小的变化。
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param sizes: 批量大小
+    :param total: 每种批量大小一共计算的倍点次数
+    :return:
+    """
+    rng = random.Random(0)
+    peers = [curve.mult(rng.randrange(1, curve.n), curve.g) for _ in range(16)]
+
+    print(name, "mult_many throughput (mult/s)")
+    print("%8s %12s %12s %8s" % ("batch", "mult", "mult_many", "speedup"))
+    for size in sizes:
+        pairs = [(rng.randrange(1, curve.n), peers[i % len(peers)]) for i in range(max(size, total))]
+        batches = [pairs[i:i + size] for i in range(0, len(pairs), size)]
+
+        start = time.perf_counter()
+        for batch in batches:
+            [curve.mult(k, dot) for k, dot in batch]
+        single = len(pairs) / (time.perf_counter() - start)
+
+        start = time.perf_counter()
+        for batch in batches:
+            curve.mult_many(batch)
+        batched = len(pairs) / (time.perf_counter() - start)
+
+        print("%8d %12.1f %12.1f %7.2fx" % (size, single, batched, batched / single))
+
+
+def field_benchmark(curve, name, number=20000):
+    """
+    域运算的单次耗时：内置 x % p、field.PrimeField、field.FieldElement，以及一次雅可比倍点、混合加法。
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param number: 每项重复次数
+    :return:
+    """
+    rng = random.Random(0)
+    x, y = rng.randrange(curve.p), rng.randrange(curve.p)
+    product = x * y
+    field = PrimeField(curve.p)
+    fx, fy = field.element(x), field.element(y)
+    jac = curve.mult(x, curve.g) + (1,)
+    dot = curve.mult(y, curve.g)
+
+    cases = [
+        ("x % p", lambda: product % curve.p),
+        ("x * y % p", lambda: x * y % curve.p),
+        ("PrimeField mul", lambda: field.mul(x, y)),
+        ("FieldElement mul", lambda: fx * fy),
+        ("jacobian double", lambda: curve._jacobian_double(jac)),
+        ("jacobian add affine", lambda: curve._jacobian_add_affine(jac, dot)),
+    ]
+    print(name, "field arithmetic (us/op)")
+    for label, func in cases:
+        elapsed = min(timeit.repeat(func, number=number, repeat=5))
+        print("%24s %8.3f" % (label, elapsed / number * 1e6))
+
+
+def backend_benchmark(module, name, number=20):
+    """
+    比较不同大整数后端下 mult（ECDH）与 mult_base（密钥生成）的耗时，未安装的后端跳过。
+    :param module: p192 或 p256 模块
+    :param name: 曲线名称，用于打印
+    :param number: 每项调用次数
+    :return:
+    """
+    params = getattr(module, name.replace("-", "") + "_PARAMS")
+    rng = random.Random(0)
+    scalars = [rng.randrange(1, params["n"]) for _ in range(number)]
+
+    print(name, "backends (us/op)")
+    for backend in BACKENDS:
+        try:
+            get_backend(backend)
+        except ImportError:
+            print("%12s not installed" % backend)
+            continue
+        curve = module.EllipticCurve(validate=False, backend=backend, **params)
+        peer = curve.mult(scalars[0], curve.g)
+        ecdh = _time(lambda: [curve.mult(k, peer) for k in scalars], 1, 3) / number
+        keygen = _time(lambda: [curve.mult(k, curve.g) for k in scalars], 1, 3) / number
+        print("%12s ecdh %10.1f keygen %10.1f" % (backend, ecdh * 1e6, keygen * 1e6))
+
+
+def sec1_benchmark(curve, name, count=20000):
+    """
+    SEC1 编解码的吞吐量（每秒点数）：逐个调用 decode_point 与批量 decode_points
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param count: 点的个数
+    :return:
+    """
+    rng = random.Random(0)
+    dots = [curve.mult(rng.randrange(1, curve.n), curve.g) for _ in range(64)]
+    dots = [dots[i % len(dots)] for i in range(count)]
+
+    print(name, "SEC1 (points/s)")
+    for form in ("compressed", "uncompressed"):
+        encoded = curve.encode_points(dots, form)
+        cases = [
+            ("encode_points", lambda: curve.encode_points(dots, form)),
+            ("decode_point", lambda: [curve.decode_point(data) for data in encoded]),
+            ("decode_points", lambda: curve.decode_points(encoded)),
+        ]
+        for label, func in cases:
+            print("%14s %14s %12.0f" % (form, label, count / _time(func, 1, 3)))
+
+
+def key_cache_benchmark(curve, name, number=50):
+    """
+    与同一个对方公钥做 ECDH 的耗时：每次解码并校验公钥、PublicKeyCache 命中、命中且有预计算表
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param number: 每项调用次数
+    :return:
+    """
+    rng = random.Random(0)
+    private = rng.randrange(1, curve.n)
+    data = curve.encode_point(curve.mult(rng.randrange(1, curve.n), curve.g))
+
+    def uncached():
+        dot = curve.decode_point(data)
+        assert curve.is_order_n(dot)
+        return curve.mult(private, dot)
+
+    cached = PublicKeyCache()
+    hot = PublicKeyCache(table_threshold=1)
+    cases = [
+        ("validate + ecdh", uncached),
+        ("cached", lambda: cached.mult(curve, private, data)),
+        ("cached + table", lambda: hot.mult(curve, private, data)),
+    ]
+    print(name, "peer key cache (us/ecdh)")
+    for label, func in cases:
+        func()
+        func()      # 第二次命中时构建预计算表
+        print("%18s %10.1f" % (label, _time(func, number, 3) * 1e6))
+
+
+def _bytes_per_object(make, count=100000):
+    """用 tracemalloc 测量 make(i) 创建的对象平均每个占用的字节数"""
+    tracemalloc.start()
+    objects = [make(i) for i in range(count)]
+    size = tracemalloc.get_traced_memory()[0] / len(objects)
+    tracemalloc.stop()
+    return size
+
+
+def point_benchmark(curve, name, number=2000):
+    """
+    比较 (x, y) 元组接口与 point.AffinePoint / JacobianPoint：每个点占用的内存（tracemalloc）与运算耗时（timeit）。
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param number: 每项调用次数
+    :return:
+    """
+    rng = random.Random(0)
+    dots = [curve.mult(rng.randrange(1, curve.n), curve.g) for _ in range(16)]
+    p, q = dots[0], dots[1]
+    P, Q = affine(curve, p), affine(curve, q)
+    J = P.to_jacobian().double()
+    jac = tuple(J)
+    k = rng.randrange(1, curve.n)
+    X, Y = P.elements()[0], Q.elements()[0]
+
+    print(name, "tuple vs point objects")
+    print("%18s %10s %10s" % ("", "tuple", "object"))
+    print("%18s %10.1f %10.1f" % ("affine bytes", _bytes_per_object(lambda i: (dots[i % 16][0], dots[i % 16][1])),
+                                  _bytes_per_object(lambda i: affine(curve, dots[i % 16]))))
+    print("%18s %10.1f %10.1f" % ("jacobian bytes", _bytes_per_object(lambda i: dots[i % 16] + (1,)),
+                                  _bytes_per_object(lambda i: affine(curve, dots[i % 16]).to_jacobian())))
+    cases = [
+        ("add us", lambda: curve.add(p, q), lambda: P + Q, number),
+        ("neg us", lambda: curve.neg(p), lambda: -P, number),
+        ("jacobian add us", lambda: curve._jacobian_add_affine(jac, q), lambda: J + Q, number),
+        ("jacobian double us", lambda: curve._jacobian_double(jac), lambda: J.double(), number),
+        ("mult us", lambda: curve.mult(k, p), lambda: k * P, 5),
+        ("field mul us", lambda: p[0] * q[0] % curve.p, lambda: X * Y, number),
+        ("on curve us", lambda: curve.is_on_curve(p), lambda: P.is_on_curve(), number),
+    ]
+    for label, plain, wrapped, count in cases:
+        print("%18s %10.2f %10.2f" % (label, _time(plain, count, 3) * 1e6, _time(wrapped, count, 3) * 1e6))
+
+
+def precomputed_benchmark(curve, name, windows=(3, 4, 5, 6), number=20):
+    """
+    PrecomputedPoint 在不同窗口宽度下的建表耗时、每个点占用的内存、倍点耗时，
+    以及建表开销被节省下来的时间抵消所需的调用次数。
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param windows: 窗口宽度
+    :param number: 每项倍点次数
+    :return:
+    """
+    rng = random.Random(0)
+    peer = curve.mult(rng.randrange(1, curve.n), curve.g)
+    scalars = [rng.randrange(1, curve.n) for _ in range(number)]
+    plain = _time(lambda: [curve.mult(k, peer) for k in scalars], 1, 3) / number
+
+    print(name, "PrecomputedPoint (mult %.1f us)" % (plain * 1e6))
+    print("%8s %10s %10s %10s %10s" % ("window", "build ms", "KiB", "mult us", "break-even"))
+    for window in windows:
+        handle = PrecomputedPoint(curve, peer, window)
+        start = time.perf_counter()
+        handle.build()
+        build = time.perf_counter() - start
+        elapsed = _time(lambda: [handle.mult(k) for k in scalars], 1, 3) / number
+        even = "%d" % -(-build // (plain - elapsed)) if elapsed < plain else "never"
+        print("%8d %10.1f %10.1f %10.1f %10s" % (window, build * 1e3, handle.nbytes / 1024, elapsed * 1e6, even))
+
+
+def ecdsa_benchmark(curve, name, number=200, pool_size=256):
+    """
+    ECDSA 签名延迟：RFC 6979 与从 NoncePool 取预计算的 nonce（池预先填满，只计热路径），以及池的补充速度。
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param number: 签名次数
+    :param pool_size: 池的容量
+    :return:
+    """
+    rng = random.Random(0)
+    private = rng.randrange(1, curve.n)
+    messages = [b"message %d" % i for i in range(number)]
+    deterministic = ECDSA(curve, private)
+
+    pool = NoncePool(curve, size=max(pool_size, number), start=False)
+    start = time.perf_counter()
+    pool.fill()
+    fill = (time.perf_counter() - start) / pool.size
+    pooled = ECDSA(curve, private, nonce_pool=pool)
+
+    print(name, "ECDSA (us/op)")
+    start = time.perf_counter()
+    for message in messages:
+        pooled.sign(message)
+    print("%18s %10.1f" % ("sign (pool)", (time.perf_counter() - start) / number * 1e6))
+    print("%18s %10.1f" % ("sign (rfc 6979)", _time(lambda: [deterministic.sign(m) for m in messages[:20]], 1, 3) / 20 * 1e6))
+    print("%18s %10.1f" % ("pool refill", fill * 1e6))
+    print("%18s %s" % ("pool", pool.stats()))
+    pool.close()
+
+
+def ephemeral_benchmark(curve, name, number=200, bursts=8, burst_size=48, idle=0.1):
+    """
+    临时密钥对的取用延迟：从预先填满的 EphemeralKeyPool 取出与同步生成；
+    再模拟突发请求（每次突发取 burst_size 对，之间空闲 idle 秒，后台线程在空闲时补充），打印池的统计。
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param number: 取用次数
+    :param bursts: 突发次数
+    :param burst_size: 每次突发取用的个数
+    :param idle: 突发之间的空闲秒数
+    :return:
+    """
+    pool = EphemeralKeyPool(curve, size=number, start=False)
+    pool.fill()
+    start = time.perf_counter()
+    for _ in range(number):
+        pool.keypair()
+    hit = (time.perf_counter() - start) / number
+
+    print(name, "ephemeral key pair (us/op)")
+    print("%18s %10.1f" % ("keypair (pool)", hit * 1e6))
+    print("%18s %10.1f" % ("keypair (inline)", _time(lambda: generate_keypairs(curve, 20), 1, 3) / 20 * 1e6))
+
+    with EphemeralKeyPool(curve, size=64, low_water=16, batch=16) as pool:
+        pool.fill()
+        latencies = []
+        for _ in range(bursts):
+            for _ in range(burst_size):
+                start = time.perf_counter()
+                pool.keypair()
+                latencies.append(time.perf_counter() - start)
+            time.sleep(idle)
+        latencies.sort()
+        print("%18s %10.1f" % ("burst p50", latencies[len(latencies) // 2] * 1e6))
+        print("%18s %10.1f" % ("burst p99", latencies[int(len(latencies) * 0.99)] * 1e6))
+        print("%18s %s" % ("pool", pool.stats()))
+
+
+def pool_benchmark(workers_list, total=2048, chunk_size=128):
+    """
+    ECDHPool 的吞吐量（每秒 ECDH 次数）随工作进程数的变化，任务为 P-256 上的随机 ECDH。
+    :param workers_list: 要测试的进程数
+    :param total: 任务数
+    :param chunk_size:
+    :return:
+    """
+    rng = random.Random(0)
+    peers = [ECC_P256.mult(rng.randrange(1, ECC_P256.n), ECC_P256.g) for _ in range(16)]
+    tasks = [(rng.randrange(1, ECC_P256.n), peers[i % len(peers)], "P-256") for i in range(total)]
+
+    print("ECDHPool throughput (P-256 ecdh/s)")
+    for workers in workers_list:
+        with ECDHPool(workers, chunk_size=chunk_size, serial_threshold=0) as pool:
+            list(pool.map(tasks[:workers]))     # 启动工作进程，不计入耗时
+            start = time.perf_counter()
+            for _ in pool.map(tasks):
+                pass
+            elapsed = time.perf_counter() - start
+        print("%8d workers %12.1f" % (workers, total / elapsed))
+
+
+def instrument_benchmark(curve, name, number=20, rounds=5):
+    """
+    打印 mult / mult_base / ecdh_x / mult2 平均每次调用的运算次数，并比较 mult 的耗时：
+    从未启用过计数、启用过一次并退出（disabled）、只计数（counting）、计数并计时（timing）。
+    before 与 disabled 交替测量 rounds 轮以减小机器噪声的影响。
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param number: 每轮 mult 的次数
+    :param rounds:
+    :return: {"before": 秒, "disabled": 秒, "counting": 秒, "timing": 秒}
+    """
+    rng = random.Random(0)
+    peer = curve.mult(rng.randrange(1, curve.n), curve.g)
+    scalars = [rng.randrange(1, curve.n) for _ in range(number)]
+
+    def run():
+        for k in scalars:
+            curve.mult(k, peer)
+
+    with Instrumentation(curve) as stats:
+        curve.mult(scalars[0], peer)
+        curve.mult_base(scalars[0])
+        curve.ecdh_x(scalars[0], peer[0])
+        curve.mult2(scalars[0], curve.g, scalars[1], peer)
+    print(name, "operations per call")
+    for method in ("mult", "mult_base", "ecdh_x", "mult2"):
+        counts = stats.per_call(method)
+        note = " (estimated)" if method in stats.estimated else ""
+        print("%12s %s%s" % (method, " ".join("%s %d" % item for item in counts.items()), note))
+
+    before = _time(run, 1, 3)
+    disabled = _time(run, 1, 3)
+    for _ in range(rounds - 1):
+        before = min(before, _time(run, 1, 1))
+        with Instrumentation(curve):
+            pass
+        # 退出后实例上不应残留任何包装
+        assert not any(callable(value) for value in vars(curve).values())
+        disabled = min(disabled, _time(run, 1, 1))
+    with Instrumentation(curve):
+        counting = _time(run, 1, 3)
+    with Instrumentation(curve, timing=True):
+        timing = _time(run, 1, 3)
+
+    results = {"before": before, "disabled": disabled, "counting": counting, "timing": timing}
+    print(name, "mult with instrumentation (us/op, overhead vs before)")
+    for label, elapsed in results.items():
+        print("%12s %10.1f %+7.1f%%" % (label, elapsed / number * 1e6, (elapsed / before - 1) * 100))
+    return results
+
+
+def agree_benchmark(total=2048, max_batch=64, max_delay=0.002):
+    """
+    AsyncECDH 的吞吐量与 p50 / p99 延迟。所有请求同时提交，另有一个每毫秒唤醒一次的任务测量事件循环的最大停顿。
+    :param total: 请求数
+    :param max_batch:
+    :param max_delay:
+    :return:
+    """
+    rng = random.Random(0)
+    peers = [ECC_P256.mult(rng.randrange(1, ECC_P256.n), ECC_P256.g) for _ in range(16)]
+    tasks = [(rng.randrange(1, ECC_P256.n), peers[i % len(peers)]) for i in range(total)]
+
+    async def run():
+        stall = 0.0
+        done = asyncio.Event()
+
+        async def ticker():
+            nonlocal stall
+            while not done.is_set():
+                start = time.perf_counter()
+                await asyncio.sleep(0.001)
+                stall = max(stall, time.perf_counter() - start - 0.001)
+
+        async with AsyncECDH("P-256", max_batch=max_batch, max_delay=max_delay) as service:
+            await service.agree(*tasks[0])      # 启动工作进程，不计入耗时
+            probe = asyncio.create_task(ticker())
+            start = time.perf_counter()
+            await asyncio.gather(*(service.agree(private, peer) for private, peer in tasks))
+            elapsed = time.perf_counter() - start
+            done.set()
+            await probe
+            return elapsed, stall, service.stats()
+
+    elapsed, stall, stats = asyncio.run(run())
+    print("AsyncECDH (P-256, %d requests, max_batch %d)" % (total, max_batch))
+    print("%18s %10.1f" % ("agree/s", total / elapsed))
+    print("%18s %10.1f" % ("mean batch", stats["mean_batch"]))
+    print("%18s %10.1f ms" % ("p50", stats["p50"] * 1e3))
+    print("%18s %10.1f ms" % ("p99", stats["p99"] * 1e3))
+    print("%18s %10.1f ms" % ("max loop stall", stall * 1e3))
+
+
+def vector_benchmark(curve, name, sizes):
+    """
+    比较 vectorized.VectorCurve 与逐个调用 mult 的耗时，找出向量化开始更快的批大小。
+    :param curve:
+    :param name: 曲线名称，用于打印
+    :param sizes: 要测试的批大小
+    :return: 向量化更快的最小批大小，都不更快时为 None
+    """
+    try:
+        from vectorized import VectorCurve
+    except ImportError:
+        print(name, "vectorized: numpy not installed")
+        return None
+    vector = VectorCurve(curve, min_batch=0)
+    rng = random.Random(0)
+    peer = curve.mult(rng.randrange(1, curve.n), curve.g)
+    crossover = None
+
+    print(name, "vectorized vs scalar (us/op)")
+    for size in sizes:
+        scalars = [rng.randrange(1, curve.n) for _ in range(size)]
+        pairs = [(k, peer) for k in scalars]
+        assert vector.mult_base(scalars[:8]) == [curve.mult(k, curve.g) for k in scalars[:8]]
+        cases = [
+            ("mult_base", lambda: [curve.mult(k, curve.g) for k in scalars], lambda: vector.mult_base(scalars)),
+            ("mult", lambda: curve.mult_many(pairs), lambda: vector.mult_many(pairs)),
+        ]
+        for label, scalar_func, vector_func in cases:
+            scalar = _time(scalar_func, 1, 3) / size
+            vectorized = _time(vector_func, 1, 3) / size
+            if label == "mult_base" and vectorized < scalar and crossover is None:
+                crossover = size
+            print("%8d %10s scalar %10.1f vectorized %10.1f" % (size, label, scalar * 1e6, vectorized * 1e6))
+    print(name, "vectorized mult_base faster from batch size:", crossover or "none of %s" % list(sizes))
+    return crossover
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="ECC benchmark with known-answer checks")
+    parser.add_argument("--save", metavar="JSON", help="write results to a JSON baseline")
+    parser.add_argument("--compare", metavar="JSON", help="fail if slower than this baseline")
+    parser.add_argument("--threshold", type=float, default=0.2,
+                        help="allowed slowdown ratio in compare mode (default 0.2 = 20%%)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing rounds, the fastest is kept")
+    parser.add_argument("--scale", type=int, default=1, help="multiply the calls per round")
+    parser.add_argument("--micro", action="store_true",
+                        help="also run field, backend, mult_many, SEC1, key cache, point type, precomputed point, ECDSA and ephemeral key pool micro-benchmarks")
+    parser.add_argument("--pool", metavar="N,N,...", help="also run the ECDHPool benchmark for these worker counts")
+    parser.add_argument("--instrument", action="store_true",
+                        help="also print operation counts per call and the instrumentation overhead")
+    parser.add_argument("--agree", metavar="N", type=int, help="also run the AsyncECDH benchmark with N requests")
+    parser.add_argument("--vector", metavar="N,N,...",
+                        help="also compare the NumPy vectorized engine with scalar mult at these batch sizes")
+    args = parser.parse_args(argv)
+
+    print("known answers ok:", check_known_answers())
+
+    results = run_benchmarks(args.repeat, args.scale)
+    for key, elapsed in sorted(results.items()):
+        print("%24s %12.1f us" % (key, elapsed * 1e6))
+
+    if args.micro:
+        field_benchmark(ECC_P192, "P-192")
+        field_benchmark(ECC_P256, "P-256")
+        backend_benchmark(p192, "P-192")
+        backend_benchmark(p256, "P-256")
+        mult_many_benchmark(ECC_P192, "P-192")
+        mult_many_benchmark(ECC_P256, "P-256")
+        sec1_benchmark(ECC_P192, "P-192")
+        sec1_benchmark(ECC_P256, "P-256")
+        key_cache_benchmark(ECC_P192, "P-192")
+        key_cache_benchmark(ECC_P256, "P-256")
+        point_benchmark(ECC_P192, "P-192")
+        point_benchmark(ECC_P256, "P-256")
+        precomputed_benchmark(ECC_P192, "P-192")
+        precomputed_benchmark(ECC_P256, "P-256")
+        ecdsa_benchmark(ECC_P192, "P-192")
+        ecdsa_benchmark(ECC_P256, "P-256")
+        ephemeral_benchmark(ECC_P192, "P-192")
+        ephemeral_benchmark(ECC_P256, "P-256")
+    if args.pool:
+        pool_benchmark([int(n) for n in args.pool.split(",")])
+    if args.instrument:
+        instrument_benchmark(ECC_P192, "P-192")
+        instrument_benchmark(ECC_P256, "P-256")
+    if args.agree:
+        agree_benchmark(args.agree)
+    if args.vector:
+        sizes = [int(n) for n in args.vector.split(",")]
+        vector_benchmark(ECC_P192, "P-192", sizes)
+        vector_benchmark(ECC_P256, "P-256", sizes)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump({
+                "python": platform.python_version(),
+                "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "results": results,
+            }, f, indent=2, sort_keys=True)
+        print("saved", args.save)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.threshold)
+        for key, old, elapsed in regressions:
+            print("REGRESSION %s: %.1f us -> %.1f us (+%.0f%%)"
+                  % (key, old * 1e6, elapsed * 1e6, (elapsed / old - 1) * 100))
+        if regressions:
+            return 1
+        print("no regression beyond %.0f%%" % (args.threshold * 100))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+"""
+多进程批量 ECDH
+
+EllipticCurve.mult 是纯 Python 计算，受 GIL 限制只能用到一个核。
+ECDHPool 把 (私钥, 对方公钥, 曲线名称) 的序列按块分发到 ProcessPoolExecutor，
+每个工作进程只在启动时构建一次曲线，结果按输入顺序流式返回：
+
+    with ECDHPool(workers=8) as pool:
+        for shared in pool.map(tasks):
+            ...
+"""
+import collections
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from curves import available_curves, get_curve
+
+
+def _init_worker():
+    # 每个工作进程启动时构建一次所有曲线
+    for name in available_curves():
+        get_curve(name)
+
+
+def ecdh_chunk(chunk):
+    """
+    计算一块任务的共享点 private * peer，同一条曲线上的任务通过 mult_many 一起计算。
+    :param chunk: [(private, peer, curve_name), ...]
+    :return: 共享点列表，顺序与 chunk 相同
+    """
+    groups = collections.defaultdict(list)
+    for index, (private, peer, name) in enumerate(chunk):
+        groups[name].append((index, private, peer))
+
+    result = [None] * len(chunk)
+    for name, items in groups.items():
+        shared = get_curve(name).mult_many([(private, peer) for _, private, peer in items])
+        for (index, _, _), dot in zip(items, shared):
+            result[index] = dot
+    return result
+
+
+def _chunked(iterable, size):
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class ECDHPool:
+    """
+    批量 ECDH 进程池。
+    """
+
+    def __init__(self, workers=None, chunk_size=256, serial_threshold=64, max_pending=None):
+        """
+        :param workers: 工作进程数，默认为 CPU 核数
+        :param chunk_size: 每次分发给工作进程的任务数
+        :param serial_threshold: 任务总数不超过该值时直接在当前进程计算，不使用进程池
+        :param max_pending: 同时在途的块数，默认为 workers 的 2 倍，限制内存占用
+        """
+        self.workers = workers or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+        self.serial_threshold = serial_threshold
+        self.max_pending = max_pending or 2 * self.workers
+        self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def map(self, tasks):
+        """
+        计算每个任务的共享点，按输入顺序逐个返回（生成器）。
+        :param tasks: (private, peer, curve_name) 的可迭代对象，curve_name 为 "P-192" 或 "P-256"
+        :return:
+        """
+        tasks = iter(tasks)
+        head = list(itertools.islice(tasks, self.serial_threshold + 1))
+        if len(head) <= self.serial_threshold:
+            yield from ecdh_chunk(head)
+            return
+
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+
+        pending = collections.deque()
+        for chunk in _chunked(itertools.chain(head, tasks), self.chunk_size):
+            pending.append(self._executor.submit(ecdh_chunk, chunk))
+            if len(pending) >= self.max_pending:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def ecdh_batch(tasks, workers=None, chunk_size=256, serial_threshold=64):
+    """
+    使用临时进程池计算一批 ECDH，按输入顺序返回共享点（生成器）。
+    长期运行的服务应复用 ECDHPool，避免每次重新启动工作进程。
+    :param tasks: (private, peer, curve_name) 的可迭代对象
+    :param workers:
+    :param chunk_size:
+    :param serial_threshold:
+    :return:
+    """
+    with ECDHPool(workers, chunk_size, serial_threshold) as pool:
+        yield from pool.map(tasks)
@@ -0,0 +1,171 @@
+"""
+ECDSA 签名与验签
+
+签名：e 为消息摘要（取左边 bits(n) 位），选取 nonce k，
+    r = (k * G).x mod n
+    s = k^-1 * (e + r * d) mod n
+验签：w = s^-1，u1 = e * w，u2 = r * w，检查 (u1 * G + u2 * Q).x mod n == r，使用 mult2 交错计算。
+
+默认的 nonce 按 RFC 6979 由私钥和摘要确定性地生成，不依赖随机数发生器的质量，但每次签名都要做一次 k * G。
+签名延迟敏感时可以使用 NoncePool：后台线程预先计算 (k, k^-1, r) 并放入有界的池中，
+签名时从池中取出一组，只剩几次模 n 乘法：
+
+    pool = NoncePool(curve, size=256, low_water=64)
+    signer = ECDSA(curve, private, nonce_pool=pool)
+    r, s = signer.sign(message)
+    ...
+    pool.close()
+
+池中的 k 是随机数（k 与消息无关才能预先计算），池为空时回退到 RFC 6979。
+(k, k^-1, r) 与私钥无关，一个池可以被同一条曲线上的多个 ECDSA 对象共享；每组只会被取出一次。
+不要在 fork 之后的子进程中继续使用父进程的池，否则两个进程可能用同一个 k 签名，从而泄露私钥。
+"""
+import hashlib
+import hmac
+import secrets
+
+from pool import BackgroundPool
+
+
+def bits2int(data, qlen):
+    """取字节串最左边的 qlen 位转换为整数（RFC 6979 2.3.2）"""
+    value = int.from_bytes(data, 'big')
+    excess = len(data) * 8 - qlen
+    return value >> excess if excess > 0 else value
+
+
+def rfc6979_nonces(n, private, digest, hashfunc=hashlib.sha256):
+    """
+    按 RFC 6979 3.2 依次生成候选 nonce k (1 <= k < n)，生成器。
+    :param n: 基点的阶
+    :param private: 私钥
+    :param digest: 消息摘要
+    :param hashfunc: HMAC 使用的 hashlib 构造函数
+    :return:
+    """
+    qlen = n.bit_length()
+    rlen = (qlen + 7) // 8
+    x = private.to_bytes(rlen, 'big')
+    h1 = (bits2int(digest, qlen) % n).to_bytes(rlen, 'big')
+
+    size = hashfunc().digest_size
+    v = b'\x01' * size
+    k = b'\x00' * size
+    k = hmac.new(k, v + b'\x00' + x + h1, hashfunc).digest()
+    v = hmac.new(k, v, hashfunc).digest()
+    k = hmac.new(k, v + b'\x01' + x + h1, hashfunc).digest()
+    v = hmac.new(k, v, hashfunc).digest()
+    while True:
+        t = b''
+        while len(t) < rlen:
+            v = hmac.new(k, v, hashfunc).digest()
+            t += v
+        candidate = bits2int(t, qlen)
+        if 1 <= candidate < n:
+            yield candidate
+        k = hmac.new(k, v + b'\x00', hashfunc).digest()
+        v = hmac.new(k, v, hashfunc).digest()
+
+
+def generate_nonces(curve, count):
+    """
+    生成 count 组随机的 (k, k^-1 mod n, r)，一批的 k^-1 通过 curve.inverse_batch 只求一次逆；r 为 0 的组被丢弃。
+    :param curve: EllipticCurve
+    :param count:
+    :return:
+    """
+    n = curve.n
+    ks = [secrets.randbelow(n - 1) + 1 for _ in range(count)]
+    rs = [curve.mult_base(k)[0] % n for k in ks]
+    invs = curve.inverse_batch(ks, n)
+    return [(k, int(inv), r) for k, inv, r in zip(ks, invs, rs) if r]
+
+
+class NoncePool(BackgroundPool):
+    """
+    后台线程预计算的 (k, k^-1 mod n, r) 池，见 pool.BackgroundPool。
+    take() 取出一组 (k, k^-1, r)，池为空时返回 None。
+    """
+
+    name = 'ecdsa-nonce-pool'
+    generate = staticmethod(generate_nonces)
+
+
+class ECDSA:
+    """
+    基于 EllipticCurve 的 ECDSA
+    """
+
+    def __init__(self, curve, private=None, public=None, hashfunc=hashlib.sha256, nonce_pool=None):
+        """
+        :param curve: EllipticCurve，例如 curves.get_curve('P-256')
+        :param private: 私钥 d，签名时需要
+        :param public: 公钥 Q，验签时需要；只给出 private 时由 private * G 计算
+        :param hashfunc: 消息摘要使用的 hashlib 构造函数，RFC 6979 的 HMAC 也使用它
+        :param nonce_pool: NoncePool，不给出时所有签名都使用 RFC 6979
+        """
+        if private is not None and not 0 < private < curve.n:
+            raise ValueError('private key out of range')
+        if public is None and private is not None:
+            public = curve.mult_base(private)
+        if nonce_pool is not None and nonce_pool.curve is not curve:
+            raise ValueError('nonce pool belongs to another curve')
+        self.curve = curve
+        self.private = private
+        self.public = public
+        self.hashfunc = hashfunc
+        self.nonce_pool = nonce_pool
+
+    def sign(self, message):
+        """
+        :param message: bytes
+        :return: (r, s)
+        """
+        return self.sign_digest(self.hashfunc(message).digest())
+
+    def sign_digest(self, digest):
+        """
+        对已经计算好的摘要签名
+        :param digest:
+        :return: (r, s)
+        """
+        if self.private is None:
+            raise ValueError('private key required for signing')
+        n = self.curve.n
+        e = bits2int(digest, n.bit_length())
+        if self.nonce_pool is not None:
+            item = self.nonce_pool.take()
+            if item is not None:
+                _, inv, r = item
+                s = inv * (e + r * self.private) % n
+                if s:
+                    return r, s
+
+        for k in rfc6979_nonces(n, self.private, digest, self.hashfunc):
+            r = self.curve.mult_base(k)[0] % n
+            if r == 0:
+                continue
+            s = int(self.curve.backend.inv(k, n)) * (e + r * self.private) % n
+            if s:
+                return r, s
+
+    def verify(self, message, signature):
+        return self.verify_digest(self.hashfunc(message).digest(), signature)
+
+    def verify_digest(self, digest, signature):
+        """
+        :param digest:
+        :param signature: (r, s)
+        :return: 签名是否有效
+        """
+        if self.public is None:
+            raise ValueError('public key required for verification')
+        curve = self.curve
+        n = curve.n
+        r, s = signature
+        if not (0 < r < n and 0 < s < n):
+            return False
+        e = bits2int(digest, n.bit_length())
+        w = int(curve.backend.inv(s, n))
+        dot = curve.mult2(e * w % n, curve.g, r * w % n, self.public)
+        return dot is not None and dot[0] % n == r
@@ -0,0 +1,77 @@
+"""
+ecdsa.py 测试：python ecdsa_test.py
+"""
+import hashlib
+
+from curves import get_curve
+from ecdsa import ECDSA, NoncePool, generate_nonces, rfc6979_nonces
+
+# RFC 6979 A.2.5，P-256 / SHA-256，消息 "sample"
+P256_PRIVATE = 0xC9AFA9D845BA75166B5C215767B1D6934E50C3DB36E89B127B8A622B120F6721
+P256_SAMPLE_K = 0xA6E3C57DD01ABE90086538398355DD4C3B17AA873382B0F24D6129493D8AAD60
+P256_SAMPLE_R = 0xEFD48B2AACB6A8FD1140DD9CD45E81D69D2C877B56AAF991C34D0EA84EAF3716
+P256_SAMPLE_S = 0xF7CB1C942D657C41D436C7A1B6E29F65F3E900DBB9AFF4064DC4AB2F843ACDA8
+
+
+def rfc6979_test():
+    """确定性 nonce 与签名和 RFC 6979 的向量一致"""
+    curve = get_curve('P-256')
+    digest = hashlib.sha256(b'sample').digest()
+    assert next(rfc6979_nonces(curve.n, P256_PRIVATE, digest)) == P256_SAMPLE_K
+    signer = ECDSA(curve, P256_PRIVATE)
+    assert signer.sign(b'sample') == (P256_SAMPLE_R, P256_SAMPLE_S)
+    assert signer.verify(b'sample', (P256_SAMPLE_R, P256_SAMPLE_S))
+
+
+def verify_rejects_test():
+    """消息、r、s 被改动或超出范围的签名验签失败"""
+    for name in ('P-192', 'P-256'):
+        curve = get_curve(name)
+        signer = ECDSA(curve, 0x1234567)
+        r, s = signer.sign(b'message')
+        assert signer.verify(b'message', (r, s))
+        assert not signer.verify(b'messagf', (r, s))
+        assert not signer.verify(b'message', (r, s + 1))
+        assert not signer.verify(b'message', (r + 1, s))
+        assert not signer.verify(b'message', (0, s))
+        assert not signer.verify(b'message', (r, curve.n))
+        assert not ECDSA(curve, public=curve.mult(7, curve.g)).verify(b'message', (r, s))
+
+
+def generate_nonces_test():
+    """预计算的 (k, k^-1, r) 满足 k * k^-1 == 1 且 r == (k * G).x mod n"""
+    for name in ('P-192', 'P-256'):
+        curve = get_curve(name)
+        n = curve.n
+        for k, inv, r in generate_nonces(curve, 8):
+            assert k * inv % n == 1
+            assert r == curve.mult(k, curve.g)[0] % n
+
+
+def nonce_pool_test():
+    """池中的 nonce 签名可以验签，每组只用一次，池为空时回退到 RFC 6979"""
+    curve = get_curve('P-256')
+    with NoncePool(curve, size=4, start=False) as pool:
+        pool.fill()
+        signer = ECDSA(curve, P256_PRIVATE, nonce_pool=pool)
+        signatures = [signer.sign(b'sample') for _ in range(5)]
+        assert all(signer.verify(b'sample', signature) for signature in signatures)
+        assert len(set(signatures[:4])) == 4
+        assert signatures[4] == (P256_SAMPLE_R, P256_SAMPLE_S)
+        stats = pool.stats()
+        assert stats['hits'] == 4 and stats['misses'] == 1, stats
+
+        try:
+            ECDSA(get_curve('P-192'), 0x1234567, nonce_pool=pool)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('mismatched nonce pool accepted')
+
+
+if __name__ == '__main__':
+    rfc6979_test()
+    verify_rejects_test()
+    generate_nonces_test()
+    nonce_pool_test()
+    print('ecdsa ok')
@@ -0,0 +1,78 @@
+"""
+ECIES 密钥封装（KEM）
+
+发送方随机选取临时私钥 k，计算 R = k * G 和共享点 S = k * Q（Q 为接收方公钥），
+会话密钥为 HKDF-SHA256(S 的 x 坐标)，R 以 SEC1 编码（默认压缩格式）发送给接收方；
+接收方解码并校验 R 在曲线上后计算 S = d * R 得到同一个会话密钥。
+
+ECIESKem 提供 encapsulate / decapsulate，与 rsa/hybrid.py 的 RSAKem 接口相同，
+可以直接交给 hybrid.encrypt_stream / decrypt_stream 做大文件的流式加密。
+"""
+import secrets
+
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF
+
+
+class ECIESKem:
+    """
+    基于 EllipticCurve 的 ECIES 密钥封装
+    """
+
+    def __init__(self, curve, public=None, private=None, key_size=32, form='compressed', key_pool=None):
+        """
+        :param curve: EllipticCurve，例如 curves.get_curve('P-256')
+        :param public: 接收方公钥 Q，加密时需要；只给出 private 时由 private * G 计算
+        :param private: 接收方私钥 d，解密时需要
+        :param key_size: 会话密钥的字节数
+        :param form: 临时公钥 R 的 SEC1 编码格式，见 EllipticCurve.encode_point
+        :param key_pool: ephemeral.EphemeralKeyPool，给出时从池中取预先计算的 (k, R)，省去一次 k * G
+        """
+        if key_pool is not None and key_pool.curve is not curve:
+            raise ValueError('key pool belongs to another curve')
+        if public is None and private is not None:
+            public = curve.mult(private, curve.g)
+        self.curve = curve
+        self.public = public
+        self.private = private
+        self.key_size = key_size
+        self.form = form
+        self.key_pool = key_pool
+        self.coordinate_size = (curve.p.bit_length() + 7) // 8
+
+    def encapsulate(self):
+        """
+        :return: (会话密钥, 需要发送给接收方的封装数据)
+        """
+        if self.public is None:
+            raise ValueError('public key required for encapsulation')
+        curve = self.curve
+        if self.key_pool is not None:
+            k, ephemeral = self.key_pool.keypair()
+        else:
+            k = secrets.randbelow(curve.n - 1) + 1
+            ephemeral = curve.mult(k, curve.g)
+        header = curve.encode_point(ephemeral, self.form)
+        shared = curve.mult(k, self.public)
+        return self._derive(shared, header), header
+
+    def decapsulate(self, header):
+        """
+        :param header: encapsulate 返回的封装数据
+        :return: 会话密钥
+        """
+        if self.private is None:
+            raise ValueError('private key required for decapsulation')
+        # decode_point 拒绝不在曲线上的点，它们可能属于阶很小的另一条曲线，会泄露私钥（invalid curve attack）
+        dot = self.curve.decode_point(header)
+        if dot is None:
+            raise ValueError('invalid ephemeral public key')
+        shared = self.curve.mult(self.private, dot)
+        if shared is None:
+            raise ValueError('invalid ephemeral public key')
+        return self._derive(shared, header)
+
+    def _derive(self, shared, header):
+        secret = shared[0].to_bytes(self.coordinate_size, 'big')
+        return HKDF(secret, self.key_size, header, SHA256)
+
@@ -0,0 +1,47 @@
+"""
+ecies.py 测试：python ecies_test.py
+"""
+from curves import get_curve
+from ecies import ECIESKem
+
+
+def _expect_value_error(func, *args):
+    try:
+        func(*args)
+    except ValueError:
+        return
+    raise AssertionError('ValueError not raised')
+
+
+def round_trip_test():
+    """封装与解封装得到同一个会话密钥，每次封装的临时公钥不同"""
+    for name in ('P-192', 'P-256'):
+        curve = get_curve(name)
+        receiver = ECIESKem(curve, private=0x1234567)
+        sender = ECIESKem(curve, public=receiver.public)
+        for form in ('compressed', 'uncompressed'):
+            sender.form = form
+            key1, header1 = sender.encapsulate()
+            key2, header2 = sender.encapsulate()
+            assert len(key1) == 32 and key1 != key2 and header1 != header2
+            assert receiver.decapsulate(header1) == key1
+            assert receiver.decapsulate(header2) == key2
+
+
+def invalid_header_test():
+    """不在曲线上的临时公钥和无穷远点被拒绝；缺少密钥时抛出 ValueError"""
+    curve = get_curve('P-256')
+    receiver = ECIESKem(curve, private=0x1234567)
+    x, y = curve.mult(5, curve.g)
+    size = (curve.p.bit_length() + 7) // 8
+    off_curve = b'\x04' + x.to_bytes(size, 'big') + ((y + 1) % curve.p).to_bytes(size, 'big')
+    _expect_value_error(receiver.decapsulate, off_curve)
+    _expect_value_error(receiver.decapsulate, b'\x00')
+    _expect_value_error(ECIESKem(curve).encapsulate)
+    _expect_value_error(ECIESKem(curve, public=receiver.public).decapsulate, off_curve)
+
+
+if __name__ == '__main__':
+    round_trip_test()
+    invalid_header_test()
+    print('ecies ok')
@@ -0,0 +1,53 @@
+"""
+临时密钥对池
+
+ECDH 握手和 ECIES 封装每次都要生成一个临时密钥对 (k, k * G)，其中 k * G 是请求路径上最慢的一步。
+临时密钥对与对方无关，可以由后台线程（或工作进程）预先计算好放入有界的池中：
+
+    with EphemeralKeyPool(get_curve('P-256'), size=256, low_water=64) as pool:
+        private, public = pool.keypair()
+        shared = curve.mult(private, peer)
+
+keypair() 从池中取出一对，池为空时在当前线程中同步生成（记为 miss，即池没有跟上请求的速度）。
+每一对只会被取出一次，用过即丢弃，不要再放回池中或用于第二次握手。
+workers > 0 时在进程池中计算，适合多核机器上请求线程本身也很忙的情况；补充参数与统计见 pool.BackgroundPool。
+"""
+import secrets
+
+from pool import BackgroundPool
+
+
+def generate_keypairs(curve, count):
+    """
+    生成 count 个随机密钥对
+    :param curve: EllipticCurve
+    :param count:
+    :return: [(私钥, 公钥 (x, y)), ...]
+    """
+    n = curve.n
+    pairs = []
+    for _ in range(count):
+        private = secrets.randbelow(n - 1) + 1
+        pairs.append((private, curve.mult_base(private)))
+    return pairs
+
+
+class EphemeralKeyPool(BackgroundPool):
+    """
+    后台预计算的临时密钥对池，线程安全。
+    """
+
+    name = 'ephemeral-key-pool'
+    generate = staticmethod(generate_keypairs)
+
+    def keypair(self, block=False, timeout=None):
+        """
+        取出一个临时密钥对，池为空（或等待超时）时在当前线程中生成
+        :param block: 池为空时是否先等待后台补充，见 BackgroundPool.take
+        :param timeout: 最多等待的秒数
+        :return: (私钥, 公钥 (x, y))
+        """
+        pair = self.take(block, timeout)
+        if pair is None:
+            pair = generate_keypairs(self.curve, 1)[0]
+        return pair
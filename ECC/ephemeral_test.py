@@ -0,0 +1,73 @@
+"""
+ephemeral.py 测试：python ephemeral_test.py
+"""
+import threading
+
+from curves import get_curve
+from ecies import ECIESKem
+from ephemeral import EphemeralKeyPool, generate_keypairs
+
+
+def keypair_test():
+    """池中的密钥对满足 public == private * G，池为空时同步生成并记为 miss"""
+    for name in ('P-192', 'P-256'):
+        curve = get_curve(name)
+        for private, public in generate_keypairs(curve, 4):
+            assert 1 <= private < curve.n and curve.mult(private, curve.g) == public
+        with EphemeralKeyPool(curve, size=4, start=False) as pool:
+            assert pool.fill() == 4
+            for _ in range(6):
+                private, public = pool.keypair()
+                assert curve.mult(private, curve.g) == public
+            stats = pool.stats()
+            assert stats['hits'] == 4 and stats['misses'] == 2, stats
+
+
+def exactly_once_test():
+    """多个线程同时从后台补充的池中取用，每一对只被取出一次"""
+    curve = get_curve('P-192')
+    taken = []
+    lock = threading.Lock()
+    with EphemeralKeyPool(curve, size=32, low_water=8, batch=8) as pool:
+        def worker():
+            for _ in range(40):
+                pair = pool.take(block=True, timeout=30)
+                with lock:
+                    taken.append(pair)
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        stats = pool.stats()
+    assert None not in taken
+    assert len({private for private, _ in taken}) == len(taken) == 160
+    assert stats['hits'] == 160 and stats['misses'] == 0, stats
+
+
+def ecies_key_pool_test():
+    """ECIESKem 使用池中的临时密钥，拒绝其他曲线的池"""
+    curve = get_curve('P-256')
+    private = 0x1234567890abcdef
+    with EphemeralKeyPool(curve, size=4, start=False) as pool:
+        pool.fill()
+        kem = ECIESKem(curve, private=private, key_pool=pool)
+        key, header = kem.encapsulate()
+        assert kem.decapsulate(header) == key
+        assert pool.stats()['hits'] == 1
+
+    with EphemeralKeyPool(get_curve('P-192'), size=4, start=False) as other:
+        try:
+            ECIESKem(curve, private=private, key_pool=other)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('mismatched key pool accepted')
+
+
+if __name__ == '__main__':
+    keypair_test()
+    exactly_once_test()
+    ecies_key_pool_test()
+    print('ephemeral ok')
@@ -0,0 +1,270 @@
+"""
+EllipticCurve 的运算计数与计时（可选）
+
+    with Instrumentation(curve, timing=True) as stats:
+        curve.mult(k, peer)
+    print(stats.per_call('mult'))       # 平均每次 mult 的模乘、平方、求逆、点加、倍点次数
+    print(stats.to_json())
+
+进入 with 时在 curve 实例上用计数版本覆盖点运算方法（实例属性优先于类方法），并把 curve.backend 换成计数代理；
+退出时删除这些实例属性、恢复后端。没有启用时类和实例都不做任何改动，热路径没有额外开销（见 ecc_bench.py --instrument）。
+
+点公式中的模乘是直接写在方法里的整数运算，计数按每个公式实际走过的分支记入固定的模乘 / 平方次数；
+求逆和模幂通过后端代理如实计数。mult_many 与 ecdh_x 把公式内联在循环里，没有可以包装的调用点，
+它们的模乘、平方、点加、倍点次数是按标量的位数和汉明重量算出的估计值，不是实际执行的运算：
+用到估计值的入口方法记在 stats.estimated 中（export() 的 'estimated'）。
+mult、mult2、mult_base、mult_many、ecdh_x 等入口方法最外层的每次调用都会记一次，内部的嵌套调用不重复记。
+timing=True 时另外记录每种操作的耗时直方图（按 2 的幂分桶的纳秒数）。
+只统计进入 with 块的线程中的调用。其他线程（例如 ECDHPool、AsyncECDH 的工作线程）同时使用这条曲线时
+直接调用原方法和原后端，不计数，也不会与计数和嵌套深度竞争。
+"""
+import collections
+import json
+import threading
+import time
+
+COUNTERS = ('mul', 'sqr', 'inv', 'pow', 'point_add', 'point_double')
+
+# 入口方法，每次最外层调用都单独统计
+ENTRY_POINTS = ('mult', 'mult2', 'mult_base', 'mult_many', 'ecdh_x', 'add', 'is_order_n', 'decode_point')
+
+
+class OperationStats:
+    """
+    Instrumentation 收集的计数与耗时直方图
+    """
+
+    def __init__(self):
+        self.counts = dict.fromkeys(COUNTERS, 0)
+        # 入口方法 -> {'calls': 调用次数, 'mul': 合计, ...}
+        self.calls = {}
+        # 操作名 -> [次数, 总纳秒数, Counter(桶 -> 次数)]，桶 b 表示耗时在 [2^(b-1), 2^b) 纳秒
+        self.histograms = {}
+        # 计数中含有估计值（而不是实际执行的运算）的入口方法
+        self.estimated = set()
+
+    def per_call(self, method):
+        """
+        :param method: 入口方法名，例如 'mult'
+        :return: 平均每次调用的各项计数，没有调用过时为 None
+        """
+        totals = self.calls.get(method)
+        if not totals:
+            return None
+        return {key: totals[key] / totals['calls'] for key in COUNTERS}
+
+    def export(self):
+        """
+        :return: 可以 JSON 序列化的字典
+        """
+        histograms = {}
+        for op, (count, total_ns, buckets) in sorted(self.histograms.items()):
+            histograms[op] = {
+                'count': count,
+                'mean_ns': total_ns / count,
+                'buckets': {str(1 << bucket): buckets[bucket] for bucket in sorted(buckets)},
+            }
+        return {
+            'counts': dict(self.counts),
+            'calls': {method: dict(totals) for method, totals in sorted(self.calls.items())},
+            'estimated': sorted(self.estimated),
+            'histograms': histograms,
+        }
+
+    def to_json(self, **kwargs):
+        return json.dumps(self.export(), **kwargs)
+
+    def _record_time(self, op, elapsed_ns):
+        entry = self.histograms.get(op)
+        if entry is None:
+            entry = self.histograms[op] = [0, 0, collections.Counter()]
+        entry[0] += 1
+        entry[1] += elapsed_ns
+        entry[2][elapsed_ns.bit_length()] += 1
+
+
+class _CountingBackend:
+    """后端代理：统计进入 with 块的线程中的求逆、模幂、平方根，其余属性转发给原后端"""
+
+    def __init__(self, backend, instrumentation):
+        self._backend = backend
+        self._instrumentation = instrumentation
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
+
+    def _call(self, label, func, args, **amounts):
+        if threading.get_ident() != self._instrumentation._owner:
+            return func(*args)
+        return self._instrumentation._call(label, func, args, **amounts)
+
+    def inv(self, x, p):
+        return self._call('inv', self._backend.inv, (x, p), inv=1)
+
+    def pow(self, x, e, p):
+        return self._call('pow', self._backend.pow, (x, e, p), pow=1)
+
+    def sqrt(self, x, p):
+        return self._call('sqrt', self._backend.sqrt, (x, p), pow=1)
+
+    def mul(self, x, y, p):
+        return self._call('mul', self._backend.mul, (x, y, p), mul=1)
+
+    def sqr(self, x, p):
+        return self._call('sqr', self._backend.sqr, (x, p), sqr=1)
+
+
+class Instrumentation:
+    """
+    在 with 块内统计一条 EllipticCurve 的运算，见模块说明。
+    """
+
+    def __init__(self, curve, timing=False):
+        """
+        :param curve: EllipticCurve
+        :param timing: 是否记录每种操作的耗时直方图
+        """
+        self.curve = curve
+        self.timing = timing
+        self.stats = OperationStats()
+        self._depth = 0
+        self._estimates = 0
+        self._owner = None
+        self._backend = None
+        self._patched = []
+
+    def __enter__(self):
+        curve = self.curve
+        if isinstance(curve.backend, _CountingBackend):
+            raise RuntimeError('curve is already instrumented')
+        self._owner = threading.get_ident()
+        double_cost = (3, 5) if curve.a_is_minus_3 else (4, 6)
+
+        def jacobian_double(orig, jac):
+            if jac is not None and jac[1] != 0:
+                self._count(mul=double_cost[0], sqr=double_cost[1], point_double=1)
+            return orig(jac)
+
+        def jacobian_add_affine(orig, jac, dot):
+            if jac is None or dot is None:
+                return orig(jac, dot)
+            self._count(mul=3, sqr=1)
+            doubles = self.stats.counts['point_double']
+            result = orig(jac, dot)
+            # H = 0 时已经返回（P == -Q）或转为倍点（P == Q，由 _jacobian_double 计数）
+            if result is not None and self.stats.counts['point_double'] == doubles:
+                self._count(mul=5, sqr=2, point_add=1)
+            return result
+
+        def to_affine(orig, jac):
+            if jac is not None:
+                self._count(mul=3, sqr=1)
+            return orig(jac)
+
+        def batch_to_affine(orig, jacs):
+            count = sum(jac is not None for jac in jacs)
+            if count:
+                # inverse_mod_batch 3(k - 1) 次模乘，每个点再 3 次模乘 1 次平方
+                self._count(mul=3 * (count - 1) + 3 * count, sqr=count)
+            return orig(jacs)
+
+        def add(orig, dot1, dot2):
+            if dot1 is not None and dot2 is not None and dot1[0] == dot2[0]:
+                if dot1[1] == dot2[1]:
+                    self._count(mul=2, sqr=2, inv=1, point_double=1)
+            elif dot1 is not None and dot2 is not None:
+                self._count(mul=2, sqr=1, inv=1, point_add=1)
+            return orig(dot1, dot2)
+
+        def ecdh_x(orig, private, peer_x):
+            result = orig(private, peer_x)
+            if private % curve.n:
+                steps = curve.n.bit_length()
+                # 初始化 3M 2S；每一步差分加法 8M 1S、倍点 7M 3S；最后 1M
+                self._count(mul=3 + 15 * steps + 1, sqr=2 + 4 * steps, point_add=steps, point_double=steps)
+                self._estimates += 1
+            return result
+
+        def mult_many(orig, pairs):
+            if len(pairs) >= curve.mult_many_min_batch:
+                # 仿射坐标同步计算：每次倍点 2M 2S、每次加法 2M 1S，再加共享求逆的 3 次模乘
+                for n, dot in pairs:
+                    n = abs(n)
+                    if dot is None or n % curve.n == 0:
+                        continue
+                    doubles, adds = n.bit_length() - 1, bin(n).count('1') - 1
+                    self._count(mul=5 * doubles + 5 * adds, sqr=2 * doubles + adds,
+                                point_add=adds, point_double=doubles)
+                self._estimates += 1
+            return orig(pairs)
+
+        hooks = {
+            '_jacobian_double': jacobian_double,
+            '_jacobian_add_affine': jacobian_add_affine,
+            '_to_affine': to_affine,
+            '_batch_to_affine': batch_to_affine,
+            'add': add,
+            'ecdh_x': ecdh_x,
+            'mult_many': mult_many,
+        }
+        for name in set(hooks) | set(ENTRY_POINTS):
+            self._patch(name, hooks.get(name))
+        self._backend = curve.backend
+        curve.backend = _CountingBackend(self._backend, self)
+        return self.stats
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        curve = self.curve
+        for name in self._patched:
+            delattr(curve, name)
+        self._patched = []
+        curve.backend = self._backend
+        self._backend = None
+        self._owner = None
+
+    def _patch(self, name, hook):
+        orig = getattr(self.curve, name)
+        entry = name in ENTRY_POINTS
+        label = name.lstrip('_')
+
+        def wrapper(*args):
+            if threading.get_ident() != self._owner:
+                return orig(*args)
+            if hook is None:
+                return self._call(label, orig, args, entry=entry)
+            return self._call(label, hook, (orig,) + args, entry=entry)
+
+        wrapper.__name__ = name
+        wrapper.__doc__ = orig.__doc__
+        setattr(self.curve, name, wrapper)
+        self._patched.append(name)
+
+    def _count(self, **amounts):
+        counts = self.stats.counts
+        for key, amount in amounts.items():
+            counts[key] += amount
+
+    def _call(self, label, func, args, entry=False, **amounts):
+        if amounts:
+            self._count(**amounts)
+        outermost = entry and self._depth == 0
+        if outermost:
+            before = dict(self.stats.counts)
+            estimates = self._estimates
+        self._depth += entry
+        start = time.perf_counter_ns() if self.timing else 0
+        try:
+            return func(*args)
+        finally:
+            if self.timing:
+                self.stats._record_time(label, time.perf_counter_ns() - start)
+            self._depth -= entry
+            if outermost:
+                totals = self.stats.calls.get(label)
+                if totals is None:
+                    totals = self.stats.calls[label] = dict.fromkeys(('calls',) + COUNTERS, 0)
+                totals['calls'] += 1
+                if self._estimates != estimates:
+                    self.stats.estimated.add(label)
+                for key in COUNTERS:
+                    totals[key] += self.stats.counts[key] - before[key]
@@ -0,0 +1,64 @@
+"""
+instrument.py 测试：python instrument_test.py
+"""
+import threading
+
+from curves import get_curve
+from instrument import Instrumentation
+
+
+def counts_test():
+    """计数不改变结果；mult 的计数是实际执行的运算，ecdh_x 与 mult_many 标为估计值；退出后不留包装"""
+    curve = get_curve('P-256')
+    peer = curve.mult(777, curve.g)
+    expected = curve.mult(12345, peer)
+    pairs = [(k, peer) for k in range(1, curve.mult_many_min_batch + 1)]
+    expected_many = [curve.mult(k, peer) for k, _ in pairs]
+    with Instrumentation(curve) as stats:
+        assert curve.mult(12345, peer) == expected
+        assert curve.ecdh_x(12345, peer[0]) == expected[0]
+        assert curve.mult_many(pairs) == expected_many
+    assert stats.calls['mult']['calls'] == 1
+    assert stats.per_call('mult')['point_double'] > 0 and stats.per_call('mult')['inv'] >= 1
+    assert stats.estimated == {'ecdh_x', 'mult_many'}, stats.estimated
+    assert stats.export()['estimated'] == ['ecdh_x', 'mult_many']
+    assert not any(callable(value) for value in vars(curve).values())
+    assert curve.mult(12345, peer) == expected
+
+
+def other_thread_test():
+    """其他线程同时使用这条曲线时不计数，计数与单独运行时相同，嵌套深度不受影响"""
+    curve = get_curve('P-192')
+    peer = curve.mult(99, curve.g)
+    scalars = list(range(1000, 1040))
+    expected = [curve.mult(k, peer) for k in scalars]
+    with Instrumentation(curve) as alone:
+        for k in scalars[:10]:
+            curve.mult(k, peer)
+    results = []
+    with Instrumentation(curve) as stats:
+        start = threading.Event()
+
+        def worker():
+            start.wait()
+            results.append([curve.mult(k, peer) for k in scalars])
+
+        threads = [threading.Thread(target=worker) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        start.set()
+        for k in scalars[:10]:
+            curve.mult(k, peer)
+        for thread in threads:
+            thread.join()
+        instrumentation_depth = curve.backend._instrumentation._depth
+    assert results == [expected] * 4
+    assert stats.calls['mult']['calls'] == 10, stats.calls['mult']
+    assert stats.counts == alone.counts, (stats.counts, alone.counts)
+    assert instrumentation_depth == 0
+
+
+if __name__ == '__main__':
+    counts_test()
+    other_thread_test()
+    print('instrument ok')
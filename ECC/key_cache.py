@@ -0,0 +1,136 @@
+"""
+已校验公钥的 LRU 缓存
+
+使用对方公钥之前需要解码、检查点在曲线上并检查 n * Q 为无穷远点，其中阶的检查和一次 ECDH 一样慢。
+对方通常长期使用同一个静态公钥，PublicKeyCache 按 (曲线名称, SEC1 编码) 缓存校验过的点，
+再次出现的公钥直接返回，不再校验：
+
+    cache = PublicKeyCache(maxsize=4096, table_threshold=16)
+    shared = cache.mult(curve, private, peer_bytes)
+
+命中次数达到 table_threshold 的热点公钥还会构建固定基预计算表（precomputed.PrecomputedPoint），
+之后与它的 ECDH 不再需要倍点。预计算表占用的内存较大，最多保留 max_tables 个，超出时丢弃最久未使用的表。
+所有方法都是线程安全的；校验和构建预计算表在锁外进行，不会阻塞其他线程。
+"""
+import collections
+import threading
+
+from precomputed import PrecomputedPoint
+
+
+class PublicKeyCache:
+    """
+    线程安全的已校验公钥 LRU 缓存。
+    """
+
+    def __init__(self, maxsize=1024, table_threshold=None, max_tables=16, table_window=4):
+        """
+        :param maxsize: 最多缓存的公钥个数
+        :param table_threshold: 同一个公钥命中多少次后为它构建预计算表，None 表示不构建
+        :param max_tables: 最多保留的预计算表个数
+        :param table_window: 预计算表的窗口宽度
+        """
+        self.maxsize = maxsize
+        self.table_threshold = table_threshold
+        self.max_tables = max_tables
+        self.table_window = table_window
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # (曲线名称, 编码) -> [点, 命中次数, PrecomputedPoint, 是否正在构建预计算表]
+        self._entries = collections.OrderedDict()
+        self._tables = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, curve, data):
+        """
+        返回公钥对应的已校验的点，不合法时抛出 ValueError（不合法的公钥不会被缓存）。
+        :param curve: EllipticCurve
+        :param data: 公钥的 SEC1 编码
+        :return: 点 (x, y)
+        """
+        return self._entry(curve, data)[0]
+
+    def mult(self, curve, private, data):
+        """
+        计算 private * 公钥，公钥有预计算表时使用预计算表。
+        :param curve:
+        :param private:
+        :param data: 公钥的 SEC1 编码
+        :return: 共享点
+        """
+        dot, _, table, _ = self._entry(curve, data)
+        if table is None:
+            return curve.mult(private, dot)
+        return table.mult(private)
+
+    def stats(self):
+        """
+        :return: 命中、未命中、淘汰次数，当前缓存的公钥个数和预计算表个数
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'size': len(self._entries),
+                'tables': len(self._tables),
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tables.clear()
+            self.hits = self.misses = self.evictions = 0
+
+    def _entry(self, curve, data):
+        key = curve.name or id(curve), bytes(data)
+        build = False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+            else:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                entry[1] += 1
+                if key in self._tables:
+                    self._tables.move_to_end(key)
+                # 达到阈值且没有预计算表（包括表被淘汰后）时构建，构建标记保证其他线程不会重复构建
+                build = (self.table_threshold is not None and entry[2] is None and not entry[3]
+                         and entry[1] >= self.table_threshold)
+                if build:
+                    entry[3] = True
+
+        if entry is None:
+            dot = curve.decode_point(data)
+            if dot is None or not curve.is_order_n(dot):
+                raise ValueError('invalid public key')
+            entry = [dot, 0, None, False]
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.maxsize:
+                    old, _ = self._entries.popitem(last=False)
+                    self._tables.pop(old, None)
+                    self.evictions += 1
+        elif build:
+            table = PrecomputedPoint(curve, entry[0], self.table_window)
+            try:
+                table.build()
+            except BaseException:
+                with self._lock:
+                    entry[3] = False
+                raise
+            with self._lock:
+                entry[3] = False
+                if key in self._entries:
+                    entry[2] = table
+                    self._tables[key] = entry
+                    while len(self._tables) > self.max_tables:
+                        _, cold = self._tables.popitem(last=False)
+                        cold[2] = None
+        return entry
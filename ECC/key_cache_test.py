@@ -0,0 +1,101 @@
+"""
+key_cache.py 测试：python key_cache_test.py
+"""
+from curves import get_curve
+from key_cache import PublicKeyCache
+
+
+def _expect_value_error(func, *args):
+    try:
+        func(*args)
+    except ValueError:
+        return
+    raise AssertionError('ValueError not raised')
+
+
+def cache_hit_test():
+    """两种 SEC1 编码各缓存一次，再次出现时命中"""
+    curve = get_curve('P-256')
+    dot = curve.mult(12345, curve.g)
+    cache = PublicKeyCache(maxsize=4)
+    for form in ('compressed', 'uncompressed'):
+        data = curve.encode_point(dot, form)
+        assert cache.get(curve, data) == dot
+        assert cache.get(curve, data) == dot
+    stats = cache.stats()
+    assert stats['hits'] == 2 and stats['misses'] == 2 and stats['size'] == 2, stats
+    assert cache.mult(curve, 7, curve.encode_point(dot)) == curve.mult(7, dot)
+
+
+def invalid_key_test():
+    """不在曲线上的点和无穷远点抛出 ValueError，且不被缓存"""
+    curve = get_curve('P-192')
+    x, y = curve.mult(99, curve.g)
+    size = (curve.p.bit_length() + 7) // 8
+    off_curve = b'\x04' + x.to_bytes(size, 'big') + ((y + 1) % curve.p).to_bytes(size, 'big')
+    cache = PublicKeyCache()
+    for data in (off_curve, b'\x00'):
+        _expect_value_error(cache.get, curve, data)
+        _expect_value_error(cache.get, curve, data)
+    stats = cache.stats()
+    assert stats['size'] == 0 and stats['hits'] == 0 and stats['misses'] == 4, stats
+
+
+def lru_test():
+    """超过 maxsize 时淘汰最久未使用的公钥"""
+    curve = get_curve('P-192')
+    keys = [curve.encode_point(curve.mult(k, curve.g)) for k in (2, 3, 5)]
+    cache = PublicKeyCache(maxsize=2)
+    cache.get(curve, keys[0])
+    cache.get(curve, keys[1])
+    cache.get(curve, keys[0])           # keys[1] 成为最久未使用的
+    cache.get(curve, keys[2])
+    assert cache.stats()['evictions'] == 1
+    misses = cache.stats()['misses']
+    cache.get(curve, keys[0])
+    assert cache.stats()['misses'] == misses
+    cache.get(curve, keys[1])
+    assert cache.stats()['misses'] == misses + 1
+
+
+def table_test():
+    """命中次数达到 table_threshold 后构建预计算表，结果不变；预计算表最多 max_tables 个"""
+    curve = get_curve('P-256')
+    dots = [curve.mult(k, curve.g) for k in (11, 13)]
+    keys = [curve.encode_point(dot) for dot in dots]
+    cache = PublicKeyCache(table_threshold=2, max_tables=1)
+    for _ in range(3):
+        assert cache.mult(curve, 12345, keys[0]) == curve.mult(12345, dots[0])
+    assert cache.stats()['tables'] == 1
+    for _ in range(3):
+        assert cache.mult(curve, 54321, keys[1]) == curve.mult(54321, dots[1])
+    assert cache.stats()['tables'] == 1
+    assert cache.mult(curve, 777, keys[0]) == curve.mult(777, dots[0])
+
+
+def table_rebuild_test():
+    """预计算表被淘汰的热点公钥再次命中时重新构建预计算表"""
+    curve = get_curve('P-192')
+    dots = [curve.mult(k, curve.g) for k in (17, 19, 23)]
+    keys = [curve.encode_point(dot) for dot in dots]
+    cache = PublicKeyCache(table_threshold=2, max_tables=2)
+    for data in keys:
+        for _ in range(3):
+            cache.get(curve, data)
+    # keys[0] 的表被 keys[2] 挤出
+    assert cache.stats()['tables'] == 2
+    assert (curve.name, keys[0]) not in cache._tables
+    cache.get(curve, keys[0])
+    assert (curve.name, keys[0]) in cache._tables
+    assert cache.stats()['tables'] == 2
+    assert cache.mult(curve, 4242, keys[0]) == curve.mult(4242, dots[0])
+    assert not any(entry[3] for entry in cache._entries.values())
+
+
+if __name__ == '__main__':
+    cache_hit_test()
+    invalid_key_test()
+    lru_test()
+    table_test()
+    table_rebuild_test()
+    print('key_cache ok')
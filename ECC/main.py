@@ -3,3 +3,5 @@ from p192 import *
 
 
 if __name__ == '__main__':
+    P192_data_set_1()
+    P256_data_set_1()
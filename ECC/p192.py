@@ -1,12 +1,25 @@
 import sys
 
+from backend import get_backend
+from curves import get_curve
+
+# ECC_P192 由模块的 __getattr__ 惰性构建，列在 __all__ 中 from p192 import * 才会绑定它
+__all__ = [
+    'EllipticCurve', 'inverse_mod', 'wnaf', 'inverse_mod_batch', 'P192_public_key_test', 'P192_data_set_1',
+    'P192_data_set_2', 'P192_data_set_3', 'P192_data_set_4', 'P192_data_set_5', 'P192_data_set_6',
+    'P192_data_set_7', 'P192_data_set_8', 'P192_data_set_9', 'P192_data_set_10', 'P192_PARAMS', 'ECC_P192',
+]
+
 
 class EllipticCurve:
     """
     ECC 加密算法测试代码
     """
 
-    def __init__(self, p, a, b, g, n):
+    # 批量小于该值时，mult_many 共享求逆省下的开销不足以抵消同步计算的额外开销（见 ecc_bench.py）
+    mult_many_min_batch = 64
+
+    def __init__(self, p, a, b, g, n, g_window=4, wnaf_window=4, name=None, validate=True, backend=None):
         """
         初始化椭圆曲线函数
         :param p: 素模P
@@ -14,17 +27,55 @@ class EllipticCurve:
         :param b:
         :param g: 椭圆曲线上的基点
         :param n: g的阶数
+        :param g_window: 基点预计算表的窗口宽度，越大越快，但表占用的内存按 2^w / w 增长
+        :param wnaf_window: 任意点倍点使用的 wNAF 窗口宽度 (>= 2)，每次计算需要 2^(w-2) 个奇数倍点
+        :param name: 曲线名称，例如 "P-256"
+        :param validate: 是否校验参数；内置的可信参数（curves.py）跳过校验，用户提供的曲线应当校验
+        :param backend: 大整数运算后端名称（见 backend.py），默认自动选择
         """
         self.p = p
         self.a = a
         self.b = b
         self.g = g
         self.n = n
-
-        assert pow(2, p - 1, p) == 1   # 判断 2**(p-1) % p == 1
-        assert (4 * a ** 3 + 27 * b ** 2) % p != 0  # 排除奇异曲线
-        assert self.is_on_curve(g)      # 判断g点是否在曲线上
-        assert self.mult(n, g) is None   # 判断 np == 0
+        self.name = name
+        self.g_window = g_window
+        self.wnaf_window = wnaf_window
+        self._g_table = None    # 基点预计算表，第一次使用时才构建
+        # NIST P-192 / P-256 都满足 a = -3 (mod p)，倍点可以使用更快的公式
+        self.a_is_minus_3 = a % p == p - 3
+        self.backend = get_backend(backend)
+        self._p = self.backend.mpz(p)   # 内部运算使用后端的数，结果再转换回 int
+
+        if validate:
+            self.validate()
+
+    def validate(self):
+        """
+        校验曲线参数，不满足时抛出 ValueError。
+        :return:
+        """
+        p, a, b = self.p, self.a, self.b
+        if self.backend.pow(2, p - 1, p) != 1:   # 判断 2**(p-1) % p == 1
+            raise ValueError('p is not a prime')
+        if (4 * a ** 3 + 27 * b ** 2) % p == 0:     # 排除奇异曲线
+            raise ValueError('singular curve')
+        if self.g is None or not self.is_on_curve(self.g):     # 判断g点是否在曲线上
+            raise ValueError('g is not on the curve')
+        if not self.is_order_n(self.g):     # 判断 ng == 0
+            raise ValueError('n is not the order of g')
+
+    def is_order_n(self, dot):
+        """
+        检查 n * dot 是否为无穷远点。
+        mult 对 n % self.n == 0 直接返回 None，所以这里不能调用 mult(self.n, dot)，需要真正计算一遍。
+        :param dot:
+        :return:
+        """
+        if dot is None:
+            return True
+        w = self.wnaf_window
+        return self._wnaf_jacobian(self.n, self._wnaf_table(dot, w), w) is None
 
     def is_on_curve(self, dot):
         """
@@ -86,9 +137,114 @@ class EllipticCurve:
 
         return result
 
+    def encode_point(self, dot, form='compressed'):
+        """
+        SEC1 2.3.3 点编码，x、y 各为 ceil(log2(p) / 8) 字节的大端整数：
+            compressed      02 / 03 || x，02 表示 y 为偶数，03 表示 y 为奇数
+            uncompressed    04 || x || y
+            hybrid          06 / 07 || x || y，06 / 07 同样表示 y 的奇偶
+        无穷远点编码为 00。
+        :param dot:
+        :param form: 'compressed'、'uncompressed' 或 'hybrid'
+        :return: bytes
+        """
+        if dot is None:
+            return b'\x00'
+        size = (self.p.bit_length() + 7) // 8
+        x, y = dot
+        if form == 'compressed':
+            return bytes((2 | y & 1,)) + x.to_bytes(size, 'big')
+        if form == 'uncompressed':
+            return b'\x04' + x.to_bytes(size, 'big') + y.to_bytes(size, 'big')
+        if form == 'hybrid':
+            return bytes((6 | y & 1,)) + x.to_bytes(size, 'big') + y.to_bytes(size, 'big')
+        raise ValueError('unknown point form: %s' % form)
+
+    def decode_point(self, data):
+        """
+        SEC1 2.3.4 点解码，支持三种编码。
+        压缩编码需要由 x 求 y = sqrt(x^3 + ax + b)，使用 backend.sqrt（p = 3 mod 4 时只需一次模幂），
+        再按前缀选取奇偶正确的根。解码结果不在曲线上或编码不合法时抛出 ValueError。
+        :param data: bytes
+        :return: 点 (x, y)，无穷远点为 None
+        """
+        size = (self.p.bit_length() + 7) // 8
+        prefix = data[0] if data else -1
+        if prefix == 0 and len(data) == 1:
+            return None
+        if prefix in (2, 3) and len(data) == 1 + size:
+            x = int.from_bytes(data[1:], 'big')
+            if x >= self.p:
+                raise ValueError('invalid point encoding')
+            try:
+                y = int(self.backend.sqrt((x * x * x + self.a * x + self.b) % self.p, self._p))
+            except ValueError:
+                raise ValueError('point is not on the curve') from None
+            if y & 1 != prefix & 1:
+                y = (self.p - y) % self.p
+            return x, y
+        if prefix in (4, 6, 7) and len(data) == 1 + 2 * size:
+            x = int.from_bytes(data[1:1 + size], 'big')
+            y = int.from_bytes(data[1 + size:], 'big')
+            if prefix != 4 and y & 1 != prefix & 1:
+                raise ValueError('invalid point encoding')
+            if x >= self.p or y >= self.p or not self.is_on_curve((x, y)):
+                raise ValueError('point is not on the curve')
+            return x, y
+        raise ValueError('invalid point encoding')
+
+    def encode_points(self, dots, form='compressed'):
+        """
+        批量编码，结果与逐个调用 encode_point 相同
+        :param dots:
+        :param form:
+        :return: bytes 列表
+        """
+        size = (self.p.bit_length() + 7) // 8
+        if form == 'compressed':
+            return [b'\x00' if dot is None else bytes((2 | dot[1] & 1,)) + dot[0].to_bytes(size, 'big')
+                    for dot in dots]
+        return [self.encode_point(dot, form) for dot in dots]
+
+    def decode_points(self, items):
+        """
+        批量解码，结果与逐个调用 decode_point 相同，任何一个不合法时抛出 ValueError。
+        压缩编码走单独的循环：方法和常量只查找一次，p = 3 mod 4 时直接用 r = v^((p+1)/4) 求平方根，
+        省去逐个调用的开销，解码大量保存的公钥时主要耗时只剩每个点一次模幂。
+        :param items: bytes 的可迭代对象
+        :return: 点列表
+        """
+        p, a, b = self.p, self.a, self.b
+        size = (p.bit_length() + 7) // 8
+        if p % 4 != 3:
+            return [self.decode_point(data) for data in items]
+
+        power = self.backend.pow
+        exponent = (p + 1) // 4
+        from_bytes = int.from_bytes
+        result = []
+        for data in items:
+            prefix = data[0] if len(data) == 1 + size else -1
+            if prefix != 2 and prefix != 3:
+                result.append(self.decode_point(data))
+                continue
+            x = from_bytes(data[1:], 'big')
+            v = (x * x * x + a * x + b) % p
+            y = int(power(v, exponent, p))
+            if y * y % p != v or x >= p:
+                raise ValueError('point is not on the curve')
+            if y & 1 != prefix & 1:
+                y = (p - y) % p
+            result.append((x, y))
+        return result
+
     def mult(self, n, dot):
         """
         计算点dot的n倍点，使用椭圆曲线的加法定义计算。
+        中间结果使用雅可比坐标 (X, Y, Z) 表示，对应仿射坐标 (X/Z^2, Y/Z^3)，
+        倍点和加法都不需要求逆。基点g使用预计算表（mult_base），其他点使用 wNAF 编码（_wnaf_jacobian），
+        一共求逆三次：构建奇数倍点表时 2 * dot 转换为仿射坐标一次，表中的点通过 inverse_mod_batch
+        合并转换一次，最后结果转换回仿射坐标一次。
         :param n:
         :param dot:
         :return:
@@ -98,18 +254,445 @@ class EllipticCurve:
             return None
         if n < 0:
             return self.neg(self.mult(-n, dot))
+        if dot == self.g:
+            return self.mult_base(n)
+
+        w = self.wnaf_window
+        return self._to_affine(self._wnaf_jacobian(n, self._wnaf_table(dot, w), w))
+
+    def mult2(self, u1, dot1, u2, dot2):
+        """
+        计算 u1 * dot1 + u2 * dot2（如 ECDSA 验签的 u1 * G + u2 * Q）。
+        Straus/Shamir 交错计算：两个标量的 wNAF 共用同一条倍点链，
+        倍点次数与一次 mult 相同，最后只求一次逆。
+        其中一个点是基点g时，g 的部分直接使用基点预计算表，不需要倍点。
+        :param u1:
+        :param dot1:
+        :param u2:
+        :param dot2:
+        :return:
+        """
+        if u1 % self.n == 0 or dot1 is None:
+            return self.mult(u2, dot2)
+        if u2 % self.n == 0 or dot2 is None:
+            return self.mult(u1, dot1)
+        if u1 < 0:
+            u1, dot1 = -u1, self.neg(dot1)
+        if u2 < 0:
+            u2, dot2 = -u2, self.neg(dot2)
+        if dot2 == self.g:
+            u1, dot1, u2, dot2 = u2, dot2, u1, dot1
+        if dot2 == self.g:
+            return self.mult_base(u1 + u2)
+
+        w = self.wnaf_window
+        if dot1 == self.g:
+            if self._g_table is None:
+                self.precompute_base()
+            jac = self._wnaf_jacobian(u2, self._wnaf_table(dot2, w), w)
+            return self._mult_fixed_base(u1 % self.n, self._g_table, self.g_window, jac)
+
+        p = self._p
+        table1 = self._wnaf_table(dot1, w)
+        table2 = self._wnaf_table(dot2, w)
+        neg_table1 = [None if dot is None else (dot[0], -dot[1] % p) for dot in table1]
+        neg_table2 = [None if dot is None else (dot[0], -dot[1] % p) for dot in table2]
+        digits1 = wnaf(u1, w)
+        digits2 = wnaf(u2, w)
+        length = max(len(digits1), len(digits2))
+        digits1 += [0] * (length - len(digits1))
+        digits2 += [0] * (length - len(digits2))
 
         result = None
-        addend = dot
+        for i in range(length - 1, -1, -1):
+            result = self._jacobian_double(result)
+            digit = digits1[i]
+            if digit > 0:
+                result = self._jacobian_add_affine(result, table1[digit >> 1])
+            elif digit < 0:
+                result = self._jacobian_add_affine(result, neg_table1[-digit >> 1])
+            digit = digits2[i]
+            if digit > 0:
+                result = self._jacobian_add_affine(result, table2[digit >> 1])
+            elif digit < 0:
+                result = self._jacobian_add_affine(result, neg_table2[-digit >> 1])
+        return self._to_affine(result)
+
+    def mult_many(self, pairs):
+        """
+        批量计算多个倍点 [n * dot for n, dot in pairs]，结果与逐个调用 mult 完全一致。
+        所有点同步（lockstep）地从高位到低位做仿射坐标的倍点和加法，
+        每一步所有点需要的求逆通过 inverse_mod_batch 合并为一次 inverse_mod，
+        批量越大，平均到每个点上的求逆开销越小；批量小于 mult_many_min_batch 时直接逐个调用 mult。
+        :param pairs: (n, dot) 的列表
+        :return: 倍点列表，顺序与 pairs 相同
+        """
+        if len(pairs) < self.mult_many_min_batch:
+            return [self.mult(n, dot) for n, dot in pairs]
+
+        p = self._p
+        a = self.a
+        mpz = self.backend.mpz
+        invert = self.backend.inv
+
+        scalars = []
+        bases = []
+        for n, dot in pairs:
+            if dot is None or n % self.n == 0:
+                n, dot = 0, None
+            elif n < 0:
+                n, dot = -n, self.neg(dot)
+            scalars.append(n)
+            bases.append(dot and (mpz(dot[0]), mpz(dot[1])))
+
+        result = [None] * len(scalars)
+        bits = max(scalars, default=0).bit_length()
+
+        for bit in range(bits - 1, -1, -1):
+            # 倍点：m = (3 * x^2 + a) / (2 * y)
+            lanes = []
+            for i, acc in enumerate(result):
+                if acc is None:
+                    continue
+                if acc[1] == 0:
+                    result[i] = None    # 2 阶点的倍点为无穷远点
+                else:
+                    lanes.append(i)
+            invs = inverse_mod_batch([2 * result[i][1] for i in lanes], p, invert)
+            for i, inv in zip(lanes, invs):
+                x, y = result[i]
+                m = (3 * x * x + a) * inv % p
+                x3 = (m * m - 2 * x) % p
+                result[i] = x3, (m * (x - x3) - y) % p
+
+            # 加法：m = (y2 - y1) / (x2 - x1)
+            lanes = []
+            for i, n in enumerate(scalars):
+                if not n >> bit & 1:
+                    continue
+                acc = result[i]
+                if acc is None:
+                    result[i] = bases[i]
+                elif acc[0] == bases[i][0]:
+                    result[i] = self.add(acc, bases[i])     # P == Q 或 P == -Q，很少出现
+                else:
+                    lanes.append(i)
+            invs = inverse_mod_batch([bases[i][0] - result[i][0] for i in lanes], p, invert)
+            for i, inv in zip(lanes, invs):
+                x1, y1 = result[i]
+                x2, y2 = bases[i]
+                m = (y2 - y1) * inv % p
+                x3 = (m * m - x1 - x2) % p
+                result[i] = x3, (m * (x1 - x3) - y1) % p
+
+        return [None if dot is None else (int(dot[0]), int(dot[1])) for dot in result]
+
+    def ecdh_x(self, private, peer_x):
+        """
+        ECDH 只需要共享点 private * Q 的 x 坐标（DHKey），这里只用 Q 的 x 坐标计算，全程不涉及 y 坐标。
+        Montgomery 阶梯：R0 = j * Q, R1 = (j + 1) * Q，从高位到低位
+            位为 0: R1 = R0 + R1, R0 = 2 * R0
+            位为 1: R0 = R0 + R1, R1 = 2 * R1
+        R1 - R0 始终等于 Q，所以加法可以只用 x 坐标计算（Brier-Joye 差分加法公式），
+        点用射影坐标 (X : Z) 表示 x = X / Z，最后只求一次逆。
+        私钥先补为 k + n 或 k + 2n（结果不变），使所有私钥的位数相同，
+        每一位都是一次加法和一次倍点，计算量与私钥的取值无关。
+        :param private: 私钥
+        :param peer_x: 对方公钥的 x 坐标
+        :return: 共享点的 x 坐标；private 为 n 的倍数时返回 None
+        """
+        p = self._p
+        if not 0 <= peer_x < self.p:
+            raise ValueError('peer x is not on the curve')
+        x = self.backend.mpz(peer_x)
+        a, b = self.a, self.b % p     # a 不取模，P-192 / P-256 的 a = -3 乘法更快
+        # y^2 = x^3 + ax + b 不是二次剩余时，x 属于扭曲线上的点（阶可能很小），不能继续计算
+        if self.backend.pow((x * x * x + a * x + b) % p, (p - 1) // 2, p) != 1:
+            raise ValueError('peer x is not on the curve')
+
+        k = private % self.n
+        if k == 0:
+            return None
+        bits = self.n.bit_length() + 1
+        k += self.n
+        if k.bit_length() < bits:
+            k += self.n
+
+        b4 = 4 * b % p
+        # R0 = Q, R1 = 2Q
+        X1, Z1 = x, 1
+        xx = x * x % p
+        X2 = ((xx - a) ** 2 - 8 * b * x) % p
+        Z2 = 4 * (xx * x + a * x + b) % p
+
+        for i in range(bits - 2, -1, -1):
+            bit = k >> i & 1
+            if bit:
+                X1, Z1, X2, Z2 = X2, Z2, X1, Z1
+            # 差分加法 R1 = R0 + R1:
+            #   X3 = 2(X1 Z2 + X2 Z1)(X1 X2 + a Z1 Z2) + 4b (Z1 Z2)^2 - x (X1 Z2 - X2 Z1)^2
+            #   Z3 = (X1 Z2 - X2 Z1)^2
+            t1 = X1 * Z2
+            t2 = X2 * Z1
+            zz = Z1 * Z2 % p
+            Z3 = (t1 - t2) ** 2 % p
+            X2 = (2 * (t1 + t2) * (X1 * X2 + a * zz) + b4 * zz * zz - x * Z3) % p
+            Z2 = Z3
+            # 倍点 R0 = 2 R0:
+            #   X = (X^2 - a Z^2)^2 - 8b X Z^3
+            #   Z = 4Z (X^3 + a X Z^2 + b Z^3)
+            xx = X1 * X1 % p
+            zz = Z1 * Z1 % p
+            t1 = X1 * zz
+            t2 = Z1 * zz % p
+            X1, Z1 = ((xx - a * zz) ** 2 - 2 * b4 * t1 * Z1) % p, 4 * Z1 * (xx * X1 + a * t1 + b * t2) % p
+            if bit:
+                X1, Z1, X2, Z2 = X2, Z2, X1, Z1
+
+        if Z1 == 0:
+            return None
+        return int(X1 * self.backend.inv(Z1, p) % p)
+
+    def mult_base(self, n):
+        """
+        计算基点g的n倍点，使用预计算表，整个过程没有倍点运算。
+        把 n 按 w 位一组拆成 n = d0 + d1 * 2^w + d2 * 2^(2w) + ...，
+        第 i 行表保存 j * 2^(i*w) * g (j = 1 .. 2^w - 1)，
+        则 n * g 只需要把每一组 di 对应的表项加起来。
+        :param n:
+        :return:
+        """
+        n %= self.n
+        if n == 0:
+            return None
+        if self._g_table is None:
+            self.precompute_base()
+        return self._mult_fixed_base(n, self._g_table, self.g_window)
 
-        while n:
-            if n & 1:
-                result = self.add(result, addend)
-            addend = self.double(addend)
-            n >>= 1
+    def precompute_base(self, window=None):
+        """
+        构建（或按新的窗口宽度重建）基点预计算表。
+        表一共 ceil(bits / w) 行，每行 2^w - 1 个点。
+        :param window: 窗口宽度，默认使用 self.g_window
+        :return:
+        """
+        if window is not None:
+            self.g_window = window
+        self._g_table = self._fixed_base_table(self.g, self.g_window)
 
+    def _fixed_base_table(self, dot, w):
+        """
+        构建点dot的固定基预计算表，table[i][j - 1] = j * 2^(i*w) * dot，全部为仿射坐标。
+        :param dot:
+        :param w: 窗口宽度
+        :return:
+        """
+        rows = (self.n.bit_length() + w - 1) // w
+
+        # 每一行的基点 2^(i*w) * dot
+        bases = [dot]
+        for _ in range(rows - 1):
+            jac = bases[-1][0], bases[-1][1], 1
+            for _ in range(w):
+                jac = self._jacobian_double(jac)
+            bases.append(self._to_affine(jac))
+
+        multiples = []
+        for base in bases:
+            jac = None
+            for _ in range((1 << w) - 1):
+                jac = self._jacobian_add_affine(jac, base)
+                multiples.append(jac)
+
+        # 所有表项一起转换为仿射坐标，只求一次逆
+        points = self._batch_to_affine(multiples)
+        size = (1 << w) - 1
+        return [points[i * size:(i + 1) * size] for i in range(rows)]
+
+    def _mult_fixed_base(self, n, table, w, jac=None):
+        """
+        使用固定基预计算表计算 n 倍点，只需要 ceil(bits / w) 次混合加法。
+        :param n: 0 < n < self.n
+        :param table: _fixed_base_table 的结果
+        :param w: 窗口宽度
+        :param jac: 累加的初始值（雅可比坐标），结果为 jac + n * dot
+        :return:
+        """
+        mask = (1 << w) - 1
+        result = jac
+        for row in table:
+            digit = n & mask
+            if digit:
+                result = self._jacobian_add_affine(result, row[digit - 1])
+            n >>= w
+        return self._to_affine(result)
+
+    def _wnaf_table(self, dot, w):
+        """
+        计算 wNAF 需要的奇数倍点表 [dot, 3 * dot, 5 * dot, ..., (2^(w-1) - 1) * dot]，仿射坐标。
+        :param dot:
+        :param w: 窗口宽度
+        :return:
+        """
+        jac = dot[0] % self._p, dot[1] % self._p, 1
+        twice = self._to_affine(self._jacobian_double(jac))
+
+        jacs = [jac]
+        for _ in range((1 << (w - 2)) - 1):
+            jacs.append(self._jacobian_add_affine(jacs[-1], twice))
+        return self._batch_to_affine(jacs)
+
+    def _wnaf_jacobian(self, n, table, w):
+        """
+        使用 wNAF 编码计算 n 倍点，结果为雅可比坐标：每个非零位都是奇数 d，|d| < 2^(w-1)，
+        且任意 w 个连续位中最多只有一个非零位，平均每 w + 1 位只需要一次加法。
+        d < 0 时加上 -|d| * dot，负点只需要把 y 取反。
+        :param n: n > 0
+        :param table: _wnaf_table 的结果
+        :param w: 窗口宽度
+        :return:
+        """
+        p = self._p
+        neg_table = [None if dot is None else (dot[0], -dot[1] % p) for dot in table]
+
+        result = None
+        for digit in reversed(wnaf(n, w)):
+            result = self._jacobian_double(result)
+            if digit > 0:
+                result = self._jacobian_add_affine(result, table[digit >> 1])
+            elif digit < 0:
+                result = self._jacobian_add_affine(result, neg_table[-digit >> 1])
+        return result
+
+    def inverse_batch(self, values, modulus):
+        """
+        批量求逆（Montgomery trick），整批只调用一次后端的求逆，例如一批 ECDSA nonce 的 k^-1 mod n。
+        :param values: 与 modulus 互素的整数列表
+        :param modulus: 模数，例如 self.p 或 self.n
+        :return: 逆元列表，顺序与 values 相同
+        """
+        return inverse_mod_batch(values, modulus, self.backend.inv)
+
+    def _batch_to_affine(self, jacs):
+        """
+        把一组雅可比坐标点转换为仿射坐标，所有点共用一次求逆（Montgomery trick）。
+        :param jacs: 雅可比坐标点列表，可以包含 None
+        :return:
+        """
+        p = self._p
+        z_invs = iter(inverse_mod_batch([jac[2] for jac in jacs if jac is not None], p, self.backend.inv))
+
+        result = []
+        for jac in jacs:
+            if jac is None:
+                result.append(None)
+                continue
+            x, y, _ = jac
+            z_inv = next(z_invs)
+            z_inv2 = z_inv * z_inv % p
+            result.append((x * z_inv2 % p, y * z_inv2 * z_inv % p))
         return result
 
+    def _to_affine(self, jac):
+        """
+        雅可比坐标 (X, Y, Z) 转换为仿射坐标 (X/Z^2, Y/Z^3)，只需要一次求逆，结果为 int。
+        :param jac: 雅可比坐标，None 表示无穷远点
+        :return:
+        """
+        if jac is None:
+            return None
+
+        x, y, z = jac
+        p = self._p
+        z_inv = self.backend.inv(z, p)
+        z_inv2 = z_inv * z_inv % p
+        return int(x * z_inv2 % p), int(y * z_inv2 * z_inv % p)
+
+    def _jacobian_double(self, jac):
+        """
+        雅可比坐标下的倍点运算。
+        a = -3 时：
+            delta = Z^2, gamma = Y^2, beta = X * gamma
+            alpha = 3 * (X - delta) * (X + delta)
+            X3 = alpha^2 - 8 * beta
+            Z3 = (Y + Z)^2 - gamma - delta
+            Y3 = alpha * (4 * beta - X3) - 8 * gamma^2
+        一般情况：
+            M = 3 * X^2 + a * Z^4, S = 4 * X * Y^2
+            X3 = M^2 - 2 * S
+            Y3 = M * (S - X3) - 8 * Y^4
+            Z3 = 2 * Y * Z
+        :param jac:
+        :return:
+        """
+        if jac is None:
+            return None
+
+        x1, y1, z1 = jac
+        if y1 == 0:
+            return None     # 2 阶点的倍点为无穷远点
+
+        p = self._p
+        if self.a_is_minus_3:
+            delta = z1 * z1 % p
+            gamma = y1 * y1 % p
+            beta = x1 * gamma % p
+            alpha = 3 * (x1 - delta) * (x1 + delta) % p
+            x3 = (alpha * alpha - 8 * beta) % p
+            y1_z1 = y1 + z1
+            z3 = (y1_z1 * y1_z1 - gamma - delta) % p
+            y3 = (alpha * (4 * beta - x3) - 8 * gamma * gamma) % p
+        else:
+            y1_sq = y1 * y1 % p
+            z1_sq = z1 * z1 % p
+            s = 4 * x1 * y1_sq % p
+            m = (3 * x1 * x1 + self.a * z1_sq * z1_sq) % p
+            x3 = (m * m - 2 * s) % p
+            y3 = (m * (s - x3) - 8 * y1_sq * y1_sq) % p
+            z3 = 2 * y1 * z1 % p
+        return x3, y3, z3
+
+    def _jacobian_add_affine(self, jac, dot):
+        """
+        雅可比坐标点 jac 与仿射坐标点 dot 相加（混合加法，dot 的 Z = 1）：
+            U2 = x2 * Z1^2, S2 = y2 * Z1^3
+            H = U2 - X1, R = S2 - Y1
+            X3 = R^2 - H^3 - 2 * X1 * H^2
+            Y3 = R * (X1 * H^2 - X3) - Y1 * H^3
+            Z3 = Z1 * H
+        :param jac:
+        :param dot:
+        :return:
+        """
+        if dot is None:
+            return jac
+        if jac is None:
+            return dot[0], dot[1], 1
+
+        x1, y1, z1 = jac
+        x2, y2 = dot
+        p = self._p
+
+        z1_sq = z1 * z1 % p
+        u2 = x2 * z1_sq % p
+        s2 = y2 * z1 * z1_sq % p
+        # x1, y1, u2, s2 都已约简，h 和 r 不需要再取模，判断是否为 0 即可
+        h = u2 - x1
+        r = s2 - y1
+
+        if h == 0:
+            if r == 0:
+                return self._jacobian_double(jac)   # P == Q
+            return None     # P == -Q
+
+        h_sq = h * h % p
+        h_cu = h * h_sq % p
+        v = x1 * h_sq % p
+        x3 = (r * r - h_cu - 2 * v) % p
+        y3 = (r * (v - x3) - y1 * h_cu) % p
+        z3 = z1 * h % p
+        return x3, y3, z3
+
 
 def inverse_mod(n, p):
     """Returns the inverse of n modulo p.
@@ -120,25 +703,53 @@ def inverse_mod(n, p):
     """
     if n == 0:
         raise ZeroDivisionError('division by zero')
-    if n < 0:
-        return p - inverse_mod(-n, p)
+    return int(get_backend().inv(n, p))
+
+
+def wnaf(n, w):
+    """Returns the width-w non-adjacent form of n, least significant digit first.
 
-    s, old_s = 0, 1
-    t, old_t = 1, 0
-    r, old_r = p, n
+    Every non-zero digit is odd and lies in (-2^(w-1), 2^(w-1)), and
+    any w consecutive digits contain at most one non-zero digit.
+    """
+    digits = []
+    while n:
+        if n & 1:
+            digit = n & ((1 << w) - 1)
+            if digit >= 1 << (w - 1):
+                digit -= 1 << w
+            n -= digit
+        else:
+            digit = 0
+        digits.append(digit)
+        n >>= 1
+    return digits
 
-    while r != 0:
-        quotient = old_r // r
-        old_r, r = r, old_r - quotient * r
-        old_s, s = s, old_s - quotient * s
-        old_t, t = t, old_s - quotient * t
 
-    gcd, x, y = old_r, old_s, old_t
+def inverse_mod_batch(values, p, invert=None):
+    """Returns the inverses of all values modulo p with a single inversion.
 
-    assert gcd == 1
-    assert (n * x) % p == 1
+    Montgomery's trick: invert the product of all values once, then peel
+    the individual inverses off with two multiplications each.
 
-    return x % p
+    Every value must be non-zero modulo p. invert(x, p) does the single
+    inversion and defaults to inverse_mod.
+    """
+    prefix = []
+    acc = 1
+    for value in values:
+        acc = acc * value % p
+        prefix.append(acc)
+    if not prefix:
+        return []
+
+    inv = (invert or inverse_mod)(acc, p)
+    result = [0] * len(prefix)
+    for i in range(len(prefix) - 1, 0, -1):
+        result[i] = inv * prefix[i - 1] % p
+        inv = inv * values[i] % p
+    result[0] = inv
+    return result
 
 
 # 私钥通过取随机数得到
@@ -148,7 +759,7 @@ def P192_public_key_test():
     Public key (X): 15207009984421a6586f9fc3fe7e4329d2809ea51125f8ed
     Public key (Y): b09d42b81bc5bd009f79e4b59dbbaa857fca856fb9f7ea25
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     private_key = 0x07915f86918ddc27005df1d6cf0c142b625ed2eff4a518ff
     public_key = curve.mult(private_key, curve.g)
     public_key_x = public_key[0]
@@ -168,13 +779,13 @@ def P192_data_set_1():
     DHKey: fb3ba2012c7e62466e486e229290175b4afebc13fdccee46
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x07915f86918ddc27005df1d6cf0c142b625ed2eff4a518ff
     Private_B = 0x1e636ca790b50f68f15d8dbe86244e309211d635de00e16d
     Public_Ax = 0x15207009984421a6586f9fc3fe7e4329d2809ea51125f8ed
     Public_Ay = 0xb09d42b81bc5bd009f79e4b59dbbaa857fca856fb9f7ea25
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -188,13 +799,13 @@ def P192_data_set_2():
     DHKey: a20a34b5497332aa7a76ab135cc0c168333be309d463c0c0
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x52ec1ca6e0ec973c29065c3ca10be80057243002f09bb43e
     Private_B = 0x57231203533e9efe18cc622fd0e34c6a29c6e0fa3ab3bc53
     Public_Ax = 0x45571f027e0d690795d61560804da5de789a48f94ab4b07e
     Public_Ay = 0x0220016e8a6bce74b45ffec1e664aaa0273b7cbd907a8e2b
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -208,13 +819,13 @@ def P192_data_set_3():
     DHKey: 3b3986ba70790762f282a12a6d3bcae7a2ca01e25b87724e
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x00a0df08eaf51e6e7be519d67c6749ea3f4517cdd2e9e821
     Private_B = 0x2bf5e0d1699d50ca5025e8e2d9b13244b4d322a328be1821
     Public_Ax = 0x2ed35b430fa45f9d329186d754eeeb0495f0f653127f613d
     Public_Ay = 0x27e08db74e424395052ddae7e3d5a8fecb52a8039b735b73
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -228,13 +839,13 @@ def P192_data_set_4():
     DHKey: 4a78f83fba757c35f94abea43e92effdd2bc700723c61939
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x030a4af66e1a4d590a83e0284fca5cdf83292b84f4c71168
     Private_B = 0x12448b5c69ecd10c0471060f2bf86345c5e83c03d16bae2c
     Public_Ax = 0xf24a6899218fa912e7e4a8ba9357cb8182958f9fa42c968c
     Public_Ay = 0x7c0b8a9ebe6ea92e968c3a65f9f1a9716fe826ad88c97032
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -248,13 +859,13 @@ def P192_data_set_5():
     DHKey: 64d4fe35567e6ea0ca31f947e1533a635436d4870ce88c45
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x604df406c649cb460be16244589a40895c0db7367dc11a2f
     Private_B = 0x526c2327303cd505b9cf0c012471902bb9e842ce32b0addc
     Public_Ax = 0xcbe3c629aceb41b73d475a79fbfe8c08cdc80ceec00ee7c9
     Public_Ay = 0xf9f70f7ae42abda4f33af56f7f6aa383354e453fa1a2bd18
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -268,13 +879,13 @@ def P192_data_set_6():
     DHKey: 6433b36a7e9341940e78a63e31b3cf023282f7f1e3bf83bd
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x1a2c582a09852979eb2cee18fb0befb9a55a6d06f6a8fad3
     Private_B = 0x243778916920d68df535955bc1a3cccd5811133a8205ae41
     Public_Ax = 0xeca2d8d30bbef3ba8b7d591fdb98064a6c7b870cdcebe67c
     Public_Ay = 0x2e4163a44f3ae26e70dae86f1bf786e1a5db5562a8ed9fee
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -288,13 +899,13 @@ def P192_data_set_7():
     DHKey: c67beda9baf3c96a30616bf87a7d0ae704bc969e5cad354b
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x0f494dd08b493edb07228058a9f30797ff147a5a2adef9b3
     Private_B = 0x2da4cd46d9e06e81b1542503f2da89372e927877becec1be
     Public_Ax = 0x9f56a8aa27346d66652a546abacc7d69c17fd66e0853989f
     Public_Ay = 0xd7234c1464882250df7bbe67e0fa22aae475dc58af0c4210
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -308,13 +919,13 @@ def P192_data_set_8():
     DHKey: 6931496eef2fcfb03e0b1eef515dd4e1b0115b8b241b0b84
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x7381d2bc6ddecb65126564cb1af6ca1985d19fb57f0fff16
     Private_B = 0x18e276beff75adc3d520badb3806822e1c820f1064447848
     Public_Ax = 0x61c7f3c6f9e09f41423dce889de1973d346f2505a5a3b19b
     Public_Ay = 0x919972ff4cd6aed8a4821e3adc358b41f7be07ede20137df
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -328,13 +939,13 @@ def P192_data_set_9():
     DHKey: a518f3826bb5fa3d5bc37da4217296d5b6af51e5445c6625
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x41c7b484ddc37ef6b7952c379f87593789dac6e4f3d8d8e6
     Private_B = 0x33e4eaa77f78216e0e99a9b200f81d2ca20dc74ad62d9b78
     Public_Ax = 0x9f09c773adb8e7b66b5d986cd15b143341a66d824113c15f
     Public_Ay = 0xd2000a91738217ab8070a76c5f96c03de317dfab774f4837
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -348,13 +959,13 @@ def P192_data_set_10():
     DHKey: 12a3343bb453bb5408da42d20c2d0fcc18ff078f56d9c68c
     :return:
     """
-    curve = ECC_P192
+    curve = get_curve('P-192')
     Private_A = 0x703cf5ee9c075f7726d0bb36d131c664f5534a6e6305d631
     Private_B = 0x757291c620a0e7e9dd13ce09ceb729c0ce1980e64d569b5f
     Public_Ax = 0xfa2b96d382cf894aeeb0bd985f3891e655a6315cd5060d03
     Public_Ay = 0xf7e8206d05c7255300cc56c88448158c497f2df596add7a2
 
-    dhkey_x, dhkey_y = curve.mult(Private_B, (Public_Ax, Public_Ay))
+    dhkey_x = curve.ecdh_x(Private_B, Public_Ax)
     print(sys._getframe().f_code.co_name, ":", hex(dhkey_x))
 
 
@@ -368,7 +979,7 @@ def P192_data_set_10():
 
 
 
-ECC_P192 = EllipticCurve(
+P192_PARAMS = dict(
     p=6277101735386680763835789423207666416083908700390324961279,
     a=-3,
     b=0x64210519e59c80e70fa7e9ab72243049feb8deecc146b9b1,
@@ -377,6 +988,14 @@ ECC_P192 = EllipticCurve(
     n=6277101735386680763835789423176059013767194773182842284081,
 )
 
+
+def __getattr__(name):
+    # ECC_P192 在第一次访问时才构建，见 curves.py
+    if name == 'ECC_P192':
+        return get_curve('P-192')
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
 if __name__ == '__main__':
     # P192_public_key_test()
     P192_data_set_1()
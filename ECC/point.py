@@ -0,0 +1,273 @@
+"""
+绑定到曲线的点类型
+
+EllipticCurve 的接口使用 (x, y) 元组和 None（无穷远点）。AffinePoint / JacobianPoint 是在此之上的不可变
+__slots__ 对象，记住自己所在的曲线，支持运算符：
+
+    P = AffinePoint(curve, x, y)        # 或 affine(curve, (x, y))
+    Q = k * P + P                       # mult / add
+    R = -Q                              # neg
+    J = P.to_jacobian().double() + P    # 雅可比坐标，不求逆
+    J.to_affine()
+
+AffinePoint 可以像 (x, y) 元组一样解包、下标访问、与元组比较和作为字典的键，
+所以可以直接传给 EllipticCurve 的所有方法；运算结果为无穷远点时与元组接口一样返回 None。
+
+curve_constants(curve) 返回每条曲线只构建一次的常量（p、a、b、n 与 field.PrimeField），
+P.elements() 把坐标转换为 field.FieldElement，可以直接写曲线方程等域运算：
+
+    x, y = P.elements()
+    assert y * y == x ** 3 + P.constants.a * x + P.constants.b
+"""
+import weakref
+
+from field import PrimeField
+
+# EllipticCurve -> CurveConstants，曲线被回收时条目自动删除
+_constants = weakref.WeakKeyDictionary()
+
+
+class CurveConstants:
+    """
+    一条曲线的常量，不可变。a、b 已经约简到 [0, p)。
+    """
+
+    __slots__ = ('p', 'a', 'b', 'n', 'field')
+
+    def __init__(self, curve):
+        p = curve.p
+        for name, value in (('p', p), ('a', curve.a % p), ('b', curve.b % p), ('n', curve.n),
+                            ('field', PrimeField(p))):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('CurveConstants is immutable')
+
+
+def curve_constants(curve):
+    """
+    :param curve: EllipticCurve
+    :return: curve 的 CurveConstants，第一次调用时构建，之后返回同一个对象
+    """
+    constants = _constants.get(curve)
+    if constants is None:
+        constants = _constants[curve] = CurveConstants(curve)
+    return constants
+
+
+class AffinePoint:
+    """
+    仿射坐标点 (x, y)，不可变
+    """
+
+    __slots__ = ('x', 'y', 'curve')
+
+    def __init__(self, curve, x, y):
+        object.__setattr__(self, 'curve', curve)
+        object.__setattr__(self, 'x', x)
+        object.__setattr__(self, 'y', y)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('AffinePoint is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('AffinePoint is immutable')
+
+    def __repr__(self):
+        return 'AffinePoint(%s, 0x%x, 0x%x)' % (self.curve.name, self.x, self.y)
+
+    # 与 (x, y) 元组相同的接口
+    def __iter__(self):
+        yield self.x
+        yield self.y
+
+    def __len__(self):
+        return 2
+
+    def __getitem__(self, index):
+        return (self.x, self.y)[index]
+
+    def __eq__(self, other):
+        if isinstance(other, AffinePoint):
+            return self.x == other.x and self.y == other.y
+        if isinstance(other, tuple):
+            return (self.x, self.y) == other
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self.x, self.y))
+
+    def __reduce__(self):
+        return _affine_from_name, (self.curve.name, self.x, self.y)
+
+    # 运算符
+    def __neg__(self):
+        return AffinePoint(self.curve, self.x, -self.y % self.curve.p)
+
+    def __add__(self, other):
+        if other is None:
+            return self
+        if isinstance(other, JacobianPoint):
+            return other + self
+        return affine(self.curve, self.curve.add((self.x, self.y), other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if other is None:
+            return self
+        return self + (-other if isinstance(other, (AffinePoint, JacobianPoint)) else self.curve.neg(other))
+
+    def __mul__(self, n):
+        if not isinstance(n, int):
+            return NotImplemented
+        return affine(self.curve, self.curve.mult(n, (self.x, self.y)))
+
+    __rmul__ = __mul__
+
+    def double(self):
+        return affine(self.curve, self.curve.add((self.x, self.y), (self.x, self.y)))
+
+    def to_jacobian(self):
+        return JacobianPoint(self.curve, self.x, self.y, 1)
+
+    def encode(self, form='compressed'):
+        """SEC1 编码，见 EllipticCurve.encode_point"""
+        return self.curve.encode_point((self.x, self.y), form)
+
+    @property
+    def constants(self):
+        return curve_constants(self.curve)
+
+    def elements(self):
+        """
+        :return: (x, y) 对应的两个 FieldElement
+        """
+        field = curve_constants(self.curve).field
+        return field.element(self.x), field.element(self.y)
+
+    def is_on_curve(self):
+        """是否满足 y^2 = x^3 + ax + b"""
+        constants = curve_constants(self.curve)
+        x, y = self.elements()
+        return y * y == x ** 3 + constants.a * x + constants.b
+
+
+class JacobianPoint:
+    """
+    雅可比坐标点 (X, Y, Z)，对应仿射坐标 (X / Z^2, Y / Z^3)，不可变。
+    加法和倍点不求逆，最后调用 to_affine 时求一次逆。
+    """
+
+    __slots__ = ('X', 'Y', 'Z', 'curve')
+
+    def __init__(self, curve, X, Y, Z):
+        object.__setattr__(self, 'curve', curve)
+        object.__setattr__(self, 'X', X)
+        object.__setattr__(self, 'Y', Y)
+        object.__setattr__(self, 'Z', Z)
+
+    def __setattr__(self, name, value):
+        raise AttributeError('JacobianPoint is immutable')
+
+    def __delattr__(self, name):
+        raise AttributeError('JacobianPoint is immutable')
+
+    def __repr__(self):
+        return 'JacobianPoint(%s, 0x%x, 0x%x, 0x%x)' % (self.curve.name, self.X, self.Y, self.Z)
+
+    def __iter__(self):
+        yield self.X
+        yield self.Y
+        yield self.Z
+
+    def __eq__(self, other):
+        """不同的 Z 可以表示同一个点：X1 Z2^2 == X2 Z1^2 且 Y1 Z2^3 == Y2 Z1^3"""
+        if isinstance(other, AffinePoint):
+            other = other.to_jacobian()
+        if not isinstance(other, JacobianPoint):
+            return NotImplemented
+        p = self.curve._p
+        z1z1, z2z2 = self.Z * self.Z % p, other.Z * other.Z % p
+        return ((self.X * z2z2 - other.X * z1z1) % p == 0 and
+                (self.Y * z2z2 * other.Z - other.Y * z1z1 * self.Z) % p == 0)
+
+    __hash__ = None
+
+    def __neg__(self):
+        return JacobianPoint(self.curve, self.X, -self.Y % self.curve._p, self.Z)
+
+    def __add__(self, other):
+        if other is None:
+            return self
+        if isinstance(other, JacobianPoint):
+            return _jacobian(self.curve, _jacobian_add(self.curve, (self.X, self.Y, self.Z),
+                                                      (other.X, other.Y, other.Z)))
+        dot = (other.x, other.y) if isinstance(other, AffinePoint) else other
+        return _jacobian(self.curve, self.curve._jacobian_add_affine((self.X, self.Y, self.Z), dot))
+
+    __radd__ = __add__
+
+    def __sub__(self, other):
+        if other is None:
+            return self
+        if not isinstance(other, (AffinePoint, JacobianPoint)):
+            other = self.curve.neg(other)
+        return self + -other
+
+    def double(self):
+        return _jacobian(self.curve, self.curve._jacobian_double((self.X, self.Y, self.Z)))
+
+    def to_affine(self):
+        return affine(self.curve, self.curve._to_affine((self.X, self.Y, self.Z)))
+
+
+def affine(curve, dot):
+    """
+    把 (x, y) 元组转换为 AffinePoint，None（无穷远点）保持为 None
+    """
+    if dot is None or isinstance(dot, AffinePoint):
+        return dot
+    return AffinePoint(curve, int(dot[0]), int(dot[1]))
+
+
+def _jacobian(curve, jac):
+    return None if jac is None else JacobianPoint(curve, *jac)
+
+
+def _affine_from_name(name, x, y):
+    from curves import get_curve
+    return AffinePoint(get_curve(name), x, y)
+
+
+def _jacobian_add(curve, jac1, jac2):
+    """
+    两个雅可比坐标点相加（add-1998-cmo-2，12M + 4S）：
+        U1 = X1 Z2^2, U2 = X2 Z1^2, S1 = Y1 Z2^3, S2 = Y2 Z1^3
+        H = U2 - U1, R = S2 - S1
+        X3 = R^2 - H^3 - 2 U1 H^2
+        Y3 = R (U1 H^2 - X3) - S1 H^3
+        Z3 = Z1 Z2 H
+    """
+    x1, y1, z1 = jac1
+    x2, y2, z2 = jac2
+    p = curve._p
+    z1z1 = z1 * z1 % p
+    z2z2 = z2 * z2 % p
+    u1 = x1 * z2z2 % p
+    u2 = x2 * z1z1 % p
+    s1 = y1 * z2 * z2z2 % p
+    s2 = y2 * z1 * z1z1 % p
+    h = (u2 - u1) % p
+    r = (s2 - s1) % p
+    if h == 0:
+        if r == 0:
+            return curve._jacobian_double(jac1)
+        return None
+    h_sq = h * h % p
+    h_cu = h * h_sq % p
+    v = u1 * h_sq % p
+    x3 = (r * r - h_cu - 2 * v) % p
+    y3 = (r * (v - x3) - s1 * h_cu) % p
+    z3 = z1 * z2 % p * h % p
+    return x3, y3, z3
@@ -0,0 +1,61 @@
+"""
+point.py 与 field.FieldElement 测试：python point_test.py
+"""
+from curves import get_curve
+from field import P192, P256, FieldElement, PrimeField
+from point import AffinePoint, affine, curve_constants
+
+
+def _expect_value_error(func, *args):
+    try:
+        func(*args)
+    except ValueError:
+        return
+    raise AssertionError('ValueError not raised')
+
+
+def field_element_test():
+    """FieldElement 的运算符与 int 运算取模的结果相同"""
+    for field in (PrimeField(P192), PrimeField(P256), PrimeField(10009)):
+        p = field.p
+        for a, b in ((3, 5), (p - 1, p - 2), (123456789 % p, 987654321 % p)):
+            x, y = field.element(a), field.element(b)
+            assert x + y == (a + b) % p and a + y == (a + b) % p
+            assert x - y == (a - b) % p and a - y == (a - b) % p and y - a == (b - a) % p
+            assert x * y == a * b % p and 2 * x == 2 * a % p
+            assert -x == -a % p
+            assert (x / y) * y == x and 1 / x * x == 1 and x ** -1 == x.inverse()
+            assert x ** 5 == pow(a, 5, p)
+            assert (x * x).sqrt() in (x, -x)
+            assert int(x) == a and isinstance((x + y).value, int) and hash(x) == hash(field.element(a + p))
+        _expect_value_error(field.element(0).inverse)
+        _expect_value_error(lambda: field.element(1) / 0)
+    non_residue = next(v for v in range(2, 100) if pow(v, (10009 - 1) // 2, 10009) != 1)
+    _expect_value_error(PrimeField(10009).element(non_residue).sqrt)
+    _expect_value_error(lambda: PrimeField(P192).element(1) + PrimeField(10009).element(1))
+    try:
+        FieldElement(PrimeField(7), 1).value = 2
+    except AttributeError:
+        pass
+    else:
+        raise AssertionError('FieldElement is mutable')
+
+
+def constants_test():
+    """每条曲线的常量只构建一次；点坐标转换为 FieldElement 后满足曲线方程"""
+    for name in ('P-192', 'P-256'):
+        curve = get_curve(name)
+        constants = curve_constants(curve)
+        assert curve_constants(curve) is constants
+        assert constants.p == curve.p and constants.a == curve.a % curve.p
+        P = affine(curve, curve.mult(4242, curve.g))
+        assert P.constants is constants and P.is_on_curve()
+        assert not AffinePoint(curve, P.x, P.y + 1).is_on_curve()
+        x, y = P.elements()
+        assert (x, y) == (P.x, P.y) and (3 * P).elements()[0] == curve.mult(3 * 4242, curve.g)[0]
+
+
+if __name__ == '__main__':
+    field_element_test()
+    constants_test()
+    print('point ok')
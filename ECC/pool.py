@@ -0,0 +1,209 @@
+"""
+后台预计算池
+
+请求路径上需要的一次性数据（ECDSA 的 nonce、握手用的临时密钥对）不依赖请求本身时，可以在后台预先计算好。
+BackgroundPool 是这类池的公共部分：有界的队列、低水位唤醒的补充线程、统计，
+子类只需要提供 generate(curve, count)：
+
+    池中的个数降到 low_water 以下时唤醒后台线程，按每批 batch 个补充到 size 个；
+    workers > 0 时每批交给进程池计算，补充线程只负责收集结果，不占用请求线程所在进程的 GIL；
+    take() 在锁内从队列头部取出一项，每一项只会被取出一次；
+    池为空时 take() 立即返回 None（记为 miss），或者 block=True 时等待补充（等待时间记入 starved_seconds）；
+    generate() 在后台抛出异常时池随之关闭，之后的 take() 抛出 RuntimeError（__cause__ 为原异常），不会一直等待。
+
+不要在 fork 之后的子进程中继续使用父进程的池，否则两个进程可能取出同一项。
+"""
+import collections
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from curves import get_curve
+from ecdh_pool import _init_worker
+
+
+def _generate_remote(generate, curve_name, count):
+    # 在工作进程中执行，generate 必须是模块级函数（按引用 pickle）
+    return generate(get_curve(curve_name), count)
+
+
+class BackgroundPool:
+    """
+    后台线程补充的有界预计算池，线程安全。子类设置 generate = staticmethod(模块级函数)。
+    """
+
+    name = 'background-pool'
+
+    @staticmethod
+    def generate(curve, count):
+        """计算 count 项（可以少于 count，例如丢弃无效的项）"""
+        raise NotImplementedError
+
+    def __init__(self, curve, size=256, low_water=None, batch=32, start=True, workers=0):
+        """
+        :param curve: EllipticCurve
+        :param size: 池的容量
+        :param low_water: 补充阈值，默认为 size 的四分之一
+        :param batch: 每批计算的个数，一批完成后才放入池中
+        :param start: 是否立即启动后台线程
+        :param workers: 计算用的进程数，0 表示在后台线程中计算；大于 0 时 curve.name 必须已在 curves.py 注册
+        """
+        if size < 1:
+            raise ValueError('pool size must be positive')
+        if workers and curve.name is None:
+            raise ValueError('a named curve is required for worker processes')
+        self.curve = curve
+        self.size = size
+        self.low_water = size // 4 if low_water is None else low_water
+        self.batch = batch
+        self.workers = workers
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.starved_seconds = 0.0
+        self.generated = 0
+        self.refills = 0
+        self._items = collections.deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._error = None
+        self._thread = None
+        self._executor = None
+        if start:
+            self.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def __len__(self):
+        return len(self._items)
+
+    def start(self):
+        with self._cond:
+            if self._thread is None and not self._closed:
+                if self.workers:
+                    self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker)
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def take(self, block=False, timeout=None):
+        """
+        取出一项
+        :param block: 池为空时是否等待后台线程补充，后台线程没有启动时抛出 RuntimeError
+        :param timeout: 最多等待的秒数，None 表示一直等待
+        :return: 一项，池为空（或等待超时）时返回 None
+        """
+        with self._cond:
+            self._check()
+            if not self._items and block and not self._closed:
+                if self._thread is None:
+                    raise RuntimeError('%s is not started, nothing would refill it' % self.name)
+                self.waits += 1
+                start = time.perf_counter()
+                self._cond.notify_all()
+                self._cond.wait_for(lambda: self._items or self._closed, timeout)
+                self.starved_seconds += time.perf_counter() - start
+                self._check()
+            if self._items:
+                item = self._items.popleft()
+                self.hits += 1
+            else:
+                item = None
+                self.misses += 1
+            if len(self._items) < self.low_water:
+                self._cond.notify_all()
+        return item
+
+    def fill(self, count=None):
+        """
+        在当前线程中补充到容量（或补充 count 个），不需要后台线程，例如启动时预热。
+        :param count:
+        :return: 放入的个数
+        """
+        added = 0
+        while count is None or added < count:
+            room = self.size - len(self._items)
+            if count is not None:
+                room = min(room, count - added)
+            if room <= 0:
+                break
+            added += self._put(self.generate(self.curve, min(room, self.batch)))
+        return added
+
+    def stats(self):
+        """
+        :return: 当前个数、容量、补充阈值、命中与未命中次数、命中率、阻塞等待的次数与总秒数、生成的个数、后台补充次数
+        """
+        with self._cond:
+            total = self.hits + self.misses
+            return {
+                'size': len(self._items),
+                'capacity': self.size,
+                'low_water': self.low_water,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'waits': self.waits,
+                'starved_seconds': self.starved_seconds,
+                'generated': self.generated,
+                'refills': self.refills,
+            }
+
+    def close(self):
+        """停止后台线程（和进程池）并清空池"""
+        with self._cond:
+            self._closed = True
+            self._items.clear()
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def _check(self):
+        if self._error is not None:
+            raise RuntimeError('%s refill failed' % self.name) from self._error
+
+    def _put(self, items):
+        with self._cond:
+            if self._closed:
+                return 0
+            items = items[:self.size - len(self._items)]
+            self._items.extend(items)
+            self.generated += len(items)
+            if items:
+                self._cond.notify_all()
+            return len(items)
+
+    def _refill(self, count):
+        if self._executor is None:
+            return self._put(self.generate(self.curve, count))
+        # 同时提交 workers 批，让所有工作进程一起计算
+        futures = [self._executor.submit(_generate_remote, self.generate, self.curve.name, count)
+                   for _ in range(self.workers)]
+        return sum(self._put(future.result()) for future in futures)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and len(self._items) >= self.low_water:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                self.refills += 1
+            # 低于阈值后一直补充到容量，计算在锁外进行
+            try:
+                while len(self._items) < self.size and not self._closed:
+                    self._refill(min(self.size - len(self._items), self.batch))
+            except Exception as exc:
+                # 记录异常并关闭，唤醒所有等待的 take，由它们抛出
+                with self._cond:
+                    self._error = exc
+                    self._closed = True
+                    self._cond.notify_all()
+                return
@@ -0,0 +1,120 @@
+"""
+pool.py 测试：python pool_test.py
+"""
+import itertools
+import threading
+import time
+
+from curves import get_curve
+from pool import BackgroundPool
+
+_counter = itertools.count()
+
+
+def _numbers(curve, count):
+    return [next(_counter) for _ in range(count)]
+
+
+def _broken(curve, count):
+    raise ArithmeticError('generator is broken')
+
+
+class NumberPool(BackgroundPool):
+    name = 'number-pool'
+    generate = staticmethod(_numbers)
+
+
+class BrokenPool(BackgroundPool):
+    name = 'broken-pool'
+    generate = staticmethod(_broken)
+
+
+def _wait_until(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, 'timed out'
+        time.sleep(0.01)
+
+
+def refill_test():
+    """低于 low_water 时后台线程补充到容量，每一项只取出一次"""
+    curve = get_curve('P-192')
+    with NumberPool(curve, size=16, low_water=4, batch=4) as pool:
+        _wait_until(lambda: len(pool) == 16)
+        taken = [pool.take() for _ in range(13)]
+        _wait_until(lambda: len(pool) == 16)
+        taken += [pool.take(block=True, timeout=5) for _ in range(40)]
+        stats = pool.stats()
+    assert None not in taken and len(set(taken)) == len(taken)
+    assert stats['refills'] >= 2 and stats['misses'] == 0, stats
+
+
+def fill_test():
+    """fill 不需要后台线程，不超过容量；池为空时非阻塞 take 记为 miss"""
+    pool = NumberPool(get_curve('P-192'), size=8, batch=3, start=False)
+    assert pool.fill(5) == 5 and len(pool) == 5
+    assert pool.fill() == 3 and pool.fill() == 0
+    assert [pool.take() is not None for _ in range(9)] == [True] * 8 + [False]
+    stats = pool.stats()
+    assert stats['hits'] == 8 and stats['misses'] == 1 and stats['hit_rate'] == 8 / 9, stats
+    pool.close()
+
+
+def not_started_test():
+    """后台线程没有启动时阻塞的 take 立即抛出 RuntimeError"""
+    pool = NumberPool(get_curve('P-192'), size=4, start=False)
+    try:
+        pool.take(block=True)
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError('blocking take on an idle pool returned')
+    pool.close()
+
+
+def generate_error_test():
+    """generate 在后台抛出异常时，等待中的和之后的 take 抛出 RuntimeError 而不是一直等待"""
+    pool = BrokenPool(get_curve('P-192'), size=4)
+    errors = []
+
+    def waiter():
+        try:
+            pool.take(block=True)
+        except RuntimeError as exc:
+            errors.append(exc)
+
+    thread = threading.Thread(target=waiter)
+    thread.start()
+    thread.join(10)
+    assert not thread.is_alive(), 'blocking take hung after a refill error'
+    assert len(errors) == 1 and isinstance(errors[0].__cause__, ArithmeticError), errors
+    for block in (False, True):
+        try:
+            pool.take(block=block)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError('take succeeded on a failed pool')
+    pool.close()
+
+
+def close_test():
+    """close 唤醒等待中的 take"""
+    pool = NumberPool(get_curve('P-192'), size=4, low_water=0, start=False)
+    pool.start()
+    result = []
+    thread = threading.Thread(target=lambda: result.append(pool.take(block=True)))
+    thread.start()
+    time.sleep(0.1)
+    pool.close()
+    thread.join(10)
+    assert not thread.is_alive() and result == [None], result
+
+
+if __name__ == '__main__':
+    refill_test()
+    fill_test()
+    not_started_test()
+    generate_error_test()
+    close_test()
+    print('pool ok')
@@ -0,0 +1,168 @@
+"""
+任意点的固定基预计算表
+
+对同一个点 P 反复计算 k * P 时（例如与静态公钥做 ECDH），每次 mult 都要重新做约 bits 次倍点。
+PrecomputedPoint 在第一次使用时为 P 构建与基点 g 相同的窗口表（见 EllipticCurve.mult_base），
+之后每次倍点只需要 ceil(bits / w) 次混合加法，没有倍点：
+
+    handle = PrecomputedPoint(curve, peer)
+    shared = handle.mult(private)
+
+PrecomputedPointCache 按 (曲线名称, 点) 缓存这些表，按表实际占用的字节数限制总内存，超出时淘汰最久未使用的表：
+
+    cache = PrecomputedPointCache(max_bytes=64 << 20)
+    shared = cache.mult(curve, private, peer)
+"""
+import collections
+import sys
+import threading
+
+
+class PrecomputedPoint:
+    """
+    一个点及其固定基预计算表，表在第一次 mult（或 build）时构建。
+    """
+
+    def __init__(self, curve, dot, window=4):
+        """
+        :param curve: EllipticCurve
+        :param dot: 点 (x, y)，不能是无穷远点；调用方负责校验它在曲线上
+        :param window: 窗口宽度，表一共 ceil(bits / w) 行，每行 2^w - 1 个点
+        """
+        if dot is None:
+            raise ValueError('cannot precompute the point at infinity')
+        self.curve = curve
+        self.dot = dot
+        self.window = window
+        self.table = None
+        self.nbytes = 0
+
+    @property
+    def built(self):
+        return self.table is not None
+
+    def build(self):
+        """
+        构建预计算表（已经构建时不重复构建）
+        :return: 表占用的字节数
+        """
+        if self.table is None:
+            table = self.curve._fixed_base_table(self.dot, self.window)
+            self.nbytes = table_nbytes(table)
+            self.table = table
+        return self.nbytes
+
+    def mult(self, n):
+        """
+        计算 n * dot，结果与 curve.mult(n, dot) 相同
+        :param n:
+        :return:
+        """
+        n %= self.curve.n
+        if n == 0:
+            return None
+        if self.table is None:
+            self.build()
+        return self.curve._mult_fixed_base(n, self.table, self.window)
+
+
+def table_nbytes(table):
+    """预计算表占用的字节数：行列表、点元组和坐标的 sys.getsizeof 之和"""
+    total = sys.getsizeof(table)
+    for row in table:
+        total += sys.getsizeof(row)
+        for dot in row:
+            total += sys.getsizeof(dot) + sys.getsizeof(dot[0]) + sys.getsizeof(dot[1])
+    return total
+
+
+class PrecomputedPointCache:
+    """
+    按内存限制的 PrecomputedPoint LRU 缓存，线程安全；构建预计算表在锁外进行。
+    """
+
+    def __init__(self, max_bytes=64 << 20, max_points=None, window=4):
+        """
+        :param max_bytes: 所有预计算表合计最多占用的字节数
+        :param max_points: 最多缓存的点数，None 表示只按内存限制
+        :param window: 预计算表的窗口宽度
+        """
+        self.max_bytes = max_bytes
+        self.max_points = max_points
+        self.window = window
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        # (曲线名称, 点) -> PrecomputedPoint
+        self._handles = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._handles)
+
+    def get(self, curve, dot):
+        """
+        返回点的 PrecomputedPoint，表已经构建。
+        单个表超过 max_bytes 时仍然返回构建好的句柄，但不放入缓存。
+        :param curve: EllipticCurve
+        :param dot: 点 (x, y)
+        :return:
+        """
+        key = curve.name or id(curve), dot
+        with self._lock:
+            handle = self._handles.get(key)
+            if handle is not None:
+                self._handles.move_to_end(key)
+                self.hits += 1
+                return handle
+            self.misses += 1
+
+        handle = PrecomputedPoint(curve, dot, self.window)
+        handle.build()
+        if handle.nbytes > self.max_bytes:
+            return handle
+        with self._lock:
+            if key in self._handles:   # 其他线程同时构建了同一个点
+                return self._handles[key]
+            self._handles[key] = handle
+            self.nbytes += handle.nbytes
+            while self._handles and (self.nbytes > self.max_bytes or
+                                     (self.max_points is not None and len(self._handles) > self.max_points)):
+                _, old = self._handles.popitem(last=False)
+                self.nbytes -= old.nbytes
+                self.evictions += 1
+        return handle
+
+    def mult(self, curve, n, dot):
+        """
+        计算 n * dot，dot 的预计算表不在缓存中时先构建
+        :param curve:
+        :param n:
+        :param dot:
+        :return:
+        """
+        if dot is None or n % curve.n == 0:
+            return None
+        return self.get(curve, dot).mult(n)
+
+    def stats(self):
+        """
+        :return: 命中、未命中、淘汰次数，缓存的点数，合计字节数和平均每个点的字节数
+        """
+        with self._lock:
+            count = len(self._handles)
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'points': count,
+                'bytes': self.nbytes,
+                'bytes_per_point': self.nbytes / count if count else 0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._handles.clear()
+            self.nbytes = 0
+            self.hits = self.misses = self.evictions = 0
@@ -0,0 +1,63 @@
+"""
+precomputed.py 测试：python precomputed_test.py
+"""
+import random
+
+from curves import get_curve
+from precomputed import PrecomputedPoint, PrecomputedPointCache
+
+
+def precomputed_point_test():
+    """PrecomputedPoint.mult 与 curve.mult 结果相同"""
+    rng = random.Random(1)
+    for name in ('P-192', 'P-256'):
+        curve = get_curve(name)
+        dot = curve.mult(rng.randrange(1, curve.n), curve.g)
+        for window in (2, 4, 5):
+            handle = PrecomputedPoint(curve, dot, window)
+            assert not handle.built
+            for n in [0, 1, 2, curve.n - 1, curve.n, curve.n + 3] + [rng.randrange(1, curve.n) for _ in range(5)]:
+                assert handle.mult(n) == curve.mult(n, dot), (name, window, n)
+            assert handle.built and handle.nbytes > 0
+
+
+def cache_lru_test():
+    """超过 max_points 时淘汰最久未使用的点"""
+    curve = get_curve('P-192')
+    dots = [curve.mult(k, curve.g) for k in (2, 3, 5)]
+    cache = PrecomputedPointCache(max_points=2)
+    cache.get(curve, dots[0])
+    cache.get(curve, dots[1])
+    cache.get(curve, dots[0])           # dots[1] 成为最久未使用的
+    cache.get(curve, dots[2])
+    stats = cache.stats()
+    assert stats['points'] == 2 and stats['evictions'] == 1, stats
+    assert stats['hits'] == 1 and stats['misses'] == 3, stats
+    cache.get(curve, dots[0])
+    assert cache.stats()['hits'] == 2
+    assert cache.mult(curve, 7, dots[2]) == curve.mult(7, dots[2])
+    assert cache.mult(curve, curve.n, dots[2]) is None
+
+
+def cache_oversized_test():
+    """单个表超过 max_bytes 时返回句柄但不放入缓存，也不淘汰已有的表"""
+    p192, p256 = get_curve('P-192'), get_curve('P-256')
+    small = PrecomputedPoint(p192, p192.g).build()
+    cache = PrecomputedPointCache(max_bytes=small + 1024)
+    cache.get(p192, p192.g)
+    before = cache.stats()
+
+    handle = cache.get(p256, p256.g)
+    assert handle.built and handle.nbytes > cache.max_bytes
+    assert handle.mult(5) == p256.mult(5, p256.g)
+    stats = cache.stats()
+    assert stats['points'] == 1 and stats['evictions'] == 0, stats
+    assert stats['bytes'] == before['bytes'], stats
+    assert cache.get(p192, p192.g) is not None and cache.stats()['hits'] == 1
+
+
+if __name__ == '__main__':
+    precomputed_point_test()
+    cache_lru_test()
+    cache_oversized_test()
+    print('precomputed ok')
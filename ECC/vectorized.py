@@ -0,0 +1,340 @@
+"""
+NumPy 向量化的批量倍点（需要安装 numpy）
+
+EllipticCurve 每次只计算一个点，Python 解释器的开销占了大部分时间。
+这里把一批域元素保存为 (L, batch) 的 float64 数组：每个元素拆成 L 个 22 位的 limb，
+一次 NumPy 运算同时处理整批元素：
+
+    乘法    c[i + j] += a[i] * b[j]，L 次向量乘加，所有乘积和部分和都小于 2^53，float64 可以精确表示
+    约简    高位列 2^(22k) mod p 预先拆成 limb 组成矩阵，对进位后的乘积做一次矩阵乘法（BLAS）
+            得到 L 个 limb，再并行进位几次；P-192 / P-256 的 2^(22L) mod p 只有两三个非零 limb，
+            最高位的进位回卷很快收敛
+    加减    直接逐 limb 加减，不进位；乘法的输入可以是至多 4 个规范元素的和或差
+
+在此基础上用雅可比坐标实现批量倍点：基点使用共享的固定基预计算表（与 EllipticCurve.mult_base 相同），
+其他点使用每一路各自的 4 位窗口表。所有路执行相同的运算序列，窗口为 0 的路用掩码保持不变；
+标量先补为 k + n 或 k + 2n，使所有路的位数相同。
+出现 P == ±Q 等特殊情况的路最终 Z = 0，这些路改用 EllipticCurve.mult 重新计算，
+所以结果与 EllipticCurve.mult 完全一致。最后的仿射坐标转换使用 curve.inverse_batch，整批只求一次逆。
+
+向量化并不总是更快。ecc_bench.py --vector 在 P-192 上的测量结果（每个点的微秒数）：
+
+    后端      批大小   mult_base 标量 / 向量化   mult 标量 / 向量化
+    python     256        626 / 919             3389 / 4127
+    python    1024        871 / 557             2416 / 2051
+    python    4096        738 / 444             2907 / 2016
+    gmpy2     1024        356 / 519             1581 / 1883
+    gmpy2     4096        339 / 446             1866 / 1740
+
+P-256 使用 gmpy2 后端时在 4096 以内都是标量路径更快（4096 时 mult_base 520 / 976）。
+所以 VectorCurve 只在批大小不小于 min_batch 时使用向量化引擎，否则回退到 curve.mult_base / curve.mult_many；
+默认的 min_batch 按后端取 MIN_BATCH，gmpy2 后端没有测到交叉点，默认总是回退。
+"""
+import numpy as np
+
+LIMB_BITS = 22
+
+# 后端名称 -> 向量化开始更快的批大小；不在表中的后端默认总是使用标量路径
+MIN_BATCH = {'python': 1024}
+
+
+def _balanced_limbs(value, bits, size):
+    """
+    把 value 拆成 size 个有符号 limb，每个 limb 在 [-2^(bits-1), 2^(bits-1)) 内
+    （NIST 素数的 2^k mod p 这样拆分后大部分 limb 为 0）
+    """
+    base = 1 << bits
+    limbs = []
+    for _ in range(size):
+        limb = value % base
+        if limb >= base // 2:
+            limb -= base
+        limbs.append(limb)
+        value = (value - limb) >> bits
+    if value:
+        raise ValueError('value does not fit in %d limbs' % size)
+    return limbs
+
+
+class LimbField:
+    """
+    模 p 的向量化域运算，一批元素为 (L, batch) 的 float64 数组。
+    规范元素每个 limb 的绝对值小于 2^22 + 2^20；mul / sqr / carry 的结果都是规范元素。
+    """
+
+    def __init__(self, p, bits=LIMB_BITS):
+        self.p = p
+        self.bits = bits
+        self.size = size = -(-p.bit_length() // bits)
+        if size * 2.0 ** (2 * bits + 4) >= 2.0 ** 53:
+            raise ValueError('limbs too wide for exact float64 products')
+        self._base = float(1 << bits)
+        self._inv = 1.0 / self._base
+
+        # 约简矩阵：第 k 列为 2^(bits * k) mod p 的 limb
+        self._reduce = np.array([_balanced_limbs(pow(2, bits * k, p), bits, size)
+                                 for k in range(2 * size + 1)], dtype=np.float64).T.copy()
+        # 最高位之上的进位按 2^(bits * size) mod p 回卷到低位
+        fold = _balanced_limbs(pow(2, bits * size, p), bits, size)
+        self._fold_rows = [i for i, limb in enumerate(fold) if limb]
+        self._fold = np.array([fold[i] for i in self._fold_rows], dtype=np.float64)[:, None]
+        self._fold_max = max(abs(limb) for limb in fold)
+
+        # 约简矩阵输出的 limb 最大约为 (2L + 1) * 2^bits * 2^(bits - 1)
+        self._reduce_passes = self._passes((2 * size + 1) * 2.0 ** (2 * bits))
+
+    def _passes(self, bound):
+        """limb 的绝对值不超过 bound 时，需要几次并行进位才能成为规范元素"""
+        base = self._base
+        passes = 0
+        while bound > base * 1.25:
+            carry = bound / base + 1
+            bound = base + carry + self._fold_max * carry
+            passes += 1
+        return passes
+
+    def from_ints(self, values):
+        mask = (1 << self.bits) - 1
+        values = [value % self.p for value in values]
+        return np.array([[value >> (self.bits * j) & mask for value in values]
+                         for j in range(self.size)], dtype=np.float64)
+
+    def to_ints(self, a):
+        """转换回 [0, p) 的 Python int 列表"""
+        result = [0] * a.shape[1]
+        for row in a[::-1].astype(np.int64).tolist():
+            result = [(value << self.bits) + limb for value, limb in zip(result, row)]
+        return [value % self.p for value in result]
+
+    def constant(self, value, batch):
+        return np.repeat(self.from_ints([value]), batch, axis=1)
+
+    def _propagate(self, a, passes, fold):
+        """
+        原地并行进位：每个 limb 保留低 bits 位，高位加到下一个 limb；fold 为 True 时最高 limb 的进位回卷到低位。
+        乘以 2^-bits 是精确的，floor 比 np.divmod 快得多。
+        """
+        high = np.empty_like(a)
+        for _ in range(passes):
+            np.multiply(a, self._inv, out=high)
+            np.floor(high, out=high)
+            a -= high * self._base
+            a[1:] += high[:-1]
+            if fold:
+                a[self._fold_rows] += self._fold * high[-1]
+        return a
+
+    def carry(self, a, passes=2):
+        """
+        进位为规范元素，返回新数组
+        """
+        return self._propagate(np.array(a, dtype=np.float64), passes, True)
+
+    def mul(self, a, b):
+        size = self.size
+        columns = np.zeros((2 * size + 1, a.shape[1]))
+        product = np.empty((size, a.shape[1]))
+        for i in range(size):
+            np.multiply(a[i], b, out=product)
+            columns[i:i + size] += product
+        # 乘积的每一列先进位两次，使约简矩阵乘法的结果不超过 2^53
+        self._propagate(columns, 2, False)
+        return self._propagate(self._reduce @ columns, self._reduce_passes, True)
+
+    def sqr(self, a):
+        return self.mul(a, a)
+
+
+class VectorCurve:
+    """
+    EllipticCurve 的向量化批量倍点。
+    """
+
+    def __init__(self, curve, window=4, chunk_size=1024, bits=LIMB_BITS, min_batch=None):
+        """
+        :param curve: EllipticCurve
+        :param window: 窗口宽度
+        :param chunk_size: 每次同时计算的路数，太大时数组超出 CPU 缓存反而变慢
+        :param bits: limb 的位数
+        :param min_batch: 批大小不小于它时才使用向量化引擎，否则回退到标量路径；
+            None 时取 MIN_BATCH[curve.backend.name]，后端不在表中时总是回退。0 表示总是使用向量化引擎
+        """
+        self.curve = curve
+        if min_batch is None:
+            min_batch = MIN_BATCH.get(curve.backend.name)
+        self.min_batch = min_batch
+        self.window = window
+        self.chunk_size = chunk_size
+        self.field = LimbField(curve.p, bits)
+        self._g_table = None
+        # 固定基计算的起点 R 与结果 -R，避免从无穷远点开始累加
+        self._offset = curve.mult_base(0x5eed * (curve.n // 0xffff) + 1)
+
+    def mult_base(self, scalars):
+        """
+        批量计算 [k * G for k in scalars]，结果与 EllipticCurve.mult 相同。
+        :param scalars:
+        :return: 点列表
+        """
+        if not self._vectorize(len(scalars)):
+            return [self.curve.mult_base(k) for k in scalars]
+        return self.mult_many([(k, self.curve.g) for k in scalars])
+
+    def mult_many(self, pairs):
+        """
+        批量计算 [n * dot for n, dot in pairs]，结果与 EllipticCurve.mult 相同。
+        :param pairs: (n, dot) 的列表
+        :return: 点列表，顺序与 pairs 相同
+        """
+        curve = self.curve
+        if not self._vectorize(len(pairs)):
+            return curve.mult_many(pairs)
+        result = [None] * len(pairs)
+        base, other = [], []
+        for i, (n, dot) in enumerate(pairs):
+            if dot is None or n % curve.n == 0:
+                continue
+            (base if dot == curve.g else other).append(i)
+
+        for lanes, compute in ((base, self._fixed_base), (other, self._variable_base)):
+            for start in range(0, len(lanes), self.chunk_size):
+                chunk = lanes[start:start + self.chunk_size]
+                scalars = [pairs[i][0] % curve.n for i in chunk]
+                dots = [pairs[i][1] for i in chunk]
+                for i, dot in zip(chunk, self._to_affine(*compute(scalars, dots))):
+                    # Z = 0：计算中出现了 P == ±Q，改用 mult
+                    result[i] = dot if dot is not None else curve.mult(*pairs[i])
+        return result
+
+    def _vectorize(self, size):
+        return self.min_batch is not None and size >= self.min_batch
+
+    def _digits(self, scalars, count, pad):
+        """
+        每一路标量的 w 位窗口，返回 count 个 (batch,) 的数组，从低位到高位。
+        pad 为 True 时标量先补为 k + n 或 k + 2n，使最高窗口不为 0。
+        """
+        w = self.window
+        if pad:
+            n = self.curve.n
+            top = n.bit_length()
+            scalars = [k + n if (k + n) >> top else k + 2 * n for k in scalars]
+        mask = (1 << w) - 1
+        return [np.array([k >> (i * w) & mask for k in scalars]) for i in range(count)]
+
+    def _fixed_base(self, scalars, dots):
+        curve, f = self.curve, self.field
+        if self._g_table is None:
+            table = curve._fixed_base_table(curve.g, self.window)
+            # 每一行为 (L, 2^w) 的 x、y 数组，第 0 列（窗口为 0）只作占位
+            self._g_table = [(f.from_ints([row[0][0]] + [dot[0] for dot in row]),
+                              f.from_ints([row[0][1]] + [dot[1] for dot in row])) for row in table]
+
+        batch = len(scalars)
+        X, Y = f.constant(self._offset[0], batch), f.constant(self._offset[1], batch)
+        Z = f.constant(1, batch)
+        digits = self._digits(scalars, len(self._g_table), False)
+        for (table_x, table_y), digit in zip(self._g_table, digits):
+            X, Y, Z = self._add_affine(X, Y, Z, table_x[:, digit], table_y[:, digit], digit != 0)
+        neg = curve.neg(self._offset)
+        return self._add_affine(X, Y, Z, f.constant(neg[0], batch), f.constant(neg[1], batch), None)
+
+    def _variable_base(self, scalars, dots):
+        f, w = self.field, self.window
+        batch = len(scalars)
+        px = f.from_ints([dot[0] for dot in dots])
+        py = f.from_ints([dot[1] for dot in dots])
+        one = f.constant(1, batch)
+
+        # 每一路的 j * P (j = 1 .. 2^w - 1)，雅可比坐标，第 0 项只作占位
+        table = [(px, py, one), (px, py, one), self._double(px, py, one)]
+        for _ in range(3, 1 << w):
+            table.append(self._add_affine(*table[-1], px, py, None))
+        table_x, table_y, table_z = (np.stack([entry[c] for entry in table]) for c in range(3))
+
+        def lookup(digit):
+            index = np.broadcast_to(digit, (1, f.size, batch))
+            return [np.take_along_axis(t, index, axis=0)[0] for t in (table_x, table_y, table_z)]
+
+        count = -(-(self.curve.n.bit_length() + 1) // w)
+        digits = self._digits(scalars, count, True)
+        X, Y, Z = lookup(digits[-1])
+        for digit in reversed(digits[:-1]):
+            for _ in range(w):
+                X, Y, Z = self._double(X, Y, Z)
+            X, Y, Z = self._add(X, Y, Z, *lookup(digit), digit != 0)
+        return X, Y, Z
+
+    def _double(self, X, Y, Z):
+        """雅可比坐标倍点，与 EllipticCurve._jacobian_double 相同的公式"""
+        f = self.field
+        delta = f.sqr(Z)
+        gamma = f.sqr(Y)
+        beta = f.mul(X, gamma)
+        if self.curve.a_is_minus_3:
+            alpha = f.carry(3 * f.mul(X - delta, X + delta))
+        else:
+            a = f.constant(self.curve.a, X.shape[1])
+            alpha = f.carry(3 * f.sqr(X) + f.mul(a, f.sqr(delta)))
+        X3 = f.carry(f.sqr(alpha) - 8 * beta)
+        Z3 = f.carry(f.sqr(Y + Z) - gamma - delta)
+        Y3 = f.carry(f.mul(alpha, 4 * beta - X3) - 8 * f.sqr(gamma))
+        return X3, Y3, Z3
+
+    def _add_affine(self, X1, Y1, Z1, x2, y2, mask):
+        """
+        雅可比坐标 + 仿射坐标（madd-2007-bl）。mask 为 False 的路保持 (X1, Y1, Z1) 不变。
+        P == ±Q 或 P 为无穷远点时结果的 Z = 0。
+        """
+        f = self.field
+        z1z1 = f.sqr(Z1)
+        u2 = f.mul(x2, z1z1)
+        s2 = f.mul(y2, f.mul(Z1, z1z1))
+        h = u2 - X1
+        hh = f.sqr(h)
+        i = f.carry(4 * hh)
+        j = f.mul(h, i)
+        r = 2 * (s2 - Y1)
+        v = f.mul(X1, i)
+        X3 = f.carry(f.sqr(r) - j - 2 * v)
+        Y3 = f.carry(f.mul(r, v - X3) - 2 * f.mul(Y1, j))
+        Z3 = f.carry(f.sqr(Z1 + h) - z1z1 - hh)
+        if mask is None:
+            return X3, Y3, Z3
+        return np.where(mask, X3, X1), np.where(mask, Y3, Y1), np.where(mask, Z3, Z1)
+
+    def _add(self, X1, Y1, Z1, X2, Y2, Z2, mask):
+        """
+        雅可比坐标 + 雅可比坐标（add-2007-bl）。mask 为 False 的路保持 (X1, Y1, Z1) 不变。
+        P == ±Q 或任意一个点为无穷远点时结果的 Z = 0。
+        """
+        f = self.field
+        z1z1 = f.sqr(Z1)
+        z2z2 = f.sqr(Z2)
+        u1 = f.mul(X1, z2z2)
+        u2 = f.mul(X2, z1z1)
+        s1 = f.mul(Y1, f.mul(Z2, z2z2))
+        s2 = f.mul(Y2, f.mul(Z1, z1z1))
+        h = u2 - u1
+        i = f.sqr(2 * h)
+        j = f.mul(h, i)
+        r = 2 * (s2 - s1)
+        v = f.mul(u1, i)
+        X3 = f.carry(f.sqr(r) - j - 2 * v)
+        Y3 = f.carry(f.mul(r, v - X3) - 2 * f.mul(s1, j))
+        Z3 = f.mul(f.carry(f.sqr(Z1 + Z2) - z1z1 - z2z2), h)
+        return np.where(mask, X3, X1), np.where(mask, Y3, Y1), np.where(mask, Z3, Z1)
+
+    def _to_affine(self, X, Y, Z):
+        """
+        转换为仿射坐标，整批只求一次逆；Z = 0 的路返回 None
+        """
+        p = self.curve.p
+        xs, ys, zs = self.field.to_ints(X), self.field.to_ints(Y), self.field.to_ints(Z)
+        lanes = [i for i, z in enumerate(zs) if z]
+        invs = self.curve.inverse_batch([zs[i] for i in lanes], p)
+        result = [None] * len(zs)
+        for i, inv in zip(lanes, invs):
+            inv2 = inv * inv % p
+            result[i] = int(xs[i] * inv2 % p), int(ys[i] * inv2 * inv % p)
+        return result
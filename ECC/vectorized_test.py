@@ -0,0 +1,39 @@
+"""
+vectorized.py 测试（需要安装 numpy）：python vectorized_test.py
+"""
+import random
+
+from curves import get_curve
+from vectorized import MIN_BATCH, VectorCurve
+
+
+def vector_test():
+    """向量化引擎的结果与 mult 相同，包括 0、负数、不小于 n 的标量、无穷远点和重复的点"""
+    rng = random.Random(0)
+    for name in ('P-192', 'P-256'):
+        curve = get_curve(name)
+        vector = VectorCurve(curve, chunk_size=16, min_batch=0)
+        peer = curve.mult(rng.randrange(1, curve.n), curve.g)
+        scalars = [0, 1, 2, -5, curve.n, curve.n + 3, curve.n - 1] + [rng.randrange(curve.n) for _ in range(30)]
+        assert vector.mult_base(scalars) == [curve.mult(k, curve.g) for k in scalars], name
+        pairs = [(k, peer) for k in scalars] + [(k, curve.g) for k in scalars[:10]] + [(7, None)]
+        assert vector.mult_many(pairs) == [curve.mult(k, dot) for k, dot in pairs], name
+
+
+def fallback_test():
+    """批大小小于 min_batch 时不构建预计算表，直接使用标量路径；默认的 min_batch 按后端选取"""
+    curve = get_curve('P-192')
+    scalars = [3, 5, 7]
+    vector = VectorCurve(curve, min_batch=4)
+    assert vector.mult_base(scalars) == [curve.mult(k, curve.g) for k in scalars]
+    assert vector._g_table is None
+    vector.mult_base(scalars + [11])
+    assert vector._g_table is not None
+    assert VectorCurve(curve).min_batch == MIN_BATCH.get(curve.backend.name)
+    assert VectorCurve(curve, min_batch=0).min_batch == 0
+
+
+if __name__ == '__main__':
+    vector_test()
+    fallback_test()
+    print('vectorized ok')
@@ -0,0 +1,230 @@
+"""
+大文件的流式混合加密
+
+RSA 只能加密小于 n 的整数，大数据的加密使用混合加密：用 RSA（或 ECC）封装一个随机的会话密钥，
+数据本身用会话密钥做 AES-256-GCM 加密。数据按固定大小分块处理，任何时候内存中只有一个块，
+与文件大小无关。
+
+密文格式：
+    "HYB1" | 封装数据长度 (2 字节) | 封装数据 | 块大小 (4 字节)
+    块 0 的密文 | 标签 (16 字节)
+    块 1 的密文 | 标签
+    ...
+除最后一块外每块明文都是块大小；最后一块短于块大小（可以为空），据此判断数据是否完整。
+块大小不能超过 MAX_CHUNK_SIZE，解密时拒绝文件头中更大的块大小，不会按不可信的长度分配内存。
+每块的 nonce 为 11 字节的块序号加 1 字节的“最后一块”标记，
+块被删除、调换顺序或截断时解密都会失败；文件头作为每一块的附加认证数据。
+
+密钥封装对象需要提供：
+    encapsulate() -> (会话密钥, 封装数据)
+    decapsulate(封装数据) -> 会话密钥
+本模块的 RSAKem 使用 RSA-KEM（ISO 18033-2），ECC/ecies.py 的 ECIESKem 使用 ECIES。
+
+    for data in encrypt_stream(open('big.bin', 'rb'), RSAKem(public_key)):
+        out.write(data)
+"""
+import mmap
+import secrets
+
+from Crypto.Cipher import AES
+from Crypto.Hash import SHA256
+from Crypto.Protocol.KDF import HKDF
+
+MAGIC = b'HYB1'
+TAG_SIZE = 16
+DEFAULT_CHUNK_SIZE = 1 << 20
+MAX_CHUNK_SIZE = 64 << 20
+
+
+class RSAKem:
+    """
+    RSA-KEM：随机选取 0 <= r < n，发送 c = r^e mod n，会话密钥为 HKDF-SHA256(r)。
+    r 是均匀随机的，不需要 OAEP 之类的填充。
+    """
+
+    def __init__(self, key, key_size=32):
+        """
+        :param key: RSAPublicKey 只能封装；RSAPrivateKey 可以封装和解封装
+        :param key_size: 会话密钥的字节数
+        """
+        self.key = key
+        self.key_size = key_size
+        self.modulus_size = (key.n.bit_length() + 7) // 8
+
+    def encapsulate(self):
+        r = secrets.randbelow(self.key.n)
+        c = pow(r, self.key.e, self.key.n)
+        return self._derive(r), c.to_bytes(self.modulus_size, 'big')
+
+    def decapsulate(self, header):
+        if len(header) != self.modulus_size:
+            raise ValueError('invalid encapsulated key')
+        return self._derive(self.key.decrypt(int.from_bytes(header, 'big')))
+
+    def _derive(self, r):
+        return HKDF(r.to_bytes(self.modulus_size, 'big'), self.key_size, b'', SHA256)
+
+
+def _nonce(index, last):
+    return index.to_bytes(11, 'big') + (b'\x01' if last else b'\x00')
+
+
+def _read_full(source, size):
+    """
+    读取 size 字节，只有到达流的末尾时才返回更短的数据。
+    管道、套接字和无缓冲的文件的 read 可能在中途返回较短的数据，不能据此判断流已经结束。
+    """
+    data = source.read(size)
+    if not data or len(data) == size:
+        return data
+    parts = bytearray(data)
+    while len(parts) < size:
+        data = source.read(size - len(parts))
+        if not data:
+            break
+        parts += data
+    return bytes(parts)
+
+
+def _read_chunks(source, size):
+    """
+    按 size 分块读取：source 为文件对象时调用 read，为 bytes / mmap 等缓冲区时用 memoryview 切片，不复制数据。
+    """
+    if hasattr(source, 'read'):
+        while True:
+            chunk = _read_full(source, size)
+            yield chunk
+            if len(chunk) < size:
+                return
+    else:
+        view = memoryview(source)
+        for start in range(0, len(view) + 1, size):
+            yield view[start:start + size]
+
+
+def encrypt_stream(source, kem, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    流式加密，逐段返回密文（生成器）
+    :param source: 以二进制方式打开的文件对象，或 bytes / mmap 等缓冲区
+    :param kem: 密钥封装对象，例如 RSAKem(public_key)
+    :param chunk_size: 块大小（字节），1 到 MAX_CHUNK_SIZE
+    :return:
+    """
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        raise ValueError('chunk size must be between 1 and %d' % MAX_CHUNK_SIZE)
+    key, encapsulated = kem.encapsulate()
+    header = MAGIC + len(encapsulated).to_bytes(2, 'big') + encapsulated + chunk_size.to_bytes(4, 'big')
+    yield header
+
+    for index, chunk in enumerate(_read_chunks(source, chunk_size)):
+        last = len(chunk) < chunk_size
+        cipher = AES.new(key, AES.MODE_GCM, nonce=_nonce(index, last))
+        cipher.update(header)
+        ciphertext, tag = cipher.encrypt_and_digest(chunk)
+        yield ciphertext
+        yield tag
+
+
+def _read_exact(source, size):
+    data = _read_full(source, size)
+    if len(data) != size:
+        raise ValueError('truncated stream')
+    return data
+
+
+def decrypt_stream(source, kem, max_chunk_size=MAX_CHUNK_SIZE):
+    """
+    流式解密，逐块返回明文（生成器）。任何一块认证失败或数据被截断时抛出 ValueError，
+    已经返回的明文块都通过了认证，但调用方应在生成器正常结束后才认为数据完整。
+    :param source: 以二进制方式打开的文件对象，或 bytes / mmap 等缓冲区
+    :param kem: 密钥封装对象，例如 RSAKem(private_key)
+    :param max_chunk_size: 文件头中允许的最大块大小，超过时抛出 ValueError
+    :return:
+    """
+    if not hasattr(source, 'read'):
+        source = _BufferReader(source)
+    if _read_exact(source, 4) != MAGIC:
+        raise ValueError('not a hybrid encrypted stream')
+    length = _read_exact(source, 2)
+    encapsulated = _read_exact(source, int.from_bytes(length, 'big'))
+    size = _read_exact(source, 4)
+    header = MAGIC + length + encapsulated + size
+    chunk_size = int.from_bytes(size, 'big')
+    if not 0 < chunk_size <= max_chunk_size:
+        raise ValueError('invalid chunk size %d' % chunk_size)
+    key = kem.decapsulate(encapsulated)
+
+    index = 0
+    while True:
+        block = _read_full(source, chunk_size + TAG_SIZE)
+        if len(block) < TAG_SIZE:
+            raise ValueError('truncated stream')
+        last = len(block) < chunk_size + TAG_SIZE
+        cipher = AES.new(key, AES.MODE_GCM, nonce=_nonce(index, last))
+        cipher.update(header)
+        block = memoryview(block)
+        yield cipher.decrypt_and_verify(block[:-TAG_SIZE], block[-TAG_SIZE:])
+        if last:
+            return
+        index += 1
+
+
+class _BufferReader:
+    """为 bytes / mmap 提供 read，返回 memoryview 切片，不复制数据"""
+
+    def __init__(self, buffer):
+        self.view = memoryview(buffer)
+        self.offset = 0
+
+    def read(self, size):
+        data = self.view[self.offset:self.offset + size]
+        self.offset += len(data)
+        return data
+
+
+def _transform_file(src_path, dst_path, stream, use_mmap):
+    with open(src_path, 'rb') as src, open(dst_path, 'wb') as dst:
+        if use_mmap:
+            try:
+                source = mmap.mmap(src.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:      # 空文件不能映射
+                source = src
+        else:
+            source = src
+        total = 0
+        chunks = stream(source)
+        try:
+            for data in chunks:
+                dst.write(data)
+                total += len(data)
+        finally:
+            # 先结束生成器，释放其中对 mmap 的 memoryview，否则 mmap 无法关闭
+            chunks.close()
+            if source is not src:
+                source.close()
+    return total
+
+
+def encrypt_file(src_path, dst_path, kem, chunk_size=DEFAULT_CHUNK_SIZE, use_mmap=False):
+    """
+    加密文件
+    :param src_path:
+    :param dst_path:
+    :param kem:
+    :param chunk_size:
+    :param use_mmap: 是否用 mmap 读取源文件
+    :return: 写入的字节数
+    """
+    return _transform_file(src_path, dst_path, lambda source: encrypt_stream(source, kem, chunk_size), use_mmap)
+
+
+def decrypt_file(src_path, dst_path, kem, use_mmap=False):
+    """
+    解密文件，认证失败时抛出 ValueError，此时 dst_path 中的内容不完整，不能使用
+    :param src_path:
+    :param dst_path:
+    :param kem:
+    :param use_mmap: 是否用 mmap 读取源文件
+    :return: 写入的字节数
+    """
+    return _transform_file(src_path, dst_path, lambda source: decrypt_stream(source, kem), use_mmap)
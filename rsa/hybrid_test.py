@@ -0,0 +1,132 @@
+"""
+hybrid.py 测试：python hybrid_test.py
+"""
+import io
+import os
+import random
+import tempfile
+
+from hybrid import (MAGIC, MAX_CHUNK_SIZE, TAG_SIZE, RSAKem, decrypt_file, decrypt_stream, encrypt_file,
+                    encrypt_stream)
+from rsa_keygen import generate_key
+
+KEY = generate_key(1024, rng=random.Random(0))
+KEM = RSAKem(KEY)
+HEADER_SIZE = len(MAGIC) + 2 + 128 + 4
+
+
+class ShortReader(io.RawIOBase):
+    """每次 read 最多返回 limit 字节，模拟管道或套接字"""
+
+    def __init__(self, data, limit=7):
+        self.data = io.BytesIO(data)
+        self.limit = limit
+
+    def readable(self):
+        return True
+
+    def read(self, size=-1):
+        if size is None or size < 0:
+            size = self.limit
+        return self.data.read(min(size, self.limit))
+
+
+def _encrypt(data, chunk_size, reader=io.BytesIO):
+    return b''.join(bytes(part) for part in encrypt_stream(reader(data), KEM, chunk_size))
+
+
+def _decrypt(data, reader=io.BytesIO):
+    return b''.join(bytes(part) for part in decrypt_stream(reader(data), KEM))
+
+
+def _expect_value_error(func, *args):
+    try:
+        func(*args)
+    except ValueError:
+        return
+    raise AssertionError('ValueError not raised')
+
+
+def round_trip_test():
+    """空数据、短于一块、正好整块、多块的数据，源为文件对象、短读取的流和 bytes 时都能还原"""
+    rng = random.Random(1)
+    for size in (0, 1, 99, 100, 250, 1000):
+        data = rng.randbytes(size)
+        ciphertext = _encrypt(data, 100)
+        # 每块带一个标签；数据是块大小的整数倍时还有一个空的最后一块
+        assert len(ciphertext) == HEADER_SIZE + size + (size // 100 + 1) * TAG_SIZE, size
+        assert _decrypt(ciphertext) == data
+        assert _decrypt(ciphertext, ShortReader) == data
+        assert b''.join(bytes(part) for part in decrypt_stream(ciphertext, KEM)) == data
+        assert _decrypt(_encrypt(data, 100, ShortReader), ShortReader) == data
+        assert b''.join(bytes(part) for part in encrypt_stream(data, KEM, 100))[HEADER_SIZE:] != ciphertext[HEADER_SIZE:]
+
+
+def short_read_test():
+    """短读取不会被当作数据结束：块的个数与一次读满时相同"""
+    data = random.Random(2).randbytes(1000)
+    full = _encrypt(data, 64)
+    short = _encrypt(data, 64, lambda d: ShortReader(d, 5))
+    assert len(full) == len(short)
+    assert _decrypt(short, ShortReader) == data
+
+
+def tamper_test():
+    """截断、删除一块、调换两块、改动任意一个字节都会导致解密失败"""
+    data = random.Random(3).randbytes(300)
+    ciphertext = _encrypt(data, 100)
+    block = 100 + TAG_SIZE
+    chunks = [ciphertext[HEADER_SIZE + i * block:HEADER_SIZE + (i + 1) * block] for i in range(4)]
+    header = ciphertext[:HEADER_SIZE]
+    variants = [
+        ciphertext[:-1],
+        ciphertext[:HEADER_SIZE + 2 * block],                   # 在块的边界处截断
+        header + chunks[0] + chunks[2] + chunks[3],             # 删除一块
+        header + chunks[1] + chunks[0] + chunks[2] + chunks[3],  # 调换顺序
+        ciphertext[:HEADER_SIZE - 1],
+        b'XXXX' + ciphertext[4:],
+    ]
+    for offset in (HEADER_SIZE - 1, HEADER_SIZE, HEADER_SIZE + 150, len(ciphertext) - 1):
+        tampered = bytearray(ciphertext)
+        tampered[offset] ^= 1
+        variants.append(bytes(tampered))
+    for variant in variants:
+        _expect_value_error(_decrypt, variant)
+
+
+def chunk_size_limit_test():
+    """块大小必须在 1 到 MAX_CHUNK_SIZE 之间；文件头中超出上限的块大小在分配内存之前被拒绝"""
+    for chunk_size in (0, -1, MAX_CHUNK_SIZE + 1):
+        _expect_value_error(_encrypt, b'data', chunk_size)
+    ciphertext = bytearray(_encrypt(b'data', 16))
+    for chunk_size in (0, MAX_CHUNK_SIZE + 1, 0xffffffff):
+        ciphertext[HEADER_SIZE - 4:HEADER_SIZE] = chunk_size.to_bytes(4, 'big')
+        _expect_value_error(_decrypt, bytes(ciphertext))
+    ciphertext[HEADER_SIZE - 4:HEADER_SIZE] = (32).to_bytes(4, 'big')
+    _expect_value_error(lambda: list(decrypt_stream(bytes(ciphertext), KEM, max_chunk_size=16)))
+
+
+def file_test():
+    """encrypt_file / decrypt_file，普通读取与 mmap 读取（包括不能映射的空文件）"""
+    rng = random.Random(4)
+    with tempfile.TemporaryDirectory() as tmp:
+        plain, encrypted, decrypted = (os.path.join(tmp, name) for name in ('plain', 'encrypted', 'decrypted'))
+        for size in (0, 1, 4096, 10000):
+            data = rng.randbytes(size)
+            with open(plain, 'wb') as f:
+                f.write(data)
+            for use_mmap in (False, True):
+                written = encrypt_file(plain, encrypted, KEM, 4096, use_mmap)
+                assert written == os.path.getsize(encrypted)
+                assert decrypt_file(encrypted, decrypted, KEM, use_mmap) == size
+                with open(decrypted, 'rb') as f:
+                    assert f.read() == data, (size, use_mmap)
+
+
+if __name__ == '__main__':
+    round_trip_test()
+    short_read_test()
+    tamper_test()
+    chunk_size_limit_test()
+    file_test()
+    print('hybrid ok')
@@ -10,6 +10,8 @@
 8. 欧拉定理表明 若n,a为正整数，且n,a 互质，则有a^(φ(n))≡1(mod n)。
 9. 由 7，8 可得 （a^φ(N)）%n =1
 """
+from rsa_key import RSAPrivateKey
+
 # simple test
 p = 17
 q = 19
@@ -27,11 +29,18 @@ d = 173  # 满足 e*d = f_n * 3 +1
 
 # 明文 m = 123
 m = 123
-c = (m**e) % n
+# 三参数 pow 在每一步乘法后取模，不会先算出完整的 m**e、c**d
+c = pow(m, e, n)
 print("加密后数据为：", c)
-dec = (c**d) % n
+dec = pow(c, d, n)
 print("解密后数据为：", dec)
 
+# 使用密钥对象，私钥解密使用 CRT（见 rsa_key.py）
+key = RSAPrivateKey(p, q, e, d)
+c = key.public_key().encrypt(m)
+print("加密后数据为：", c)
+print("CRT 解密后数据为：", key.decrypt(c))
+
 
 
 
@@ -0,0 +1,150 @@
+"""
+批量 RSA 解密（Fiat, "Batch RSA", 1989）
+
+同一个模数 n 配多个互不相同、两两互质的小公钥指数 e1, e2, ..., eb，
+每个 ei 对应一个私钥指数 di。b 个分别用 ei 加密的密文 ci 可以只用一次完整的私钥模幂一起解密：
+
+1. 向上：把密文放在二叉树的叶子上，节点 S 保存 E(S) = ∏ ei 和 v(S) = ∏ ci^(E(S)/ei)，
+   v(S) = v(L)^E(R) * v(R)^E(L)，只用到以小指数 ei 为指数的模幂；
+2. 根：m = v^(1/E) mod n，这是唯一一次完整长度的模幂（用 CRT 计算），m = ∏ mi；
+3. 向下：对节点 S 取 X = 0 (mod E(L))、X = 1 (mod E(R))，则
+        m(R) = m(S)^X / (v(L)^(X/E(L)) * v(R)^((X-1)/E(R)))
+        m(L) = m(S) / m(R)
+   一直分到叶子，得到每个 mi = ci^di。
+
+批量大小为 b 时，完整模幂的次数从 b 次降为 1 次，额外开销是每个节点的几次小指数模幂和两次求逆。
+Fiat 算法要求指数两两互质，BatchRSAKey 拒绝不满足的指数。
+"""
+import collections
+import math
+
+from rsa_key import RSAPrivateKey
+from rsa_keygen import generate_key
+
+
+class BatchRSAKey:
+    """
+    共享同一个模数、使用多个公钥指数的 RSA 私钥
+    """
+
+    def __init__(self, primes, exponents):
+        """
+        :param primes: 模数的素因子 [p, q, ...]，多于两个时为多素数 RSA
+        :param exponents: 两两互质的公钥指数列表，每个都需要与 φ(n) 互质
+        """
+        if len(set(exponents)) != len(exponents):
+            raise ValueError('exponents must be different')
+        if not all(math.gcd(a, b) == 1 for i, a in enumerate(exponents) for b in exponents[i + 1:]):
+            raise ValueError('exponents must be pairwise coprime')
+        p, q, *others = primes
+        self.keys = {e: RSAPrivateKey(p, q, e, other_primes=others) for e in exponents}
+        self.key = self.keys[exponents[0]]
+        self.n = self.key.n
+        self.exponents = list(exponents)
+        self._root_exponents = {}
+
+    def public_keys(self):
+        return [self.keys[e].public_key() for e in self.exponents]
+
+    def decrypt(self, c, e):
+        """
+        解密用公钥指数 e 加密的密文 c
+        """
+        return self.keys[e].decrypt(c)
+
+    def decrypt_batch(self, items):
+        """
+        解密一批密文。每次从各个指数的队列中各取一个密文组成一批，用 Fiat 算法一起解密；
+        只剩一个指数的密文时逐个用 CRT 解密。
+        :param items: [(c, e), ...]
+        :return: 明文列表，顺序与 items 相同
+        """
+        queues = collections.defaultdict(collections.deque)
+        for index, (c, e) in enumerate(items):
+            if e not in self.keys:
+                raise KeyError('unknown exponent: %d' % e)
+            if not 0 <= c < self.n:
+                raise ValueError('ciphertext out of range')
+            queues[e].append(index)
+
+        result = [None] * len(items)
+        while queues:
+            batch = [(queue.popleft(), e) for e, queue in queues.items()]
+            for e in [e for e, queue in queues.items() if not queue]:
+                del queues[e]
+            if len(batch) == 1:
+                for index, e in batch:
+                    result[index] = self.keys[e].decrypt(items[index][0])
+                continue
+            plain = self._fiat([(items[index][0], e) for index, e in batch])
+            for (index, _), m in zip(batch, plain):
+                result[index] = m
+        return result
+
+    def _fiat(self, batch):
+        """
+        用 Fiat 算法解密一批指数互不相同的密文 [(c, e), ...]
+        """
+        root = self._up(batch)
+        try:
+            plain = []
+            self._down(root, self._root(root[1], root[0]), plain)
+            return plain
+        except ValueError:
+            # 某个中间值与 n 不互素（概率可以忽略，例如 c = 0），逐个解密
+            return [self.keys[e].decrypt(c) for c, e in batch]
+
+    def _root(self, v, E):
+        """v 的 E 次方根 v^(1/E) mod n"""
+        exponents = self._root_exponents.get(E)
+        if exponents is None:
+            exponents = self._root_exponents[E] = [pow(E, -1, r - 1) for r in self.key.primes]
+        return self.key.crt_pow(v, exponents)
+
+    def _up(self, items):
+        """
+        构造乘积树，节点为 (E, v, left, right)，叶子的 left、right 为 None
+        """
+        if len(items) == 1:
+            c, e = items[0]
+            return e, c, None, None
+        n = self.n
+        half = len(items) // 2
+        left, right = self._up(items[:half]), self._up(items[half:])
+        E_L, v_L = left[0], left[1]
+        E_R, v_R = right[0], right[1]
+        return E_L * E_R, pow(v_L, E_R, n) * pow(v_R, E_L, n) % n, left, right
+
+    def _down(self, node, m, plain):
+        """
+        把节点的根 m 拆分到两个子节点，叶子的结果按顺序追加到 plain
+        """
+        _, _, left, right = node
+        if left is None:
+            plain.append(m)
+            return
+        n = self.n
+        E_L, v_L = left[0], left[1]
+        E_R, v_R = right[0], right[1]
+        # X = 0 (mod E_L), X = 1 (mod E_R)
+        X = E_L * pow(E_L, -1, E_R)
+        divisor = pow(v_L, X // E_L, n) * pow(v_R, (X - 1) // E_R, n) % n
+        m_R = pow(m, X, n) * pow(divisor, -1, n) % n
+        m_L = m * pow(m_R, -1, n) % n
+        self._down(left, m_L, plain)
+        self._down(right, m_R, plain)
+
+
+def generate_batch_key(bits=2048, exponents=(3, 5, 7, 11), workers=None, rng=None, primes=2):
+    """
+    生成 bits 位、使用 exponents 中各个公钥指数的批量 RSA 密钥
+    :param bits:
+    :param exponents: 两两互质的小公钥指数
+    :param workers:
+    :param rng:
+    :param primes: 素数个数
+    :return: BatchRSAKey
+    """
+    # 要求 gcd(∏ ei, r-1) = 1，即每个 ei 都与 φ(n) 互质
+    key = generate_key(bits, math.prod(exponents), workers, rng, primes)
+    return BatchRSAKey(key.primes, exponents)
@@ -0,0 +1,70 @@
+"""
+rsa_batch.py 测试：python rsa_batch_test.py
+"""
+import random
+
+from rsa_batch import BatchRSAKey, generate_batch_key
+
+EXPONENTS = (3, 5, 7, 11, 13)
+
+
+def _expect_value_error(func, *args):
+    try:
+        func(*args)
+    except ValueError:
+        return
+    raise AssertionError('ValueError not raised')
+
+
+def _items(key, rng, exponents, messages=None):
+    publics = dict(zip(key.exponents, key.public_keys()))
+    messages = messages or [rng.randrange(key.n) for _ in exponents]
+    return [(publics[e].encrypt(m), e) for m, e in zip(messages, exponents)], messages
+
+
+def fiat_batch_test():
+    """各种批量大小与指数组合（包括同一批中重复的指数）的结果与逐个解密相同"""
+    rng = random.Random(0)
+    for primes in (2, 3):
+        key = generate_batch_key(512, EXPONENTS, rng=random.Random(primes), primes=primes)
+        for exponents in ([3], [5, 7], list(EXPONENTS), [3, 3, 5, 11, 3, 13, 5], [7] * 4):
+            items, messages = _items(key, rng, exponents)
+            assert key.decrypt_batch(items) == messages, (primes, exponents)
+            assert [key.decrypt(c, e) for c, e in items] == messages
+        assert key.decrypt_batch([]) == []
+
+
+def non_unit_test():
+    """c = 0、c = 1 与不是模 n 单位的密文（p 的倍数）也能正确解密"""
+    key = generate_batch_key(512, EXPONENTS, rng=random.Random(7))
+    p = key.key.p
+    rng = random.Random(1)
+    messages = [0, 1, p, 2 * p, rng.randrange(key.n)]
+    items, _ = _items(key, rng, EXPONENTS, messages)
+    assert key.decrypt_batch(items) == messages
+    # 密文本身为 0 和 1
+    assert key.decrypt_batch([(0, 3), (1, 5), (0, 7)]) == [0, 1, 0]
+
+
+def rejected_test():
+    """指数重复、不两两互质或与 φ(n) 不互质时拒绝；密文超出范围、未知指数时拒绝"""
+    key = generate_batch_key(512, EXPONENTS, rng=random.Random(9))
+    primes = key.key.primes
+    _expect_value_error(BatchRSAKey, primes, (3, 3))
+    _expect_value_error(BatchRSAKey, primes, (3, 5, 15))
+    _expect_value_error(BatchRSAKey, primes, (5, 10))
+    _expect_value_error(BatchRSAKey, [7, 11], (3,))        # gcd(3, φ(77)) = 3
+    _expect_value_error(key.decrypt_batch, [(key.n, 3)])
+    try:
+        key.decrypt_batch([(2, 17)])
+    except KeyError:
+        pass
+    else:
+        raise AssertionError('unknown exponent accepted')
+
+
+if __name__ == '__main__':
+    fiat_batch_test()
+    non_unit_test()
+    rejected_test()
+    print('rsa_batch ok')
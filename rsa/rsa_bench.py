@@ -0,0 +1,192 @@
+"""
+RSA 性能测试
+
+    python rsa_bench.py
+    python rsa_bench.py --bits 2048,4096
+    python rsa_bench.py --keygen 2048,3072 --keygen-count 20 --workers 4
+    python rsa_bench.py --batch 2048                # 多素数 RSA 与 Fiat 批量解密的吞吐量
+    python rsa_bench.py --stream 4096               # 4 GB 文件的流式混合加密吞吐量
+
+--stream 同时测试 ECC/ecies.py 的 ECIESKem。ECC 与 rsa 是两个平级的目录，需要把 ECC 加入模块搜索路径：
+
+    PYTHONPATH=../ECC python rsa_bench.py --stream 4096
+
+找不到 ECC 时只测试 RSA-KEM。
+"""
+import argparse
+import os
+import random
+import resource
+import statistics
+import tempfile
+import time
+import timeit
+from concurrent.futures import ProcessPoolExecutor
+
+from hybrid import RSAKem, decrypt_file, encrypt_file
+from rsa_batch import generate_batch_key
+from rsa_key import RSAPrivateKey
+from rsa_keygen import generate_key
+
+try:
+    from curves import get_curve
+    from ecies import ECIESKem
+except ImportError:     # ECC 目录不在 PYTHONPATH 中，见模块说明
+    ECIESKem = None
+
+
+def test_key(bits, seed=0):
+    """
+    生成测试用的 bits 位 RSA 私钥（e = 65537）
+    :param bits: n 的位数
+    :param seed:
+    :return:
+    """
+    return generate_key(bits, rng=random.Random(seed))
+
+
+def decrypt_benchmark(bits_list, number=5):
+    """
+    比较 CRT 解密与直接 pow(c, d, n) 解密的耗时
+    :param bits_list:
+    :param number: 每项调用次数
+    :return:
+    """
+    print("%6s %12s %12s %12s %8s" % ("bits", "encrypt", "pow(c,d,n)", "crt", "speedup"))
+    for bits in bits_list:
+        key = test_key(bits)
+        public = key.public_key()
+        m = random.Random(bits).randrange(key.n)
+        c = public.encrypt(m)
+        assert key.decrypt(c) == key.decrypt_without_crt(c) == m
+
+        encrypt = min(timeit.repeat(lambda: public.encrypt(m), number=number, repeat=3)) / number
+        plain = min(timeit.repeat(lambda: key.decrypt_without_crt(c), number=number, repeat=3)) / number
+        crt = min(timeit.repeat(lambda: key.decrypt(c), number=number, repeat=3)) / number
+        print("%6d %10.3fms %10.3fms %10.3fms %7.2fx" % (bits, encrypt * 1e3, plain * 1e3, crt * 1e3, plain / crt))
+
+
+def keygen_benchmark(bits_list, count=10, workers=None):
+    """
+    密钥生成的平均耗时与尾部耗时。素数的搜索时间随机性很大，只看平均值会掩盖偶尔很慢的情况。
+    :param bits_list:
+    :param count: 每种位数生成的密钥个数
+    :param workers: 工作进程数，None 表示单进程；多进程时所有密钥共用一个进程池
+    :return:
+    """
+    print("%6s %8s %10s %10s %10s %10s" % ("bits", "workers", "mean", "p50", "p95", "max"))
+    executor = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+    for bits in bits_list:
+        elapsed = []
+        for _ in range(count):
+            start = time.perf_counter()
+            key = generate_key(bits, workers=workers, executor=executor)
+            elapsed.append(time.perf_counter() - start)
+            assert key.n.bit_length() == bits
+        elapsed.sort()
+        p95 = elapsed[min(len(elapsed) - 1, int(len(elapsed) * 0.95))]
+        print("%6d %8s %9.3fs %9.3fs %9.3fs %9.3fs"
+              % (bits, workers or 1, statistics.mean(elapsed), statistics.median(elapsed), p95, elapsed[-1]))
+    if executor is not None:
+        executor.shutdown()
+
+
+def batch_benchmark(bits, total=64, exponents=(3, 5, 7, 11, 13, 17, 19, 23)):
+    """
+    单核解密吞吐量（每秒解密次数）：2~4 个素数的 CRT 逐个解密，以及不同批量大小的 Fiat 批量解密
+    :param bits:
+    :param total: 每项解密的密文个数
+    :param exponents: Fiat 批量解密使用的公钥指数，批量大小取其前 2、4、8 个
+    :return:
+    """
+    rng = random.Random(bits)
+
+    def throughput(func, items):
+        start = time.perf_counter()
+        func(items)
+        return len(items) / (time.perf_counter() - start)
+
+    print("%6s %24s %12s %8s" % ("bits", "mode", "decrypt/s", "speedup"))
+    base = None
+    for primes in (2, 3, 4):
+        key = generate_key(bits, rng=rng, primes=primes)
+        ciphertexts = [rng.randrange(key.n) for _ in range(total)]
+        assert key.decrypt_many(ciphertexts[:2]) == [key.decrypt_without_crt(c) for c in ciphertexts[:2]]
+        rate = throughput(lambda items: [key.decrypt(c) for c in items], ciphertexts)
+        base = base or rate
+        print("%6d %24s %12.1f %7.2fx" % (bits, "crt, %d primes" % primes, rate, rate / base))
+
+    for size in (2, 4, 8):
+        for primes in (2, 3):
+            key = generate_batch_key(bits, exponents[:size], rng=rng, primes=primes)
+            items = [(rng.randrange(key.n), key.exponents[i % size]) for i in range(total)]
+            assert key.decrypt_batch(items[:size]) == [key.decrypt(c, e) for c, e in items[:size]]
+            rate = throughput(key.decrypt_batch, items)
+            print("%6d %24s %12.1f %7.2fx" % (bits, "fiat b=%d, %d primes" % (size, primes), rate, rate / base))
+
+
+def stream_benchmark(size_mb, chunk_size=1 << 20, directory=None):
+    """
+    流式混合加密大文件的吞吐量（MB/s）：RSA-KEM（3072 位）与 ECIES（P-256，需要 ECC 目录），普通读取与 mmap 读取。
+    同时打印进程的峰值内存，不使用 mmap 时它不随文件大小增长。
+    :param size_mb: 测试文件大小（MB）
+    :param chunk_size: 块大小（字节）
+    :param directory: 临时文件目录，默认为系统临时目录
+    :return:
+    """
+    key = generate_key(3072)
+    kems = [("rsa-kem 3072", RSAKem(key.public_key()), RSAKem(key))]
+    if ECIESKem is not None:
+        curve = get_curve("P-256")
+        private = random.SystemRandom().randrange(1, curve.n)
+        kems.append(("ecies P-256", ECIESKem(curve, private=private), ECIESKem(curve, private=private)))
+    else:
+        print("ecies: ECC not on PYTHONPATH, skipped (PYTHONPATH=../ECC)")
+
+    with tempfile.TemporaryDirectory(dir=directory) as tmp:
+        plain, encrypted, decrypted = (os.path.join(tmp, name) for name in ("plain", "encrypted", "decrypted"))
+        block = os.urandom(1 << 20)
+        with open(plain, "wb") as f:
+            for _ in range(size_mb):
+                f.write(block)
+
+        print("%6s MB %16s %6s %12s %12s %10s" % (size_mb, "kem", "mmap", "encrypt", "decrypt", "max rss"))
+        # mmap 映射的文件页也计入 rss，先测不使用 mmap 的情况
+        for use_mmap in (False, True):
+            for label, sender, receiver in kems:
+                start = time.perf_counter()
+                encrypt_file(plain, encrypted, sender, chunk_size, use_mmap)
+                encrypt = size_mb / (time.perf_counter() - start)
+                start = time.perf_counter()
+                decrypt_file(encrypted, decrypted, receiver, use_mmap)
+                decrypt = size_mb / (time.perf_counter() - start)
+                assert os.path.getsize(decrypted) == size_mb << 20
+                rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+                print("%9s %16s %6s %9.1fMB/s %9.1fMB/s %8.1fMB" % ("", label, use_mmap, encrypt, decrypt, rss))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RSA benchmark")
+    parser.add_argument("--bits", default="2048,4096", help="comma separated key sizes")
+    parser.add_argument("--keygen", metavar="BITS,BITS,...", help="also benchmark key generation for these sizes")
+    parser.add_argument("--keygen-count", type=int, default=10, help="keys generated per size")
+    parser.add_argument("--workers", type=int, help="worker processes for the key generation benchmark")
+    parser.add_argument("--batch", metavar="BITS", type=int, help="also benchmark multi-prime and batch decryption")
+    parser.add_argument("--stream", metavar="MB", type=int, help="also benchmark streaming file encryption")
+    args = parser.parse_args(argv)
+
+    # 课本中的小例子
+    key = RSAPrivateKey(17, 19, 5, 173)
+    assert key.public_key().encrypt(123) == 225 and key.decrypt(225) == 123
+
+    decrypt_benchmark([int(bits) for bits in args.bits.split(",")])
+    if args.keygen:
+        keygen_benchmark([int(bits) for bits in args.keygen.split(",")], args.keygen_count, args.workers)
+    if args.batch:
+        batch_benchmark(args.batch)
+    if args.stream:
+        stream_benchmark(args.stream)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""
+RSA 公钥、私钥
+
+    加密: c = m^e mod n
+    解密: m = c^d mod n
+
+私钥运算使用中国剩余定理（CRT）：预先计算
+    dP = d mod (p-1), dQ = d mod (q-1), qInv = q^(-1) mod p
+解密时
+    m1 = c^dP mod p, m2 = c^dQ mod q
+    h = qInv * (m1 - m2) mod p
+    m = m2 + h * q
+两次模幂的模数和指数都只有 n 的一半长，比直接计算 c^d mod n 快 3~4 倍。
+
+多素数 RSA（RFC 8017）：n = r1 * r2 * ... * ru，r1 = p，r2 = q，其余素数 ri 各自保存
+    di = d mod (ri-1), ti = (r1 * ... * r(i-1))^(-1) mod ri
+解密时对每个素数做一次模幂 mi = c^di mod ri，再用 Garner 算法逐个合并：
+    R = p * q, m = m2 + h * q（同上）
+    h = (mi - m) * ti mod ri, m = m + R * h, R = R * ri
+u 个素数时每次模幂的长度只有 n 的 1/u，2048 位时 3 个素数比 2 个素数快约 2 倍，4 个素数约 2.5 倍。
+"""
+
+
+class RSAPublicKey:
+    """
+    RSA 公钥 (n, e)
+    """
+
+    def __init__(self, n, e):
+        self.n = n
+        self.e = e
+
+    def encrypt(self, m):
+        """
+        :param m: 明文，0 <= m < n
+        :return: 密文 c = m^e mod n
+        """
+        if not 0 <= m < self.n:
+            raise ValueError('message out of range')
+        return pow(m, self.e, self.n)
+
+
+class RSAPrivateKey:
+    """
+    RSA 私钥，保存 p、q 以及 CRT 参数 dP、dQ、qInv
+    """
+
+    def __init__(self, p, q, e=65537, d=None, other_primes=()):
+        """
+        :param p: 素数
+        :param q: 素数，p != q
+        :param e: 公钥指数，需要与 φ(n) 互质
+        :param d: 私钥指数，默认由 e 计算: e * d = 1 (mod φ(n))
+        :param other_primes: 多素数 RSA 的其余素数 r3, r4, ...（RFC 8017 otherPrimeInfos）
+        """
+        primes = [p, q, *other_primes]
+        if len(set(primes)) != len(primes):
+            raise ValueError('primes must be different')
+        self.p = p
+        self.q = q
+        self.primes = primes
+        self.n = 1
+        phi = 1
+        for r in primes:
+            self.n *= r
+            phi *= r - 1
+        self.e = e
+        self.d = d if d is not None else pow(e, -1, phi)
+
+        self.dP = self.d % (p - 1)
+        self.dQ = self.d % (q - 1)
+        self.qInv = pow(q, -1, p)
+
+        # 其余素数的 (ri, di, ti)
+        self.other_prime_infos = []
+        R = p * q
+        for r in other_primes:
+            self.other_prime_infos.append((r, self.d % (r - 1), pow(R, -1, r)))
+            R *= r
+
+    def public_key(self):
+        return RSAPublicKey(self.n, self.e)
+
+    def decrypt(self, c):
+        """
+        使用 CRT 解密
+        :param c: 密文，0 <= c < n
+        :return: 明文 m = c^d mod n
+        """
+        if not 0 <= c < self.n:
+            raise ValueError('ciphertext out of range')
+        p, q = self.p, self.q
+        m1 = pow(c, self.dP, p)
+        m2 = pow(c, self.dQ, q)
+        h = self.qInv * (m1 - m2) % p
+        m = m2 + h * q
+        if self.other_prime_infos:
+            m = self._garner(m, p * q, [(r, pow(c, d, r), t) for r, d, t in self.other_prime_infos])
+        return m
+
+    def decrypt_many(self, ciphertexts):
+        """
+        用同一个私钥解密多个密文，CRT 参数只查找一次
+        :param ciphertexts:
+        :return: 明文列表，顺序与 ciphertexts 相同
+        """
+        n, p, q, dP, dQ, qInv = self.n, self.p, self.q, self.dP, self.dQ, self.qInv
+        others = self.other_prime_infos
+        result = []
+        for c in ciphertexts:
+            if not 0 <= c < n:
+                raise ValueError('ciphertext out of range')
+            m2 = pow(c, dQ, q)
+            m = m2 + qInv * (pow(c, dP, p) - m2) % p * q
+            if others:
+                m = self._garner(m, p * q, [(r, pow(c, d, r), t) for r, d, t in others])
+            result.append(m)
+        return result
+
+    def crt_pow(self, c, exponents):
+        """
+        计算 c 的模幂，exponents 为每个素数 ri 对应的指数（已对 ri-1 取模），用 Garner 算法合并
+        :param c:
+        :param exponents: 与 self.primes 一一对应
+        :return:
+        """
+        p, q = self.p, self.q
+        m2 = pow(c, exponents[1], q)
+        m = m2 + self.qInv * (pow(c, exponents[0], p) - m2) % p * q
+        if self.other_prime_infos:
+            m = self._garner(m, p * q, [(r, pow(c, d, r), t)
+                                        for (r, _, t), d in zip(self.other_prime_infos, exponents[2:])])
+        return m
+
+    @staticmethod
+    def _garner(m, R, residues):
+        """
+        把 m (mod R) 与其余素数上的结果 mi (mod ri) 合并（RFC 8017 5.1.2 步骤 2.b）
+        :param m:
+        :param R: 已合并的素数之积
+        :param residues: [(ri, mi, ti), ...]
+        :return:
+        """
+        for r, mi, t in residues:
+            h = (mi - m) * t % r
+            m += R * h
+            R *= r
+        return m
+
+    def decrypt_without_crt(self, c):
+        """
+        不使用 CRT 解密，结果与 decrypt 相同，用于对比测试
+        :param c:
+        :return:
+        """
+        if not 0 <= c < self.n:
+            raise ValueError('ciphertext out of range')
+        return pow(c, self.d, self.n)
@@ -0,0 +1,68 @@
+"""
+rsa_key.py 测试：python rsa_key_test.py
+"""
+import random
+
+from rsa_key import RSAPrivateKey
+from rsa_keygen import generate_prime
+
+
+def _key(prime_count, bits=256, seed=0):
+    rng = random.Random(seed)
+    primes = []
+    while len(primes) < prime_count:
+        r = generate_prime(bits, rng=rng)
+        if r not in primes:
+            primes.append(r)
+    return RSAPrivateKey(primes[0], primes[1], other_primes=primes[2:])
+
+
+def _expect_value_error(func, *args):
+    try:
+        func(*args)
+    except ValueError:
+        return
+    raise AssertionError('ValueError not raised')
+
+
+def round_trip_test():
+    """2、3、4 个素数时 CRT 解密、decrypt_many 与不使用 CRT 的解密结果相同"""
+    rng = random.Random(1)
+    for prime_count in (2, 3, 4):
+        key = _key(prime_count, seed=prime_count)
+        public = key.public_key()
+        messages = [0, 1, 2, key.n - 1] + [rng.randrange(key.n) for _ in range(20)]
+        ciphertexts = [public.encrypt(m) for m in messages]
+        assert [key.decrypt(c) for c in ciphertexts] == messages, prime_count
+        assert key.decrypt_many(ciphertexts) == messages, prime_count
+        for c in [0, 1, key.n - 1] + ciphertexts[4:8]:
+            assert key.decrypt(c) == key.decrypt_without_crt(c), (prime_count, c)
+        exponents = [key.d % (r - 1) for r in key.primes]
+        assert key.crt_pow(ciphertexts[5], exponents) == messages[5]
+
+
+def edge_values_test():
+    """c = 0 与 c = 1 是不动点"""
+    for prime_count in (2, 3):
+        key = _key(prime_count, seed=10 + prime_count)
+        assert key.decrypt(0) == 0 and key.decrypt(1) == 1
+        assert key.decrypt_many([0, 1]) == [0, 1]
+
+
+def out_of_range_test():
+    """c 不小于 n 或为负数时抛出 ValueError；重复的素数被拒绝"""
+    key = _key(3, seed=20)
+    for c in (key.n, key.n + 1, -1):
+        _expect_value_error(key.decrypt, c)
+        _expect_value_error(key.decrypt_many, [1, c])
+        _expect_value_error(key.decrypt_without_crt, c)
+    _expect_value_error(key.public_key().encrypt, key.n)
+    _expect_value_error(RSAPrivateKey, key.p, key.p)
+    _expect_value_error(RSAPrivateKey, key.p, key.q, 65537, None, (key.p,))
+
+
+if __name__ == '__main__':
+    round_trip_test()
+    edge_values_test()
+    out_of_range_test()
+    print('rsa_key ok')
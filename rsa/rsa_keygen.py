@@ -0,0 +1,212 @@
+"""
+RSA 密钥生成
+
+1. 随机选取一个最高两位为 1 的奇数作为起点，对其后 window 个奇数用小素数筛去明显的合数；
+2. 剩下的候选数用 Miller-Rabin 测试，轮数按 FIPS 186-4 附录 C.3 根据素数的位数选取；
+3. 需要时把不同起点的搜索分发到多个工作进程，按提交顺序取用找到的素数。
+
+多进程时每个搜索任务的起点来自 rng 派生的种子，结果按提交顺序取用，给出种子确定的 rng 和相同的进程数时结果与调度无关，可以复现。
+"""
+import collections
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from rsa_key import RSAPrivateKey
+
+# 用于筛选的小素数（不含 2）
+SMALL_PRIMES = [p for p in range(3, 2000) if all(p % d for d in range(2, int(p ** 0.5) + 1))]
+
+
+def miller_rabin_rounds(bits):
+    """
+    Miller-Rabin 测试的轮数（FIPS 186-4 附录 C.3 表 C.3，按素数 p、q 的位数取对应的行）
+    :param bits: 素数的位数
+    :return:
+    """
+    # 表 C.3，p、q 为 1536 位（nlen = 3072）的行
+    if bits >= 1536:
+        return 4
+    # 表 C.3，p、q 为 1024 位（nlen = 2048）的行
+    if bits >= 1024:
+        return 5
+    # 表 C.3，p、q 为 512 位（nlen = 1024）的行
+    if bits >= 512:
+        return 7
+    # 更短的素数不在表中：40 轮对任意奇合数的错误概率不超过 4^-40 = 2^-80，与候选数的分布无关
+    return 40
+
+
+def is_probable_prime(n, rounds=None, rng=None):
+    """
+    Miller-Rabin 素性测试
+    :param n: 待测试的奇数
+    :param rounds: 测试轮数，默认按 miller_rabin_rounds(n 的位数)
+    :param rng: 随机数生成器，默认使用系统随机数
+    :return:
+    """
+    if n < 2:
+        return False
+    for p in SMALL_PRIMES[:20]:
+        if n % p == 0:
+            return n == p
+    if n % 2 == 0:
+        return n == 2
+
+    rounds = rounds or miller_rabin_rounds(n.bit_length())
+    rng = rng or random.SystemRandom()
+
+    # n - 1 = d * 2^s，d 为奇数
+    d, s = n - 1, 0
+    while d % 2 == 0:
+        d //= 2
+        s += 1
+
+    for _ in range(rounds):
+        x = pow(rng.randrange(2, n - 1), d, n)
+        if x == 1 or x == n - 1:
+            continue
+        for _ in range(s - 1):
+            x = x * x % n
+            if x == n - 1:
+                break
+        else:
+            return False
+    return True
+
+
+def search_window(bits, e=65537, window=None, rng=None):
+    """
+    从一个随机起点开始，在 window 个连续奇数中寻找满足 gcd(e, p-1) = 1 的 bits 位素数。
+    先用小素数筛去候选数中的合数，只对剩下的数做 Miller-Rabin 测试。
+    :param bits: 素数的位数
+    :param e: 公钥指数
+    :param window: 搜索的奇数个数，默认为 4 * bits，一个窗口中平均有约 5 个素数
+    :param rng: 随机数生成器，默认使用系统随机数
+    :return: 找到的素数，没有找到时返回 None
+    """
+    rng = rng or random.SystemRandom()
+    window = window or 4 * bits
+
+    # 最高两位置 1，保证两个素数的乘积正好是 2 * bits 位
+    start = rng.getrandbits(bits) | (3 << (bits - 2)) | 1
+
+    # sieve[i] 表示 start + 2 * i 是否有小素数因子
+    sieve = bytearray(window)
+    for p in SMALL_PRIMES:
+        # start + 2i = 0 (mod p)  =>  i = -start * 2^(-1) (mod p)
+        i = -start * ((p + 1) // 2) % p
+        if i < window:
+            sieve[i::p] = b'\x01' * ((window - 1 - i) // p + 1)
+
+    rounds = miller_rabin_rounds(bits)
+    for i in range(window):
+        if sieve[i]:
+            continue
+        candidate = start + 2 * i
+        if candidate.bit_length() != bits:
+            return None
+        if math.gcd(e, candidate - 1) == 1 and is_probable_prime(candidate, rounds, rng):
+            return candidate
+    return None
+
+
+def generate_prime(bits, e=65537, rng=None):
+    """
+    生成 bits 位素数 p，满足 gcd(e, p-1) = 1
+    :param bits:
+    :param e:
+    :param rng:
+    :return:
+    """
+    while True:
+        prime = search_window(bits, e, rng=rng)
+        if prime is not None:
+            return prime
+
+
+def _parallel_primes(executor, workers, bits, e, count, rng=None):
+    """
+    多个工作进程从不同的随机起点同时搜索，按提交顺序取用找到的 count 个素数。
+    每个任务只搜索一个窗口，找到足够的素数后剩下的任务很快结束，不会长时间占用进程。
+    :param executor: ProcessPoolExecutor
+    :param workers: 同时提交的任务数
+    :param rng: 用于派生每个任务起点的种子，None 时每个任务使用系统随机数
+    """
+    def submit():
+        task_rng = None if rng is None else random.Random(rng.getrandbits(64))
+        return executor.submit(search_window, bits, e, None, task_rng)
+
+    primes = []
+    pending = collections.deque(submit() for _ in range(workers))
+    while len(primes) < count:
+        prime = pending.popleft().result()
+        if prime is not None and prime not in primes:
+            primes.append(prime)
+        pending.append(submit())
+    for future in pending:
+        future.cancel()
+    return primes
+
+
+def generate_key(bits=2048, e=65537, workers=None, rng=None, primes=2, executor=None):
+    """
+    生成 bits 位的 RSA 私钥
+    :param bits: n 的位数
+    :param e: 公钥指数
+    :param workers: 工作进程数；None 或 1 时在当前进程中搜索
+    :param rng: 随机数生成器，默认使用系统随机数；多进程时用于派生每个搜索任务的种子
+    :param primes: 素数个数，大于 2 时生成多素数密钥（RFC 8017），解密更快
+    :param executor: 多进程搜索使用的 ProcessPoolExecutor，生成多个密钥时传入同一个以复用进程；
+                     默认在需要时为本次调用创建一个
+    :return: RSAPrivateKey
+    """
+    if workers and workers > 1 and executor is None:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return generate_key(bits, e, workers, rng, primes, executor)
+
+    sizes = [bits // primes + (i < bits % primes) for i in range(primes)]
+    while True:
+        if workers and workers > 1:
+            found = {size: _parallel_primes(executor, workers, size, e, sizes.count(size), rng)
+                     for size in sorted(set(sizes))}
+            factors = [found[size].pop() for size in sizes]
+        else:
+            factors = [generate_prime(size, e, rng) for size in sizes]
+        # 多个素数的乘积可能少一位
+        n = 1
+        for r in factors:
+            n *= r
+        if n.bit_length() != bits:
+            continue
+        # FIPS 186-4 B.3.1: |p - q| > 2^(nlen/2 - 100)，多素数时对每一对素数检查
+        if check_prime_gap(factors, sizes[-1]):
+            return RSAPrivateKey(factors[0], factors[1], e, other_primes=factors[2:])
+
+
+def check_prime_gap(factors, bits):
+    """
+    FIPS 186-4 B.3.1：任意两个素数之差的绝对值大于 2^(bits - 100)
+    :param factors: 素数列表
+    :param bits: 素数的位数（多素数时取最短的）
+    :return:
+    """
+    gap = 1 << max(bits - 100, 0)
+    return all(abs(r - s) > gap for i, r in enumerate(factors) for s in factors[i + 1:])
+
+
+def generate_key_test(bits=1024):
+    """
+    生成 bits 位的密钥，检查 n 的位数以及加密后解密得到原文
+    :param bits:
+    :return:
+    """
+    key = generate_key(bits)
+    assert key.n.bit_length() == bits
+    m = 123
+    assert key.decrypt(key.public_key().encrypt(m)) == m
+    print("generate_key_test:", hex(key.n))
+
+
+if __name__ == '__main__':
+    generate_key_test()
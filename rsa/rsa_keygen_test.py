@@ -0,0 +1,92 @@
+"""
+rsa_keygen.py 测试：python rsa_keygen_test.py
+"""
+import math
+import random
+
+from rsa_keygen import (check_prime_gap, generate_key, generate_key_test, is_probable_prime, miller_rabin_rounds,
+                        search_window)
+
+# Carmichael 数：对所有与之互素的底数都是费马伪素数
+CARMICHAEL = [561, 1105, 1729, 2465, 2821, 6601, 8911, 41041, 825265, 321197185, 5394826801, 232250619601]
+# 对底数 2、3、5、7 都是强伪素数（151 * 751 * 28351）
+STRONG_PSEUDOPRIME = 3215031751
+
+
+def _is_prime(n):
+    return n >= 2 and all(n % d for d in range(2, math.isqrt(n) + 1))
+
+
+def miller_rabin_rounds_test():
+    """FIPS 186-4 表 C.3 各行的边界"""
+    expected = {256: 40, 511: 40, 512: 7, 1023: 7, 1024: 5, 1535: 5, 1536: 4, 2048: 4}
+    for bits, rounds in expected.items():
+        assert miller_rabin_rounds(bits) == rounds, (bits, miller_rabin_rounds(bits))
+
+
+def small_numbers_test():
+    """小整数（包括偶数、0、1、2 和小素数本身）的结果与试除法一致"""
+    rng = random.Random(0)
+    for n in range(3000):
+        assert is_probable_prime(n, rng=rng) == _is_prime(n), n
+
+
+def pseudoprime_test():
+    """Carmichael 数、强伪素数和大合数被拒绝，大素数通过"""
+    rng = random.Random(1)
+    for n in CARMICHAEL + [STRONG_PSEUDOPRIME]:
+        assert not is_probable_prime(n, rng=rng), n
+    for exponent in (61, 89, 107, 127, 521):
+        mersenne = (1 << exponent) - 1
+        assert is_probable_prime(mersenne, rng=rng), exponent
+        assert not is_probable_prime(mersenne * mersenne, rng=rng), exponent
+        assert not is_probable_prime(mersenne + 1, rng=rng), exponent
+    assert not is_probable_prime(((1 << 127) - 1) * ((1 << 89) - 1), rng=rng)
+
+
+def search_window_test():
+    """筛选后找到的数是 bits 位的素数且 gcd(e, p - 1) = 1；种子相同时结果相同"""
+    for bits, e in ((128, 65537), (256, 3), (512, 65537)):
+        for seed in range(3):
+            prime = search_window(bits, e, rng=random.Random(seed))
+            if prime is None:
+                continue
+            assert prime.bit_length() == bits and prime >> (bits - 2) == 3
+            assert is_probable_prime(prime, 40, random.Random(seed))
+            assert math.gcd(e, prime - 1) == 1
+            assert search_window(bits, e, rng=random.Random(seed)) == prime
+
+
+def prime_gap_test():
+    """FIPS 186-4 B.3.1：差值不超过 2^(bits - 100) 的素数对被拒绝"""
+    bits = 256
+    p = search_window(bits, rng=random.Random(5)) or search_window(bits, rng=random.Random(6))
+    q = p + 2
+    while not is_probable_prime(q, 40, random.Random(0)):
+        q += 2
+    assert not check_prime_gap([p, q], bits)
+    r = p + (1 << (bits - 100)) + 1
+    assert check_prime_gap([p, r], bits)
+    assert not check_prime_gap([p + (1 << 200), r, q], bits)   # 多个素数时检查每一对
+
+
+def generate_key_reproducible_test():
+    """种子确定的 rng 在单进程和多进程时都得到相同的密钥"""
+    for workers in (None, 2):
+        keys = [generate_key(512, workers=workers, rng=random.Random(42), primes=primes)
+                for primes in (2, 3) for _ in range(2)]
+        assert keys[0].n == keys[1].n and keys[2].n == keys[3].n, workers
+        for key, primes in zip(keys[::2], (2, 3)):
+            assert key.n.bit_length() == 512 and len(key.primes) == primes
+            assert check_prime_gap(key.primes, 512 // primes)
+
+
+if __name__ == '__main__':
+    miller_rabin_rounds_test()
+    small_numbers_test()
+    pseudoprime_test()
+    search_window_test()
+    prime_gap_test()
+    generate_key_reproducible_test()
+    generate_key_test()
+    print('rsa_keygen ok')